@@ -0,0 +1,79 @@
+"""pytest-benchmark suite for the form endpoints
+
+Requests go through the whole app (middleware, warm-up, routers) with an
+in-process client, and the search-select options come from a fake
+upstream, so no server or network is needed. Run it explicitly, it is not
+part of the test suite:
+
+    pip install -e .[bench]
+    pytest benchmarks/bench_endpoints.py --benchmark-autosave
+    # later, compare against the last saved run
+    pytest benchmarks/bench_endpoints.py --benchmark-compare \\
+        --benchmark-compare-fail=median:10%
+
+Saved runs are json files in .benchmarks/. --benchmark-json=PATH writes
+one elsewhere.
+"""
+
+from typing import Iterator
+
+import pytest
+from common import (
+    FORM_POSTS,
+    FORM_TYPES,
+    fake_countries,
+    typeahead_queries,
+    use_fake_search_upstream,
+)
+from fastapi.testclient import TestClient
+
+from aind_data_transfer_ui_demo.fast_ui.server import app
+
+COUNTRIES = fake_countries()
+# typeahead prefixes, starting with the empty query of a fresh field
+QUERIES = list(dict.fromkeys(typeahead_queries(COUNTRIES, 12)))
+
+
+@pytest.fixture(scope="module")
+def client() -> Iterator[TestClient]:
+    """Client of the app, started with its lifespan and warmed up"""
+    search_client = use_fake_search_upstream(COUNTRIES)
+    with TestClient(app) as test_client:
+        # waits for warm-up
+        test_client.get("/api/").raise_for_status()
+        yield test_client
+        test_client.portal.call(search_client.aclose)
+
+
+def _ok(response) -> None:
+    """Fail the benchmark on an error response"""
+    assert response.status_code == 200, response.text[:500]
+
+
+@pytest.mark.parametrize("form_type", FORM_TYPES)
+def test_forms_page(benchmark, client: TestClient, form_type: str):
+    """GET /api/forms/{form_type}"""
+    benchmark.group = "GET /api/forms/{form_type}"
+    _ok(benchmark(client.get, f"/api/forms/{form_type}"))
+
+
+@pytest.mark.parametrize("form_type", FORM_TYPES)
+def test_form_content(benchmark, client: TestClient, form_type: str):
+    """GET /api/forms/content/{form_type}"""
+    benchmark.group = "GET /api/forms/content/{form_type}"
+    _ok(benchmark(client.get, f"/api/forms/content/{form_type}"))
+
+
+@pytest.mark.parametrize("form_type", sorted(FORM_POSTS))
+def test_form_post(benchmark, client: TestClient, form_type: str):
+    """POST /api/forms/{form_type}, validation included"""
+    benchmark.group = "POST /api/forms/{form_type}"
+    data = FORM_POSTS[form_type]
+    _ok(benchmark(client.post, f"/api/forms/{form_type}", data=data))
+
+
+@pytest.mark.parametrize("q", QUERIES, ids=repr)
+def test_search(benchmark, client: TestClient, q: str):
+    """GET /api/forms/search?q="""
+    benchmark.group = "GET /api/forms/search"
+    _ok(benchmark(client.get, "/api/forms/search", params={"q": q}))
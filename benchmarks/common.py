@@ -0,0 +1,195 @@
+"""Shared helpers for the benchmark scripts"""
+
+import asyncio
+import random
+import statistics
+import string
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import Iterator
+
+import httpx
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+from aind_data_transfer_ui_demo.fast_ui.search import SearchClient
+from aind_data_transfer_ui_demo.fast_ui.search_index import (
+    country_index,
+    load_countries,
+)
+from aind_data_transfer_ui_demo.jobs.store import JobState, JobStatus
+
+# form types FastUI can render, the full aind-data-transfer-models forms
+# fail to serialize
+FORM_TYPES = [
+    "login",
+    "select",
+    "ModalityConfigsFastUI",
+    "BasicUploadJobConfigsFastUI",
+    "SubmitJobRequestFastUI",
+]
+UPLOAD_JOB_FORM = {
+    "project_name": "Benchmark Project",
+    "platform": "ecephys",
+    "subject_id": "123456",
+    "acq_datetime": "2024-01-01T10:00",
+    "modality.modality": "ecephys",
+    "modality.source": "/data/ecephys",
+}
+# valid form data for the POST route of each form type
+FORM_POSTS = {
+    "login": {"email": "bench@example.org", "password": "secret"},
+    "select": {
+        "select_single": "hammer",
+        "select_multiple": ["saw", "hammer"],
+        "search_select_single": "C01",
+        "search_select_multiple": ["C01", "C02"],
+    },
+    "ModalityConfigsFastUI": {"modality": "ecephys", "source": "/data/x"},
+    "BasicUploadJobConfigsFastUI": UPLOAD_JOB_FORM,
+    "SubmitJobRequestFastUI": {
+        f"upload_job.{key}": value for key, value in UPLOAD_JOB_FORM.items()
+    },
+}
+
+
+def percentiles(samples: list[float]) -> dict:
+    """p50/p95/p99/mean of samples, in the unit of the samples"""
+    ordered = sorted(samples)
+
+    def pick(p: float) -> float:
+        """Nearest-rank percentile"""
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+    return {
+        "n": len(ordered),
+        "mean": statistics.fmean(ordered),
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+    }
+
+
+def format_row(name: str, stats: dict, unit: str = "us") -> str:
+    """One aligned line of benchmark output"""
+    return (
+        f"{name:<32} n={stats['n']:<6} mean={stats['mean']:>10.1f}{unit} "
+        f"p50={stats['p50']:>10.1f}{unit} p95={stats['p95']:>10.1f}{unit} "
+        f"p99={stats['p99']:>10.1f}{unit}"
+    )
+
+
+def fake_countries(n: int = 250, seed: int = 0) -> list[dict]:
+    """Synthetic restcountries-like records"""
+    rng = random.Random(seed)
+    regions = ["Africa", "Americas", "Asia", "Europe", "Oceania"]
+    countries = []
+    for i in range(n):
+        words = [
+            "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9)))
+            for _ in range(rng.randint(1, 3))
+        ]
+        countries.append(
+            {
+                "cca3": f"C{i:02d}",
+                "name": {"common": " ".join(w.title() for w in words)},
+                "region": rng.choice(regions),
+                "population": rng.randint(10_000, 1_000_000_000),
+            }
+        )
+    return countries
+
+
+def fake_search_upstream(countries: list[dict]) -> FastAPI:
+    """Local stand-in for https://restcountries.com/v3.1"""
+    app = FastAPI()
+
+    @app.get("/all")
+    def all_countries() -> list[dict]:
+        """Every country"""
+        return countries
+
+    @app.get("/name/{q}")
+    def by_name(q: str) -> list[dict]:
+        """Countries whose name contains q"""
+        found = [
+            c for c in countries if q.lower() in c["name"]["common"].lower()
+        ]
+        if not found:
+            raise HTTPException(status_code=404)
+        return found
+
+    return app
+
+
+def typeahead_queries(countries: list[dict], n: int) -> list[str]:
+    """Prefixes of random country names, as typed one key at a time"""
+    rng = random.Random(1)
+    queries = []
+    while len(queries) < n:
+        name = rng.choice(countries)["name"]["common"].lower()
+        queries.extend(name[:i] for i in range(len(name) + 1))
+    return queries[:n]
+
+
+def use_fake_search_upstream(countries: list[dict]) -> SearchClient:
+    """Load the search-select options of the app from a fake upstream
+    served in-process. Returns its client, for the caller to close."""
+    client = SearchClient(
+        "http://upstream",
+        transport=httpx.ASGITransport(app=fake_search_upstream(countries)),
+    )
+    country_index.loader = partial(load_countries, client)
+    return client
+
+
+def fake_jobs(n: int, seed: int = 0) -> Iterator[JobStatus]:
+    """Synthetic job history, one job every ~2 minutes over the last n jobs"""
+    rng = random.Random(seed)
+    projects = [f"Project {name}" for name in string.ascii_uppercase]
+    platforms = ["behavior", "ecephys", "smartspim", "exaspim", "confocal"]
+    states = list(JobState)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    for i in range(n):
+        submit_time = start + timedelta(seconds=120 * i + rng.randint(0, 60))
+        yield JobStatus(
+            job_id=f"job-{i:08d}",
+            subject_id=str(rng.randint(100_000, 110_000)),
+            project_name=rng.choice(projects),
+            platform=rng.choice(platforms),
+            modalities=rng.sample(["behavior", "ecephys", "pophys"], k=2),
+            status=rng.choices(states, weights=[1, 1, 2, 90, 6])[0],
+            submit_time=submit_time,
+        )
+
+
+def fake_transfer_service(
+    latency: float = 0.0, fail_first: int = 0, lose_responses: int = 0
+) -> FastAPI:
+    """
+    Local stand-in for aind-data-transfer-service's submit_jobs endpoint.
+
+    The first fail_first requests get a 503 without being accepted, the
+    next lose_responses are accepted but still answered with a 503, as if
+    the response was lost. Accepted batches are kept in app.state.accepted
+    by Idempotency-Key, so a retried batch is only accepted once.
+    """
+    app = FastAPI()
+    app.state.requests = 0
+    app.state.accepted = {}
+
+    @app.post("/api/v1/submit_jobs")
+    async def submit_jobs(request: Request) -> JSONResponse:
+        """Accept a SubmitJobRequest"""
+        await asyncio.sleep(latency)
+        app.state.requests += 1
+        if app.state.requests <= fail_first:
+            return JSONResponse({"message": "unavailable"}, status_code=503)
+        key = request.headers.get("Idempotency-Key")
+        body = await request.json()
+        app.state.accepted.setdefault(key, body)
+        if app.state.requests <= fail_first + lose_responses:
+            return JSONResponse({"message": "lost"}, status_code=503)
+        return JSONResponse({"message": "submitted"})
+
+    return app
@@ -0,0 +1,119 @@
+"""Per-conversion time and allocations of the FastUI form -> service model
+conversion, before (json round-trip) and after (direct python dump)
+
+    python benchmarks/conversion_benchmark.py [--number 200]
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+from typing import Callable
+
+from aind_data_transfer_models.core import (
+    BasicUploadJobConfigs,
+    ModalityConfigs,
+    SubmitJobRequest,
+)
+
+from aind_data_transfer_ui_demo.models.basic_upload_job_configs import (
+    BasicUploadJobConfigsFastUI,
+)
+from aind_data_transfer_ui_demo.models.modality_configs import (
+    ModalityConfigsFastUI,
+)
+from aind_data_transfer_ui_demo.models.submit_job_request import (
+    SubmitJobRequestFastUI,
+)
+
+UPLOAD_JOB = dict(
+    project_name="Benchmark Project",
+    platform="ecephys",
+    modality=dict(modality="ecephys", source="/data/ecephys"),
+    subject_id="123456",
+    acq_datetime="2024-01-01T10:00:00",
+)
+
+
+def legacy(form, target: type, process: Callable = None) -> str:
+    """The previous process_and_validate_form_data"""
+    form_data = json.loads(form.model_dump_json())
+    if process is not None:
+        form_data = process(form_data)
+    return target(**form_data).model_dump_json(indent=3)
+
+
+def cases() -> list[tuple[str, Callable, Callable]]:
+    """(name, before, after) for each FastUI model"""
+    modality = ModalityConfigsFastUI(**UPLOAD_JOB["modality"])
+    upload_job = BasicUploadJobConfigsFastUI(**UPLOAD_JOB)
+    request = SubmitJobRequestFastUI(upload_job=UPLOAD_JOB)
+    return [
+        (
+            "ModalityConfigsFastUI",
+            lambda: legacy(modality, ModalityConfigs),
+            modality.to_service_model,
+        ),
+        (
+            "BasicUploadJobConfigsFastUI",
+            lambda: legacy(
+                upload_job,
+                BasicUploadJobConfigs,
+                BasicUploadJobConfigsFastUI._process_form_data,
+            ),
+            upload_job.to_service_model,
+        ),
+        (
+            "SubmitJobRequestFastUI",
+            lambda: legacy(
+                request,
+                SubmitJobRequest,
+                SubmitJobRequestFastUI._process_form_data,
+            ),
+            request.to_service_model,
+        ),
+    ]
+
+
+def time_per_call(fn: Callable, number: int) -> float:
+    """Mean microseconds per call"""
+    fn()
+    start = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return (time.perf_counter() - start) / number * 1e6
+
+
+def allocations(fn: Callable) -> tuple[int, float]:
+    """(blocks still allocated afterwards, peak KiB) of a single call"""
+    fn()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    fn()
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks = sum(
+        max(0, stat.count_diff) for stat in after.compare_to(before, "lineno")
+    )
+    return blocks, peak / 1024
+
+
+def main() -> None:
+    """Print before/after for each model"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+    print(
+        f"{'model':<28} {'path':<7} {'us/call':>9} {'live blk':>8} "
+        f"{'peak KiB':>9}"
+    )
+    for name, before, after in cases():
+        for label, fn in (("before", before), ("after", after)):
+            us = time_per_call(fn, args.number)
+            blocks, peak = allocations(fn)
+            print(f"{name:<28} {label:<7} {us:>9.1f} {blocks:>8} {peak:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
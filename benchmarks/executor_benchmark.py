@@ -0,0 +1,104 @@
+"""Latency of a cheap endpoint while form submissions are being validated
+
+    python benchmarks/executor_benchmark.py [--kind thread|process]
+        [--clients 16] [--posts 10] [--max-pending 64]
+
+--kind inline validates on the event loop, as the form routes used to.
+Probe latency shows how much submissions block other clients; rejected
+posts are the ones answered with a 429.
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+from common import format_row, percentiles
+
+from aind_data_transfer_ui_demo.fast_ui import executor
+from aind_data_transfer_ui_demo.fast_ui.server import app
+
+FORM = {
+    "project_name": "Benchmark Project",
+    "platform": "ecephys",
+    "subject_id": "123456",
+    "acq_datetime": "2024-01-01T10:00",
+    "modality.modality": "ecephys",
+    "modality.source": "/data/ecephys",
+}
+
+
+def run_inline() -> None:
+    """Make the executor call functions directly on the event loop"""
+
+    async def inline(fn, *args, wait=False):
+        """Same signature as BoundedExecutor.run"""
+        return fn(*args)
+
+    executor.validation_executor.run = inline
+
+
+async def submit(client: httpx.AsyncClient, posts: int, codes: list) -> None:
+    """One client posting the form posts times in a row"""
+    for _ in range(posts):
+        r = await client.post(
+            "/api/forms/BasicUploadJobConfigsFastUI", data=FORM
+        )
+        codes.append(r.status_code)
+
+
+async def probe(client: httpx.AsyncClient, samples: list, done) -> None:
+    """Time a cheap GET until the submissions are done"""
+    while not done.is_set():
+        start = time.perf_counter()
+        await client.get("/api/executor")
+        samples.append((time.perf_counter() - start) * 1e3)
+        await asyncio.sleep(0.005)
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    """Run the submissions and the probe concurrently"""
+    transport = httpx.ASGITransport(app=app)
+    samples, codes = [], []
+    done = asyncio.Event()
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        # start the workers before timing
+        await client.post("/api/forms/BasicUploadJobConfigsFastUI", data=FORM)
+        probing = asyncio.create_task(probe(client, samples, done))
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(submit(client, args.posts, codes) for _ in range(args.clients))
+        )
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probing
+    print(f"kind={args.kind} posts={len(codes)} in {elapsed:.2f}s")
+    print(f"  ok={codes.count(200)} rejected={codes.count(429)}")
+    print(format_row("probe latency", percentiles(samples), unit="ms"))
+    if args.kind != "inline":
+        print(f"  executor: {executor.validation_executor.stats()}")
+    executor.validation_executor.shutdown()
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--kind", choices=["inline", "thread", "process"], default="process"
+    )
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--posts", type=int, default=10)
+    parser.add_argument("--max-pending", type=int, default=64)
+    args = parser.parse_args()
+    if args.kind == "inline":
+        run_inline()
+    else:
+        executor.validation_executor.kind = args.kind
+        executor.validation_executor.max_pending = args.max_pending
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
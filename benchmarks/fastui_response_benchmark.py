@@ -0,0 +1,168 @@
+"""Throughput and CPU per request of FastUIResponse against returning the
+component list with response_model=FastUI
+
+The same component trees are served both ways from an in-process app:
+  - a submitted form page (routers/forms.py display_submitted_form_data)
+  - a job status table page of 50 rows (routers/job_status.py)
+The encode rows time only the step that differs, FastAPI's response model
+validation + serialization versus components_json(), without HTTP.
+
+    python benchmarks/fastui_response_benchmark.py [--requests 2000]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Callable
+
+import httpx
+from common import fake_jobs
+from fastapi import FastAPI
+from fastui import AnyComponent, FastUI
+from fastui import components as c
+from fastui.components.display import DisplayLookup
+from pydantic import TypeAdapter
+
+from aind_data_transfer_ui_demo.fast_ui.rendering import (
+    FastUIResponse,
+    components_json,
+)
+from aind_data_transfer_ui_demo.fast_ui.routers.forms import (
+    display_submitted_form_data,
+)
+from aind_data_transfer_ui_demo.fast_ui.shared import page
+from aind_data_transfer_ui_demo.jobs.store import JobStatus
+
+
+def form_page() -> list[AnyComponent]:
+    """Page shown after submitting a form"""
+    form_json = json.dumps(
+        {"upload_jobs": [{"s3_bucket": "private", "n": i} for i in range(20)]},
+        indent=3,
+    )
+    return page(*display_submitted_form_data(form_json, form_json))
+
+
+def table_page() -> list[AnyComponent]:
+    """Job status table page"""
+    return page(
+        c.Table(
+            data=list(fake_jobs(50)),
+            data_model=JobStatus,
+            columns=[
+                DisplayLookup(field="job_id"),
+                DisplayLookup(field="subject_id"),
+                DisplayLookup(field="status"),
+            ],
+        ),
+        c.Pagination(page=1, page_size=50, total=1000),
+        title="Job Status",
+    )
+
+
+PAGES = {"form": form_page, "table": table_page}
+
+
+def add_routes(app: FastAPI, name: str, components: list) -> None:
+    """Serve components with both response paths"""
+
+    @app.get(
+        f"/model/{name}",
+        response_model=FastUI,
+        response_model_exclude_none=True,
+    )
+    def with_response_model() -> list[AnyComponent]:
+        """Validated against FastUI and encoded by FastAPI"""
+        return components
+
+    @app.get(
+        f"/fast/{name}",
+        response_model=FastUI,
+        response_model_exclude_none=True,
+    )
+    def with_fastui_response() -> FastUIResponse:
+        """Serialized with components_json()"""
+        return FastUIResponse(components)
+
+
+def build_app() -> FastAPI:
+    """Each page served with both response paths"""
+    app = FastAPI()
+    for name, build in PAGES.items():
+        add_routes(app, name, build())
+    return app
+
+
+def legacy_encode(adapter: TypeAdapter) -> Callable[[list], bytes]:
+    """What FastAPI does with a response_model: validate, dump to python,
+    then JSONResponse's json.dumps"""
+
+    def encode(components: list) -> bytes:
+        """Encode one response"""
+        value = adapter.validate_python(components)
+        data = adapter.dump_python(
+            value, mode="json", by_alias=True, exclude_none=True
+        )
+        return json.dumps(
+            data, ensure_ascii=False, separators=(",", ":")
+        ).encode()
+
+    return encode
+
+
+def time_encode(encode: Callable[[list], bytes], components: list, n: int):
+    """(CPU us per call, bytes per call)"""
+    start = time.process_time()
+    for _ in range(n):
+        body = encode(components)
+    return (time.process_time() - start) / n * 1e6, len(body)
+
+
+async def time_requests(client: httpx.AsyncClient, path: str, n: int):
+    """(CPU us per request, MB/s of response bodies)"""
+    size = len((await client.get(path)).content)
+    cpu, wall = time.process_time(), time.perf_counter()
+    for _ in range(n):
+        response = await client.get(path)
+        response.raise_for_status()
+    cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+    return cpu / n * 1e6, size * n / wall / 1e6
+
+
+async def main_async(n: int) -> None:
+    """Run every page through both paths"""
+    adapter = TypeAdapter(FastUI)
+    print(f"{'':<24}{'cpu/request':>14}{'throughput':>14}")
+    for name, build in PAGES.items():
+        components = build()
+        for label, encode in (
+            ("response_model", legacy_encode(adapter)),
+            ("components_json", components_json),
+        ):
+            cpu, size = time_encode(encode, components, n)
+            print(f"{name} encode {label:<16}{cpu:>11.0f} us   {size} bytes")
+
+    transport = httpx.ASGITransport(app=build_app())
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://test"
+    ) as client:
+        for name in PAGES:
+            for prefix in ("model", "fast"):
+                cpu, rate = await time_requests(client, f"/{prefix}/{name}", n)
+                print(
+                    f"{name} GET /{prefix:<14}{cpu:>11.0f} us"
+                    f"{rate:>10.1f} MB/s"
+                )
+
+
+def main() -> None:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.requests))
+
+
+if __name__ == "__main__":
+    main()
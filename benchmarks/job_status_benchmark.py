@@ -0,0 +1,76 @@
+"""Job Status page queries against a store with a year of job history
+
+    python benchmarks/job_status_benchmark.py [--rows 300000] [--db PATH]
+
+The store is kept at --db (a temporary file by default), so it can be
+reused as AIND_JOB_STATUS_DB to browse the seeded jobs in the UI.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from common import fake_jobs, format_row, percentiles
+
+from aind_data_transfer_ui_demo.jobs.store import (
+    JobFilter,
+    JobState,
+    JobStatusStore,
+)
+
+QUERIES = {
+    "newest first": (JobFilter(), 1),
+    "oldest first": (JobFilter(order="asc"), 1),
+    "page 100": (JobFilter(), 100),
+    "page 5000": (JobFilter(), 5000),
+    "subject": (JobFilter(subject_id="105000"), 1),
+    "project": (JobFilter(project_name="Project Q"), 1),
+    "failed": (JobFilter(status=JobState.FAILED), 1),
+    "project by subject": (
+        JobFilter(project_name="Project Q", sort="subject_id"),
+        1,
+    ),
+}
+
+
+def seed(store: JobStatusStore, rows: int) -> None:
+    """Insert rows fake jobs, in batches"""
+    batch = []
+    for job in fake_jobs(rows):
+        batch.append(job)
+        if len(batch) == 10_000:
+            store.upsert(batch)
+            batch = []
+    store.upsert(batch)
+
+
+def main() -> None:
+    """Seed the store if needed and time each query"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=300_000)
+    parser.add_argument("--db", default=None)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    path = args.db or os.path.join(tempfile.mkdtemp(), "job_status.db")
+    store = JobStatusStore(path)
+    total = store.query(JobFilter(), page_size=1)[1]
+    if total < args.rows:
+        start = time.perf_counter()
+        seed(store, args.rows)
+        print(f"seeded {args.rows} jobs in {time.perf_counter() - start:.1f}s")
+    print(f"store: {path}")
+    for name, (job_filter, page) in QUERIES.items():
+        samples = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            store.query(job_filter, page=page)
+            samples.append((time.perf_counter() - start) * 1e3)
+        print(format_row(name, percentiles(samples), unit="ms"))
+    start = time.perf_counter()
+    store.get("job-00012345")
+    print(f"get by job_id: {(time.perf_counter() - start) * 1e3:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
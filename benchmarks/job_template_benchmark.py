@@ -0,0 +1,108 @@
+"""Memory and time of job template ingestion for growing workbooks
+
+Writes synthetic job templates with 10 to 50,000 rows and reports the peak
+traced memory of
+  - loading the sheet with openpyxl in normal (non read-only) mode
+  - streaming the rows with iter_job_rows (read-only mode)
+  - full ingestion with iter_submit_job_requests (validation included),
+    limited to --validate-rows rows because validation dominates the time
+
+    python benchmarks/job_template_benchmark.py [--validate-rows 200]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Callable
+
+from openpyxl import Workbook, load_workbook
+
+from aind_data_transfer_ui_demo.models.job_template import (
+    iter_job_rows,
+    iter_submit_job_requests,
+    template_columns,
+)
+
+ROW_COUNTS = [10, 1_000, 10_000, 50_000]
+
+
+def write_workbook(path: str, n_rows: int) -> None:
+    """Synthetic filled in job template"""
+    columns = template_columns()
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(columns)
+    start = datetime(2024, 1, 1)
+    for i in range(n_rows):
+        row = {
+            "project_name": "Benchmark Project",
+            "platform": "ecephys",
+            "subject_id": str(100000 + i),
+            "acq_datetime": start + timedelta(minutes=i),
+            "modality0": "ecephys",
+            "modality0.source": f"/data/ecephys_{i}",
+            "modality1": "behavior-videos",
+            "modality1.source": f"/data/videos_{i}",
+        }
+        sheet.append([row.get(c) for c in columns])
+    workbook.save(path)
+
+
+def measure(fn: Callable[[], None]) -> tuple[float, float]:
+    """(seconds, peak MiB) of fn()"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def load_full(path: str) -> None:
+    """Legacy approach: load the whole workbook into memory"""
+    workbook = load_workbook(path)
+    for _ in workbook.active.iter_rows(values_only=True):
+        pass
+
+
+def stream_rows(path: str) -> None:
+    """Map every row without validating"""
+    with open(path, "rb") as f:
+        for _ in iter_job_rows(f, path):
+            pass
+
+
+def ingest(path: str) -> None:
+    """Map and validate every row into SubmitJobRequest chunks"""
+    with open(path, "rb") as f:
+        for _ in iter_submit_job_requests(f, path, chunk_size=100):
+            pass
+
+
+def main() -> None:
+    """Print a table of time/peak memory per row count"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--validate-rows", type=int, default=200)
+    args = parser.parse_args()
+    print(f"{'rows':>7} {'mode':<28} {'seconds':>9} {'peak MiB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in ROW_COUNTS:
+            path = os.path.join(tmp, f"jobs_{n_rows}.xlsx")
+            write_workbook(path, n_rows)
+            modes = [
+                ("openpyxl full load", load_full),
+                ("iter_job_rows", stream_rows),
+            ]
+            if n_rows <= args.validate_rows:
+                modes.append(("iter_submit_job_requests", ingest))
+            for name, fn in modes:
+                seconds, peak = measure(lambda: fn(path))
+                print(f"{n_rows:>7} {name:<28} {seconds:>9.2f} {peak:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""Concurrent load generator for the form endpoints
+
+Each scenario cycles through its requests from --concurrency clients until
+--requests have been sent, and reports throughput and latency percentiles:
+  - pages:   GET /api/forms/{form_type}
+  - content: GET /api/forms/content/{form_type}
+  - search:  GET /api/forms/search?q= with typeahead queries
+  - posts:   POST /api/forms/{form_type} with valid form data
+
+    python benchmarks/load_generator.py [--base-url http://localhost:8000]
+        [--scenario pages search ...] [--concurrency 32] [--requests 1000]
+        [--output results.json] [--compare baseline.json]
+
+Without --base-url the app runs in-process, with the search-select options
+from a fake upstream. --output saves the results as json, --compare prints
+them next to a saved run and exits with 1 if the p95 latency or the
+throughput of a scenario regressed by more than --max-regression.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from itertools import cycle
+from pathlib import Path
+from typing import Optional
+
+import httpx
+from common import (
+    FORM_POSTS,
+    FORM_TYPES,
+    fake_countries,
+    format_row,
+    percentiles,
+    typeahead_queries,
+    use_fake_search_upstream,
+)
+
+# (method, url, httpx request arguments)
+Request = tuple[str, str, dict]
+
+SCENARIOS: dict[str, list[Request]] = {
+    "pages": [("GET", f"/api/forms/{t}", {}) for t in FORM_TYPES],
+    "content": [("GET", f"/api/forms/content/{t}", {}) for t in FORM_TYPES],
+    "search": [
+        ("GET", "/api/forms/search", {"params": {"q": q}})
+        for q in typeahead_queries(fake_countries(), 200)
+    ],
+    "posts": [
+        ("POST", f"/api/forms/{t}", {"data": data})
+        for t, data in FORM_POSTS.items()
+    ],
+}
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    requests: list[Request],
+    concurrency: int,
+    n: int,
+) -> dict:
+    """Send n of requests from concurrency clients. Returns throughput,
+    error count and latency percentiles in ms."""
+    latencies = []
+    errors = 0
+    pending = iter(range(n))
+    next_request = cycle(requests).__next__
+
+    async def worker() -> None:
+        """Send requests until n have been sent"""
+        nonlocal errors
+        for _ in pending:
+            method, url, kwargs = next_request()
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append((time.perf_counter() - start) * 1e3)
+            errors += failed
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        **percentiles(latencies),
+        "errors": errors,
+        "throughput": n / elapsed,
+    }
+
+
+def git_commit() -> Optional[str]:
+    """Commit of the working tree, if it is a git checkout"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> bool:
+    """Print results against a baseline run. Returns whether any scenario
+    regressed by more than max_regression (e.g. 0.1 for 10%)."""
+    regressed = False
+    print(f"compared to {baseline['meta'].get('commit')}:")
+    for name, stats in results["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            continue
+        p95 = stats["p95"] / before["p95"] - 1
+        throughput = stats["throughput"] / before["throughput"] - 1
+        failed = p95 > max_regression or throughput < -max_regression
+        regressed |= failed
+        print(
+            f"  {name:<10} p95 {p95:+7.1%}  throughput {throughput:+7.1%}"
+            f"{'  REGRESSED' if failed else ''}"
+        )
+    return regressed
+
+
+async def main_async(args: argparse.Namespace) -> dict:
+    """Run the scenarios against the server or the in-process app"""
+    if args.base_url:
+        transport, search_client = None, None
+    else:
+        from aind_data_transfer_ui_demo.fast_ui.server import app
+
+        search_client = use_fake_search_upstream(fake_countries())
+        transport = httpx.ASGITransport(app=app)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        transport=transport,
+        base_url=args.base_url or "http://app",
+        limits=limits,
+        timeout=60,
+    ) as client:
+        # warms the app up and fills its caches
+        for name in args.scenario:
+            await run_scenario(client, SCENARIOS[name], 1, 10)
+        scenarios = {}
+        for name in args.scenario:
+            scenarios[name] = await run_scenario(
+                client, SCENARIOS[name], args.concurrency, args.requests
+            )
+            print(
+                format_row(name, scenarios[name], unit="ms")
+                + f" {scenarios[name]['throughput']:.0f}/s"
+                + f" errors={scenarios[name]['errors']}"
+            )
+    if search_client is not None:
+        await search_client.aclose()
+    return {
+        "meta": {
+            "time": datetime.now(timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "base_url": args.base_url,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+        },
+        "scenarios": scenarios,
+    }
+
+
+def main() -> None:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--base-url")
+    parser.add_argument(
+        "--scenario", nargs="+", choices=list(SCENARIOS), default=SCENARIOS
+    )
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--compare", type=Path)
+    parser.add_argument("--max-regression", type=float, default=0.1)
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        if compare(results, baseline, args.max_regression):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Balance of packed SubmitJobRequests against splitting in list order
+
+Job sizes are drawn from a heavy-tailed (lognormal) distribution, a few
+sessions of several TB among many small ones. Each strategy splits them
+into the same number of requests:
+  - in order: consecutive runs of max_jobs, like the job template upload
+  - packed:   pack_jobs, largest first into the lightest request
+and reports the largest request against the mean and the time taken.
+
+    python benchmarks/packing_benchmark.py [--jobs 5000] [--max-jobs 1000]
+        [--max-tb 50]
+"""
+
+import argparse
+import random
+import time
+
+from aind_data_transfer_ui_demo.jobs.packing import (
+    Pack,
+    imbalance,
+    num_packs,
+    pack_jobs,
+)
+
+TB = 1e12
+
+
+def in_order(sizes: list[int], count: int, max_jobs: int) -> list[Pack]:
+    """Consecutive runs of jobs, count requests of at most max_jobs"""
+    per_pack = max(-(-len(sizes) // count), 1)
+    per_pack = min(per_pack, max_jobs)
+    packs = []
+    for start in range(0, len(sizes), per_pack):
+        indices = list(range(start, min(start + per_pack, len(sizes))))
+        packs.append(Pack(indices, sum(sizes[i] for i in indices)))
+    return packs
+
+
+def main() -> None:
+    """Compare both strategies on random sizes"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--max-jobs", type=int, default=1000)
+    parser.add_argument("--max-tb", type=float)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    sizes = [int(rng.lognormvariate(23, 1.5)) for _ in range(args.jobs)]
+    max_bytes = int(args.max_tb * TB) if args.max_tb else None
+    count = num_packs(sizes, args.max_jobs, max_bytes)
+    print(
+        f"{args.jobs} jobs, {sum(sizes) / TB:.1f} TB, largest job "
+        f"{max(sizes) / TB:.2f} TB, {count} requests"
+    )
+    for label, split in (
+        ("in order", lambda: in_order(sizes, count, args.max_jobs)),
+        ("packed", lambda: pack_jobs(sizes, args.max_jobs, max_bytes)),
+    ):
+        start = time.perf_counter()
+        packs = split()
+        elapsed = (time.perf_counter() - start) * 1e3
+        largest = max(p.bytes for p in packs)
+        print(
+            f"{label:<10} {elapsed:7.1f}ms  largest {largest / TB:6.2f} TB"
+            f"  largest/mean {imbalance(packs):.3f}"
+            f"  jobs/request {max(len(p.indices) for p in packs)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Latency of FastUI pages under concurrent load, with the page chrome
+spliced in pre-serialized versus rebuilt and validated per request
+
+Runs the home page (/api/) and forms pages (/api/forms/{form_type}) of the
+real routers in-process, next to a copy of the home page as it was before
+(page() returned with response_model=FastUI), so the numbers measure the
+server side rather than the network.
+
+    python benchmarks/page_chrome_benchmark.py [--concurrency 32]
+        [--requests 2000]
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+from common import format_row, percentiles
+from fastapi import FastAPI
+from fastui import AnyComponent, FastUI
+
+from aind_data_transfer_ui_demo.fast_ui.routers import forms
+from aind_data_transfer_ui_demo.fast_ui.routers.main import router
+from aind_data_transfer_ui_demo.fast_ui.shared import page
+
+PATHS = {
+    "home (legacy page())": "/legacy/",
+    "home (/api/)": "/api/",
+    "forms/login": "/api/forms/login",
+    "forms/SubmitJobRequestFastUI": "/api/forms/SubmitJobRequestFastUI",
+}
+
+
+def build_app() -> FastAPI:
+    """The routers under test, plus the legacy home page"""
+    app = FastAPI()
+
+    @app.get(
+        "/legacy/", response_model=FastUI, response_model_exclude_none=True
+    )
+    def legacy_home() -> list[AnyComponent]:
+        """The home page before the chrome was pre-serialized"""
+        return page(title="Home")
+
+    app.include_router(forms.router, prefix="/api/forms")
+    app.include_router(router, prefix="/api")
+    return app
+
+
+async def load(
+    client: httpx.AsyncClient, path: str, concurrency: int, n: int
+) -> tuple[list[float], float]:
+    """Latencies in us of n GETs of path from concurrency clients, and the
+    requests per second"""
+    latencies = []
+    remaining = iter(range(n))
+
+    async def worker() -> None:
+        """Send requests until n have been sent"""
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies.append((time.perf_counter() - start) * 1e6)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, n / (time.perf_counter() - start)
+
+
+async def main_async(concurrency: int, n: int) -> None:
+    """Warm each path up, then load it"""
+    transport = httpx.ASGITransport(app=build_app())
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://test"
+    ) as client:
+        for name, path in PATHS.items():
+            # first requests build the cached forms and chrome
+            await load(client, path, 1, 5)
+            latencies, rate = await load(client, path, concurrency, n)
+            print(format_row(name, percentiles(latencies)) + f" {rate:.0f}/s")
+
+
+def main() -> None:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.concurrency, args.requests))
+
+
+if __name__ == "__main__":
+    main()
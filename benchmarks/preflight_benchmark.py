@@ -0,0 +1,115 @@
+"""Preflight of a batch of upload jobs against a sequential walk
+
+Builds a fake stage folder of --jobs acquisition folders, each with
+--subfolders subfolders of --files files, then totals every source:
+  - sequential: the same os.scandir listings, one after the other
+  - cold:       preflight_jobs with an empty cache
+  - warm:       preflight_jobs again, folder totals from the cache
+--latency adds a sleep to every directory listing, to stand in for the
+round trips of a network mount.
+
+    python benchmarks/preflight_benchmark.py [--jobs 200] [--subfolders 4]
+        [--files 20] [--latency 0.001]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from aind_data_transfer_ui_demo.jobs import preflight
+from aind_data_transfer_ui_demo.jobs.preflight import (
+    PathChecker,
+    preflight_jobs,
+)
+
+
+def make_stage(root: Path, jobs: int, subfolders: int, files: int) -> list:
+    """Acquisition folders under root, as BasicUploadJobConfigsSimple-shaped
+    jobs with one modality each"""
+    upload_jobs = []
+    for i in range(jobs):
+        source = root / f"ecephys_{100000 + i}"
+        for j in range(subfolders):
+            folder = source / f"probe_{j}"
+            folder.mkdir(parents=True)
+            for k in range(files):
+                (folder / f"chunk_{k}.dat").write_bytes(b"x" * k)
+        upload_jobs.append(
+            {"modalities": [{"modality": "ecephys", "source": str(source)}]}
+        )
+    return upload_jobs
+
+
+def slow(fn, latency: float):
+    """fn with a sleep before every call"""
+
+    def call(*args, **kwargs):
+        """Sleep, then call fn"""
+        time.sleep(latency)
+        return fn(*args, **kwargs)
+
+    return call
+
+
+def sequential(jobs: list[dict]) -> tuple[int, int]:
+    """(files, bytes) below every source, one listing at a time"""
+    files = size = 0
+    folders = [m["source"] for job in jobs for m in job["modalities"]]
+    while folders:
+        with os.scandir(folders.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    folders.append(entry.path)
+                elif entry.is_file():
+                    files += 1
+                    size += entry.stat().st_size
+    return files, size
+
+
+def main() -> None:
+    """Time the preflight of a fake batch"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--subfolders", type=int, default=4)
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.001)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        jobs = make_stage(Path(root), args.jobs, args.subfolders, args.files)
+        with mock.patch.object(os, "scandir", slow(os.scandir, args.latency)):
+            start = time.perf_counter()
+            files, size = sequential(jobs)
+            print(
+                f"sequential {time.perf_counter() - start:8.3f}s "
+                f"{files} files {size} bytes"
+            )
+
+            checker = PathChecker()
+
+            async def run(label: str) -> None:
+                """One preflight of the batch"""
+                start = time.perf_counter()
+                result = await preflight_jobs(jobs, checker)
+                summary = result["summary"]
+                print(
+                    f"{label:<10} {time.perf_counter() - start:8.3f}s "
+                    f"{summary['files']} files {summary['bytes']} bytes"
+                )
+
+            async def cold_then_warm() -> None:
+                """Empty cache, then the same batch again"""
+                await run("cold")
+                await run("warm")
+
+            asyncio.run(cold_then_warm())
+            checker.shutdown()
+    print(f"workers={preflight.PREFLIGHT_MAX_WORKERS}")
+
+
+if __name__ == "__main__":
+    main()
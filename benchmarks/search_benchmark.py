@@ -0,0 +1,77 @@
+"""Compares /search latency of the index against the per-query upstream path
+
+The upstream is a local fake (see common.fake_search_upstream) served
+in-process, so the numbers measure our own overhead rather than the network.
+
+    python benchmarks/search_benchmark.py
+"""
+
+import asyncio
+import time
+from collections import defaultdict
+
+import httpx
+from common import (
+    fake_countries,
+    fake_search_upstream,
+    format_row,
+    percentiles,
+    typeahead_queries,
+)
+
+from aind_data_transfer_ui_demo.fast_ui.search import SearchClient
+from aind_data_transfer_ui_demo.fast_ui.search_index import (
+    OptionIndex,
+    load_countries,
+)
+
+
+async def legacy_search(client: httpx.AsyncClient, q: str) -> list[dict]:
+    """The pre-index search_view: fetch, sort and group on every query"""
+    path_ends = f"name/{q}" if q else "all"
+    r = await client.get(f"/{path_ends}")
+    if r.status_code == 404:
+        return []
+    data = r.json()
+    if path_ends == "all":
+        data.sort(key=lambda x: x["population"], reverse=True)
+        data = data[0:20]
+        data.sort(key=lambda x: x["name"]["common"])
+    regions = defaultdict(list)
+    for co in data:
+        regions[co["region"]].append(
+            {"value": co["cca3"], "label": co["name"]["common"]}
+        )
+    return [{"label": k, "options": v} for k, v in regions.items()]
+
+
+async def main(n: int = 2000) -> None:
+    """Run both paths over the same typeahead queries"""
+    countries = fake_countries()
+    transport = httpx.ASGITransport(app=fake_search_upstream(countries))
+    queries = typeahead_queries(countries, n)
+
+    legacy = []
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://upstream"
+    ) as client:
+        for q in queries:
+            start = time.perf_counter()
+            await legacy_search(client, q)
+            legacy.append((time.perf_counter() - start) * 1e6)
+
+    search_client = SearchClient("http://upstream", transport=transport)
+    index = OptionIndex(await load_countries(search_client))
+    await search_client.aclose()
+    indexed = []
+    for q in queries:
+        start = time.perf_counter()
+        index.search_grouped(q)
+        indexed.append((time.perf_counter() - start) * 1e6)
+
+    print(format_row("upstream per query (legacy)", percentiles(legacy)))
+    print(format_row("in-memory index", percentiles(indexed)))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,65 @@
+"""Rerun latency of the streamlit_pydantic demo
+
+Streamlit reruns the whole script on every widget interaction, so the time
+of one rerun is the latency of typing into a field. This runs the demo
+headless with streamlit's AppTest and times the first run and reruns
+triggered by typing into the first text field of the page.
+
+    python benchmarks/streamlit_rerun_benchmark.py [--reruns 20]
+        [--script PATH]
+
+To compare with an older version of the demo, check it out to a file and
+pass it as --script, e.g.
+
+    git show <commit>:src/aind_data_transfer_ui_demo/streamlit_pydantic/demo.py
+        > /tmp/demo_before.py
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from common import format_row, percentiles
+from streamlit.testing.v1 import AppTest
+
+DEMO = (
+    Path(__file__).parent.parent
+    / "src"
+    / "aind_data_transfer_ui_demo"
+    / "streamlit_pydantic"
+    / "demo.py"
+)
+
+
+def timed_run(app: AppTest) -> float:
+    """Run the script once, in ms. Raises if the script raised."""
+    start = time.perf_counter()
+    app.run()
+    elapsed = (time.perf_counter() - start) * 1000
+    if app.exception:
+        raise RuntimeError(app.exception[0].message)
+    return elapsed
+
+
+def main() -> None:
+    """Print first run and rerun latencies"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--script", type=Path, default=DEMO)
+    args = parser.parse_args()
+
+    app = AppTest.from_file(str(args.script), default_timeout=300)
+    first = timed_run(app)
+    field = app.text_input[0]
+    print(f"typing into {field.label!r} ({len(app.text_input)} text fields)")
+    samples = []
+    for i in range(args.reruns):
+        field.input(f"value {i}")
+        samples.append(timed_run(app))
+        field = app.text_input[0]
+    print(f"first run: {first:.0f} ms")
+    print(format_row("rerun", percentiles(samples), unit="ms"))
+
+
+if __name__ == "__main__":
+    main()
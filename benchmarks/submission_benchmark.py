@@ -0,0 +1,151 @@
+"""How long operators wait to submit, with and without the local queue,
+against a slow and flaky local stand-in of aind-data-transfer-service
+
+    python benchmarks/submission_benchmark.py [--submissions 200]
+        [--latency 0.2] [--fail-first 3] [--lose-responses 2]
+
+Also checks that every upload job reaches the service exactly once even
+though some requests fail and some responses are lost.
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+from common import fake_transfer_service, format_row, percentiles
+
+from aind_data_transfer_ui_demo.jobs.store import (
+    JobFilter,
+    JobState,
+    JobStatusStore,
+)
+from aind_data_transfer_ui_demo.jobs.submission import (
+    SUBMIT_JOBS_PATH,
+    SubmissionQueue,
+    SubmissionWorker,
+)
+
+
+def submit_job_request(i: int, num_jobs: int) -> dict:
+    """Json-mode SubmitJobRequest dump with num_jobs upload jobs"""
+    return {
+        "job_type": "transform_and_upload",
+        "user_email": None,
+        "email_notification_types": ["fail"],
+        "upload_jobs": [
+            {
+                "project_name": "Benchmark Project",
+                "platform": {"abbreviation": "ecephys"},
+                "modalities": [
+                    {
+                        "modality": {"abbreviation": "ecephys"},
+                        "source": f"/data/ecephys_{100000 + i}_{j}",
+                    }
+                ],
+                "subject_id": str(100000 + i),
+                "acq_datetime": "2024-01-01T10:00:00",
+                "s3_prefix": f"ecephys_{100000 + i}_{j}",
+            }
+            for j in range(num_jobs)
+        ],
+    }
+
+
+async def direct(app, requests: list[dict]) -> list[float]:
+    """Operators POSTing straight to the service, ms per submission"""
+    samples = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://service"
+    ) as client:
+
+        async def post(request: dict) -> None:
+            """One operator submission"""
+            start = time.perf_counter()
+            await client.post(SUBMIT_JOBS_PATH, json=request)
+            samples.append((time.perf_counter() - start) * 1e3)
+
+        await asyncio.gather(*(post(r) for r in requests))
+    return samples
+
+
+async def queued(
+    app, requests: list[dict], path: str
+) -> tuple[list[float], float, SubmissionWorker]:
+    """Operators submitting through the queue. Returns ms per submission,
+    seconds until everything was sent, and the worker."""
+    status_store = JobStatusStore(path)
+    worker = SubmissionWorker(
+        SubmissionQueue(path),
+        status_store=status_store,
+        service_url="http://service",
+        base_delay=0.05,
+        transport=httpx.ASGITransport(app=app),
+    )
+    worker.start()
+    samples = []
+    start_all = time.perf_counter()
+
+    async def submit(request: dict) -> None:
+        """One operator submission"""
+        start = time.perf_counter()
+        await worker.submit(request)
+        samples.append((time.perf_counter() - start) * 1e3)
+
+    await asyncio.gather(*(submit(r) for r in requests))
+    while {"queued", "sending"} & set(worker.queue.counts()):
+        await asyncio.sleep(0.01)
+    drained = time.perf_counter() - start_all
+    await worker.stop()
+    return samples, drained, worker
+
+
+def main() -> None:
+    """Compare direct and queued submission"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--submissions", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--fail-first", type=int, default=3)
+    parser.add_argument("--lose-responses", type=int, default=2)
+    args = parser.parse_args()
+    requests = [
+        submit_job_request(i, 1 + i % 3) for i in range(args.submissions)
+    ]
+    num_jobs = sum(len(r["upload_jobs"]) for r in requests)
+
+    app = fake_transfer_service(latency=args.latency)
+    samples = asyncio.run(direct(app, requests))
+    print(format_row("direct POST", percentiles(samples), unit="ms"))
+
+    app = fake_transfer_service(
+        latency=args.latency,
+        fail_first=args.fail_first,
+        lose_responses=args.lose_responses,
+    )
+    path = os.path.join(tempfile.mkdtemp(), "job_status.db")
+    samples, drained, worker = asyncio.run(queued(app, requests, path))
+    print(format_row("queued submit", percentiles(samples), unit="ms"))
+    received = [
+        job["s3_prefix"]
+        for body in app.state.accepted.values()
+        for job in body["upload_jobs"]
+    ]
+    statuses = worker.status_store.query(
+        JobFilter(status=JobState.SUBMITTED), page_size=1
+    )[1]
+    print(
+        f"  drained in {drained:.2f}s with {app.state.requests} POSTs, "
+        f"{len(app.state.accepted)} batches accepted"
+    )
+    print(
+        f"  upload jobs: {num_jobs} queued, {len(received)} received, "
+        f"{len(set(received))} distinct, {statuses} marked submitted"
+    )
+    print(f"  queue: {worker.queue.counts()}")
+
+
+if __name__ == "__main__":
+    main()
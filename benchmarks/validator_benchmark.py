@@ -0,0 +1,76 @@
+"""Validation time of the service models with and without the shared
+validators, for single items and batches
+
+    python benchmarks/validator_benchmark.py [--number 200] [--batch 100]
+
+The validators resolve the settings sources of the model and of the
+settings models nested in it (e.g. the jobs of a request) once. The
+settings the upstream validators build internally read their sources on
+every construction either way.
+"""
+
+import argparse
+import time
+
+from aind_data_transfer_models.core import (
+    BasicUploadJobConfigs,
+    ModalityConfigs,
+    SubmitJobRequest,
+)
+
+from aind_data_transfer_ui_demo.models.validation_service import (
+    get_validator,
+)
+
+UPLOAD_JOB = dict(
+    project_name="Benchmark Project",
+    platform="ecephys",
+    modalities=[dict(modality="ecephys", source="/data/ecephys")],
+    subject_id="123456",
+    acq_datetime="2024-01-01T10:00:00",
+)
+CASES = [
+    (ModalityConfigs, UPLOAD_JOB["modalities"][0]),
+    (BasicUploadJobConfigs, UPLOAD_JOB),
+    (SubmitJobRequest, dict(upload_jobs=[UPLOAD_JOB])),
+]
+
+
+def time_per_call(fn, number: int) -> float:
+    """Mean microseconds per call"""
+    fn()
+    start = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return (time.perf_counter() - start) / number * 1e6
+
+
+def main() -> None:
+    """Print uncached/cached timings for each model"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=100)
+    args = parser.parse_args()
+    uncached = [
+        time_per_call(lambda: model(**data), args.number)
+        for model, data in CASES
+    ]
+    print(
+        f"{'model':<24} {'uncached us':>12} {'cached us':>10} {'batch us':>9}"
+    )
+    for (model, data), before in zip(CASES, uncached):
+        validator = get_validator(model)
+        after = time_per_call(lambda: validator.validate(data), args.number)
+        batch = [data] * args.batch
+        per_item = (
+            time_per_call(lambda: validator.validate_many(batch), 3)
+            / args.batch
+        )
+        print(
+            f"{model.__name__:<24} {before:>12.1f} {after:>10.1f} "
+            f"{per_item:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
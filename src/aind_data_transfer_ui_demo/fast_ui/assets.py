@@ -0,0 +1,100 @@
+"""HTML shell and frontend bundle of the FastUI app
+
+The shell every non-api path returns is rendered once and served from
+memory with an ETag. By default it loads the React bundle of
+FASTUI_PREBUILT_VERSION from FASTUI_CDN_URL, both pinned in shared.py
+rather than read from fastui's private attributes. Once the bundle has been
+vendored with vendor_assets.py (e.g. for the acquisition network, which
+can't reach the CDN), the shell points at /assets/fastui/{version}/
+instead, where the bundle is served from memory, precompressed and with
+immutable cache headers. The version is part of the url, so changing it
+changes every asset url.
+"""
+
+import html
+import mimetypes
+from functools import cache
+from pathlib import Path
+from typing import Optional
+
+from aind_data_transfer_ui_demo.fast_ui.shared import (
+    APP_TITLE,
+    FASTUI_ASSETS_DIR,
+    FASTUI_CDN_URL,
+    FASTUI_PREBUILT_VERSION,
+)
+from aind_data_transfer_ui_demo.static_assets import (
+    ENCODING_SUFFIXES,
+    StaticAsset,
+    read_asset,
+)
+
+PREBUILT_VERSION = FASTUI_PREBUILT_VERSION
+ASSETS_URL = "/assets/fastui"
+# the files the shell links to
+ENTRY_POINTS = ("index.js", "index.css")
+# same page as fastui.prebuilt_html, but with the bundle url pinned here
+SHELL = """\
+<!doctype html>
+<html lang="en">
+  <head>
+    <meta charset="UTF-8" />
+    <meta name="viewport" content="width=device-width, initial-scale=1.0" />
+    <title>{title}</title>
+    <script type="module" crossorigin src="{url}/index.js"></script>
+    <link rel="stylesheet" crossorigin href="{url}/index.css">
+  </head>
+  <body>
+    <div id="root"></div>
+  </body>
+</html>
+"""
+
+
+def vendored_dir(folder: Path = FASTUI_ASSETS_DIR) -> Path:
+    """Where the bundle of PREBUILT_VERSION is vendored to"""
+    return folder / PREBUILT_VERSION
+
+
+def is_vendored(folder: Path = FASTUI_ASSETS_DIR) -> bool:
+    """Whether the bundle has been vendored"""
+    return all((vendored_dir(folder) / f).is_file() for f in ENTRY_POINTS)
+
+
+@cache
+def landing_page() -> StaticAsset:
+    """The HTML shell, using the vendored bundle if there is one"""
+    url = FASTUI_CDN_URL
+    if is_vendored():
+        url = f"{ASSETS_URL}/{PREBUILT_VERSION}"
+    page = SHELL.format(title=html.escape(APP_TITLE), url=url)
+    return StaticAsset.build(page.encode(), "text/html; charset=utf-8")
+
+
+@cache
+def bundle_files() -> dict[str, Path]:
+    """Files of the vendored bundle by path relative to its directory. Only
+    these are served, so no path from a request reaches the filesystem."""
+    folder = vendored_dir()
+    if not folder.is_dir():
+        return {}
+    compressed = tuple(ENCODING_SUFFIXES.values())
+    return {
+        path.relative_to(folder).as_posix(): path
+        for path in folder.rglob("*")
+        if path.is_file() and not path.name.endswith(compressed)
+    }
+
+
+def bundle_asset(name: str) -> Optional[StaticAsset]:
+    """A file of the vendored bundle, or None"""
+    path = bundle_files().get(name)
+    return None if path is None else _read_bundle_file(path)
+
+
+@cache
+def _read_bundle_file(path: Path) -> StaticAsset:
+    """Asset for a bundle file, read on first use. Only called with paths
+    from bundle_files(), so the cache is bounded."""
+    media_type, _ = mimetypes.guess_type(path.name)
+    return read_asset(path, media_type or "application/octet-stream")
@@ -0,0 +1,252 @@
+"""Bounded executor for cpu-bound work done on behalf of requests
+
+Validating and serializing a large SubmitJobRequest takes long enough to
+stall every other client if it runs on the event loop. Routes hand that
+work to a thread or process pool instead. The number of interactive calls
+waiting or running is capped: past the cap, run() raises ExecutorSaturated
+(served as a 429) rather than letting the backlog and tail latency grow.
+Batch endpoints, which run one call per job, are admitted separately: at
+most max_batch of their calls are in the pool at a time, the rest wait
+outside it without counting against the interactive cap. A large batch is
+throttled instead of turning interactive clients away.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from typing import Any, Callable, Literal, Optional, TypeVar
+
+import pydantic
+from fastapi import Depends, HTTPException, Request
+from fastui.forms import unflatten
+
+from aind_data_transfer_ui_demo.fast_ui.metrics import span
+from aind_data_transfer_ui_demo.fast_ui.shared import (
+    EXECUTOR_KIND,
+    EXECUTOR_MAX_BATCH,
+    EXECUTOR_MAX_PENDING,
+    EXECUTOR_MAX_WORKERS,
+)
+
+T = TypeVar("T")
+M = TypeVar("M", bound=pydantic.BaseModel)
+
+
+class ExecutorSaturated(HTTPException):
+    """Raised when an executor already has max_pending calls. Served as a
+    429 asking clients to retry once the backlog has cleared."""
+
+    def __init__(self, retry_after: int = 1):
+        """retry_after is the number of seconds suggested to clients"""
+        super().__init__(
+            status_code=429,
+            detail="Too many requests are being processed",
+            headers={"Retry-After": str(retry_after)},
+        )
+        self.retry_after = retry_after
+
+
+def _timed_call(fn: Callable[..., T], *args: Any) -> tuple[float, T]:
+    """Runs fn in the worker, returning its wall clock start time too.
+    Module level so it can be sent to worker processes."""
+    return time.time(), fn(*args)
+
+
+class BoundedExecutor:
+    """Thread or process pool with a cap on pending calls and metrics on
+    how long calls wait for a worker"""
+
+    def __init__(
+        self,
+        kind: Literal["thread", "process"] = "thread",
+        max_workers: Optional[int] = None,
+        max_pending: int = 64,
+        max_batch: Optional[int] = None,
+        window: int = 1024,
+    ):
+        """
+        Parameters
+        ----------
+        kind : "thread" | "process"
+          Pool type. Processes validate in parallel, threads avoid pickling
+          and worker start-up. Worker processes are spawned rather than
+          forked, the server's threads already exist when the pool starts.
+        max_workers : int | None
+          Pool size, defaults to the pool's own default
+        max_pending : int
+          Maximum number of interactive calls waiting for or running on a
+          worker
+        max_batch : int | None
+          Maximum number of batch calls (run with wait) waiting for or
+          running on a worker, defaults to max_workers or the number of
+          CPUs
+        window : int
+          Number of recent queue wait times kept for the metrics
+        """
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.max_batch = max_batch or max_workers or os.cpu_count() or 1
+        self._pool: Optional[Executor] = None
+        self._pending = 0
+        self._batch_pending = 0
+        self._batch_waiting = 0
+        self._batch_slots: Optional[asyncio.Semaphore] = None
+        self._waits: deque[float] = deque(maxlen=window)
+        self.completed = 0
+        self.rejected = 0
+
+    @property
+    def pool(self) -> Executor:
+        """Underlying pool, created on first use"""
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = ProcessPoolExecutor(
+                    self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self._pool = ThreadPoolExecutor(
+                    self.max_workers, thread_name_prefix="validation"
+                )
+        return self._pool
+
+    @property
+    def batch_slots(self) -> asyncio.Semaphore:
+        """Semaphore admitting batch calls to the pool"""
+        if self._batch_slots is None:
+            self._batch_slots = asyncio.Semaphore(self.max_batch)
+        return self._batch_slots
+
+    async def _call(self, fn: Callable[..., T], *args: Any) -> T:
+        """Runs fn(*args) in the pool, recording how long it queued"""
+        loop = asyncio.get_running_loop()
+        submitted = time.time()
+        started, result = await loop.run_in_executor(
+            self.pool, _timed_call, fn, *args
+        )
+        self._waits.append(max(0.0, started - submitted))
+        self.completed += 1
+        return result
+
+    async def run(
+        self, fn: Callable[..., T], *args: Any, wait: bool = False
+    ) -> T:
+        """
+        Runs fn(*args) in the pool.
+
+        Raises ExecutorSaturated if max_pending interactive calls are
+        already pending. With wait (batch endpoints), waits for one of
+        max_batch batch slots instead, outside the pool and without
+        counting against max_pending.
+        """
+        if wait:
+            return await self._run_batch(fn, *args)
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            raise ExecutorSaturated()
+        self._pending += 1
+        try:
+            return await self._call(fn, *args)
+        finally:
+            self._pending -= 1
+
+    async def _run_batch(self, fn: Callable[..., T], *args: Any) -> T:
+        """Runs fn(*args) in the pool once a batch slot is free"""
+        slots = self.batch_slots
+        self._batch_waiting += 1
+        try:
+            await slots.acquire()
+        finally:
+            self._batch_waiting -= 1
+        self._batch_pending += 1
+        try:
+            return await self._call(fn, *args)
+        finally:
+            self._batch_pending -= 1
+            slots.release()
+
+    def stats(self) -> dict[str, Any]:
+        """Json-able snapshot of load and queue wait times (ms)"""
+        waits = sorted(self._waits)
+
+        def pick(p: float) -> Optional[float]:
+            """Nearest-rank percentile of the recent waits"""
+            if not waits:
+                return None
+            wait = waits[min(len(waits) - 1, int(p * len(waits)))]
+            return round(wait * 1e3, 3)
+
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "max_batch": self.max_batch,
+            "batch_pending": self._batch_pending,
+            "batch_waiting": self._batch_waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "queue_wait_ms": {
+                "n": len(waits),
+                "p50": pick(0.50),
+                "p95": pick(0.95),
+                "p99": pick(0.99),
+                "max": pick(1.0),
+            },
+        }
+
+    def shutdown(self) -> None:
+        """Stop the workers, dropping calls that have not started"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        self._batch_slots = None
+
+
+validation_executor = BoundedExecutor(
+    kind=EXECUTOR_KIND,
+    max_workers=EXECUTOR_MAX_WORKERS,
+    max_pending=EXECUTOR_MAX_PENDING,
+    max_batch=EXECUTOR_MAX_BATCH,
+)
+
+
+def _validate_form(
+    model: type[M], data: dict
+) -> tuple[Optional[M], Optional[list]]:
+    """(model, None) or (None, errors), errors as fastui_form reports them.
+    Exceptions are not raised since ValidationError can't be pickled."""
+    try:
+        return model.model_validate(data), None
+    except pydantic.ValidationError as e:
+        return None, e.errors(
+            include_input=False, include_url=False, include_context=False
+        )
+
+
+def offloaded_form(model: type[M]) -> Any:
+    """Drop-in for fastui.forms.fastui_form that validates the submitted
+    form in the validation executor instead of on the event loop"""
+
+    async def run_offloaded_form(request: Request) -> M:
+        """Parse the form on the loop, validate it in the executor"""
+        with span("form_parsing"):
+            async with request.form() as form_data:
+                model_data = unflatten(form_data)
+        with span("form_validation"):
+            form, errors = await validation_executor.run(
+                _validate_form, model, model_data
+            )
+        if errors is not None:
+            raise HTTPException(status_code=422, detail={"form": errors})
+        return form
+
+    return Depends(run_offloaded_form)
@@ -0,0 +1,65 @@
+"""Logging setup of the FastUI server
+
+The app's loggers (aind_data_transfer_ui_demo.*) get their own handler at
+AIND_LOG_LEVEL, leaving uvicorn's loggers alone. With AIND_LOG_FORMAT=json
+every record is one json object, including the fields passed with
+extra={...}, e.g.
+
+    logger.debug("Form page", extra={"form_type": form_type})
+
+Hot paths log at DEBUG with lazy %-style arguments, so at the default INFO
+level they cost a level check and nothing is formatted.
+"""
+
+import json
+import logging
+from datetime import datetime, timezone
+
+from aind_data_transfer_ui_demo.fast_ui.shared import LOG_FORMAT, LOG_LEVEL
+
+LOGGER_NAME = "aind_data_transfer_ui_demo"
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+# attributes every LogRecord has, anything else came from extra
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {
+    "message",
+    "asctime",
+}
+
+
+class JSONFormatter(logging.Formatter):
+    """Formats records as one json object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Record as json, with its extra fields"""
+        entry = {
+            "time": datetime.fromtimestamp(
+                record.created, timezone.utc
+            ).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(
+            (key, value)
+            for key, value in vars(record).items()
+            if key not in _RECORD_ATTRIBUTES
+        )
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(
+    level: str = LOG_LEVEL, log_format: str = LOG_FORMAT
+) -> None:
+    """Send the app's log records to stderr at level"""
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(level)
+    handler = logging.StreamHandler()
+    handler.setFormatter(
+        JSONFormatter()
+        if log_format == "json"
+        else logging.Formatter(TEXT_FORMAT)
+    )
+    logger.handlers = [handler]
+    logger.propagate = False
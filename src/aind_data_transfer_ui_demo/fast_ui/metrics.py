@@ -0,0 +1,244 @@
+"""Request metrics in the Prometheus text format
+
+MetricsMiddleware times every http request into a latency histogram by
+method, route template and status. span() times the phases of the hot
+paths (schema generation, form parsing and validation,
+process_and_validate_form_data, serialization) into a second histogram by
+route and phase, so a slow route can be broken down. Both are served by
+/metrics for Prometheus to scrape.
+
+Spans only hold a reference to the current request's list through a
+context variable, which AnyIO copies into the worker threads of sync
+routes. Work sent to the validation executor is timed from the route,
+queue wait included (see /api/executor for the wait alone).
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional, Sequence
+
+from starlette.datastructures import Headers
+from starlette.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from aind_data_transfer_ui_demo.fast_ui.profiling import SamplingProfiler
+
+# seconds
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+PROFILE_HEADER = "x-profile"
+# route label when there is no route template (404s, static mounts), and
+# of spans outside requests
+UNMATCHED = "unmatched"
+
+
+class Histogram:
+    """Cumulative histogram with labels, safe to observe from any thread"""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str],
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        """name and documentation are the metric's name and HELP text"""
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        # labels -> (count per bucket, then +Inf), sum
+        self._series: dict[tuple[str, ...], tuple[list[int], float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Record a value for the series of labels"""
+        # first bucket with value <= its upper bound, or +Inf
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._series.get(
+                labels, ([0] * (len(self.buckets) + 1), 0.0)
+            )
+            counts[index] += 1
+            self._series[labels] = (counts, total + value)
+
+    def render(self) -> list[str]:
+        """Lines of the histogram in the Prometheus text format"""
+        with self._lock:
+            series = {k: (list(c), s) for k, (c, s) in self._series.items()}
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        bounds = [repr(float(b)) for b in self.buckets] + ["+Inf"]
+        for labels, (counts, total) in sorted(series.items()):
+            pairs = [
+                f'{name}="{_escape(value)}"'
+                for name, value in zip(self.label_names, labels)
+            ]
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                le = ",".join([*pairs, f'le="{bound}"'])
+                lines.append(f"{self.name}_bucket{{{le}}} {cumulative}")
+            label_text = ",".join(pairs)
+            lines.append(f"{self.name}_sum{{{label_text}}} {total!r}")
+            lines.append(f"{self.name}_count{{{label_text}}} {cumulative}")
+        return lines
+
+    def clear(self) -> None:
+        """Drop every series"""
+        with self._lock:
+            self._series.clear()
+
+
+def _escape(value: str) -> str:
+    """Label value escaped for the text format"""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+request_seconds = Histogram(
+    "http_request_duration_seconds",
+    "Time to answer http requests, by route template",
+    ["method", "route", "status"],
+)
+phase_seconds = Histogram(
+    "request_phase_duration_seconds",
+    "Time spent in phases of the hot paths, by route template",
+    ["route", "phase"],
+)
+HISTOGRAMS = (request_seconds, phase_seconds)
+
+# (phase, seconds) of the spans of the current request
+_request_spans: ContextVar[Optional[list[tuple[str, float]]]] = ContextVar(
+    "request_spans", default=None
+)
+
+
+@contextmanager
+def span(phase: str) -> Iterator[None]:
+    """Time a phase of the current request, recorded under its route once
+    the request is done. Outside requests it is recorded right away."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        spans = _request_spans.get()
+        if spans is None:
+            phase_seconds.observe(elapsed, UNMATCHED, phase)
+        else:
+            spans.append((phase, elapsed))
+
+
+def route_template(scope: Scope) -> str:
+    """Path template of the route that handled a request, e.g.
+    /api/forms/{form_type}, so labels don't grow with every path"""
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return UNMATCHED
+    # depending on the FastAPI version, the route of an included router
+    # has its path with or without the router's prefix. The prefix is
+    # whatever precedes the part of the path the route matched.
+    path_format = getattr(route, "path_format", template)
+    try:
+        matched = path_format.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return template
+    path = scope["path"]
+    if not path.endswith(matched):
+        return template
+    return path[: len(path) - len(matched)] + template
+
+
+def render_metrics() -> str:
+    """Every histogram in the Prometheus text format"""
+    return "".join(
+        f"{line}\n" for histogram in HISTOGRAMS for line in histogram.render()
+    )
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing requests and their spans, and profiling the
+    requests sent with an X-Profile header if profiling is enabled"""
+
+    def __init__(self, app: ASGIApp, profiling: bool = False):
+        """Wraps app, profiling enables the X-Profile header"""
+        self.app = app
+        self.profiling = profiling
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """Time the request, or answer with its profile"""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if self.profiling and PROFILE_HEADER in Headers(scope=scope):
+            await self._profile(scope, receive, send)
+            return
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            """Note the status of the response"""
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        spans = []
+        token = _request_spans.set(spans)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_spans.reset(token)
+            route = route_template(scope)
+            request_seconds.observe(
+                elapsed, scope["method"], route, str(status)
+            )
+            for phase, seconds in spans:
+                phase_seconds.observe(seconds, route, phase)
+
+    async def _profile(self, scope: Scope, receive: Receive, send: Send):
+        """Run the request under the profiler, answer with the stacks"""
+        status = None
+
+        async def discard(message: Message) -> None:
+            """Drop the actual response, noting its status"""
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        profiler = SamplingProfiler()
+        profiler.start()
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            profiler.stop()
+        response = PlainTextResponse(
+            profiler.folded(),
+            headers={
+                "X-Profile-Samples": str(profiler.samples),
+                "X-Profiled-Status": str(status),
+            },
+        )
+        await response(scope, receive, send)
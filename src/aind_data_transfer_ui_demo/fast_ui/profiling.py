@@ -0,0 +1,80 @@
+"""Sampling profiler for single requests
+
+When profiling is enabled (AIND_PROFILING=1), a request sent with an
+X-Profile header is run under SamplingProfiler and answered with the
+sampled stacks instead of its response, e.g.
+
+    curl -H "X-Profile: 1" localhost:8000/api/forms/SubmitJobRequest \
+        > profile.folded
+
+The output is in the folded format read by flamegraph.pl and speedscope,
+one line per distinct stack, rooted at the thread name. Every thread but
+the sampler's is sampled, so time the event loop spends waiting shows up
+as selector frames, and sync routes show up in the AnyIO worker threads.
+"""
+
+import sys
+import threading
+from collections import Counter
+from types import FrameType
+from typing import Optional
+
+# seconds between samples
+SAMPLE_INTERVAL = 0.001
+
+
+def _fold(frame: Optional[FrameType]) -> list[str]:
+    """Frames of a stack, outermost first"""
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        frames.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+        frame = frame.f_back
+    frames.reverse()
+    return frames
+
+
+class SamplingProfiler:
+    """Samples the stacks of every other thread from a background thread"""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        """interval is the number of seconds between samples"""
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        """Record the current stack of each thread"""
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == threading.get_ident():
+                continue
+            name = names.get(ident, str(ident))
+            self.stacks[";".join([name, *_fold(frame)])] += 1
+        self.samples += 1
+
+    def _run(self) -> None:
+        """Sample until stopped"""
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> None:
+        """Start sampling"""
+        self._thread = threading.Thread(
+            target=self._run, name="profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def folded(self) -> str:
+        """Sampled stacks in the folded format, most frequent first"""
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        )
@@ -0,0 +1,169 @@
+"""Serialization and caching of FastUI component trees.
+
+Building a component tree for a form means generating the JSON schema of
+its model, which is expensive for the full aind-data-transfer-models. Trees
+that only depend on static inputs are rendered once, cached as bytes, and
+served with an ETag so clients can revalidate cheaply.
+
+Larger static payloads (e.g. json schemas) are compressed once as well, see
+static_assets.py, and served in whichever encoding the client accepts.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from typing import Callable, Hashable, Optional, Sequence
+
+from fastapi import Request, Response
+from fastui import AnyComponent
+from pydantic_core import to_json
+
+from aind_data_transfer_ui_demo.fast_ui.metrics import span
+from aind_data_transfer_ui_demo.static_assets import StaticAsset
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+@dataclass(frozen=True)
+class RenderedJSON:
+    """Serialized component tree and its ETag"""
+
+    body: bytes
+    etag: str
+
+
+def render_components(components: list[AnyComponent]) -> RenderedJSON:
+    """Serialize components the same way as response_model=FastUI with
+    response_model_exclude_none=True"""
+    return rendered_json(components_json(components))
+
+
+def components_json(components: list[AnyComponent]) -> bytes:
+    """
+    Serialize components like response_model=FastUI with
+    response_model_exclude_none=True does, but without validating them
+    against the FastUI union first. Only for trees built by the app itself,
+    each component already validated itself when it was created.
+    """
+    return to_json(components, by_alias=True, exclude_none=True)
+
+
+class FastUIResponse(Response):
+    """
+    Opt-in response for routes declared with response_model=FastUI that
+    return a component list built by the app: wrap it, e.g.
+    `return FastUIResponse(page(...))`. Returning a Response skips FastAPI's
+    response model validation, and the list is serialized with
+    components_json(). The response_model still documents the route.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: list[AnyComponent]) -> bytes:
+        """Serialize the components"""
+        with span("serialization"):
+            return components_json(content)
+
+
+def rendered_json(body: bytes) -> RenderedJSON:
+    """RenderedJSON for already serialized json, tagged with its hash"""
+    return RenderedJSON(
+        body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    )
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches etag (weak comparison)"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in (tag.removeprefix("W/") for tag in tags)
+
+
+def json_response(
+    request: Request,
+    rendered: RenderedJSON,
+    cache_control: str = "no-cache",
+) -> Response:
+    """Response for rendered json, or a 304 if the client's copy is current.
+    The default "no-cache" lets clients keep a copy but revalidate it."""
+    headers = {"ETag": rendered.etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), rendered.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=rendered.body, media_type="application/json", headers=headers
+    )
+
+
+class ComponentCache:
+    """
+    Rendered component trees keyed by view, built on first use and kept for
+    the life of the process. Trees must only depend on their key and on
+    code, call clear() to rebuild them (e.g. after reloading a model).
+    """
+
+    def __init__(self):
+        """Creates an empty cache"""
+        self._entries: dict[Hashable, RenderedJSON] = {}
+
+    def get(
+        self, key: Hashable, build: Callable[[], list[AnyComponent]]
+    ) -> RenderedJSON:
+        """Returns the rendered tree for key, building it with build() if
+        it is missing"""
+        rendered = self._entries.get(key)
+        if rendered is None:
+            with span("schema_generation"):
+                rendered = render_components(build())
+            self._entries[key] = rendered
+        return rendered
+
+    def clear(self) -> None:
+        """Drop every cached tree"""
+        self._entries.clear()
+
+
+def accepted_encoding(
+    accept_encoding: Optional[str], available: Sequence[str]
+) -> Optional[str]:
+    """Preferred available encoding the client accepts, br first"""
+    weights = {}
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.partition(";")
+        name, _, value = params.strip().partition("=")
+        try:
+            weight = float(value) if name.strip() == "q" else 1.0
+        except ValueError:
+            weight = 0.0
+        weights[coding.strip().lower()] = weight
+    for encoding in ("br", "gzip"):
+        if encoding in available and weights.get(
+            encoding, weights.get("*", 0.0)
+        ):
+            return encoding
+    return None
+
+
+def asset_response(
+    request: Request,
+    asset: StaticAsset,
+    cache_control: str = IMMUTABLE,
+    headers: Optional[dict[str, str]] = None,
+) -> Response:
+    """Response for an asset in the best encoding the client accepts, or a
+    304 if the client's copy is current"""
+    encoding = accepted_encoding(
+        request.headers.get("accept-encoding"), list(asset.encoded)
+    )
+    headers = {
+        **(headers or {}),
+        "ETag": asset.etag(encoding),
+        "Cache-Control": cache_control,
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    body = asset.body
+    if encoding is not None:
+        body = asset.encoded[encoding]
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=asset.media_type, headers=headers)
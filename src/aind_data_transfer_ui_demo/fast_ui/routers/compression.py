@@ -0,0 +1,124 @@
+"""Compression sampling page, to decide compress_raw_data for a source"""
+
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastui import FastUI
+from fastui import components as c
+from fastui.components.display import DisplayLookup
+from pydantic import BaseModel, Field
+
+from aind_data_transfer_ui_demo.fast_ui.executor import (
+    offloaded_form,
+    validation_executor,
+)
+from aind_data_transfer_ui_demo.fast_ui.rendering import (
+    FastUIResponse,
+    json_response,
+    rendered_json,
+)
+from aind_data_transfer_ui_demo.fast_ui.shared import page_json
+from aind_data_transfer_ui_demo.jobs.compression import (
+    CHUNK_BYTES,
+    MB,
+    CodecResult,
+    CompressionSample,
+    sample_compression,
+)
+from aind_data_transfer_ui_demo.jobs.preflight import SOURCE_ROOTS
+
+router = APIRouter()
+
+
+class CompressionForm(BaseModel):
+    """Source to sample and how much of it to read"""
+
+    source: str = Field(
+        ...,
+        title="Source",
+        description="Folder below one of the server's source roots",
+    )
+    sample_mb: int = Field(16, title="Sample MB", ge=1, le=256)
+    files: int = Field(16, title="Files", ge=1, le=256)
+    seed: Optional[int] = Field(
+        default=None, title="Seed", description="For a reproducible sample"
+    )
+
+
+async def run_sample(form: CompressionForm) -> CompressionSample:
+    """sample_compression of the form in the validation executor, with
+    unreadable sources as form errors. Only sources below the roots the
+    preflight accepts are read, others get the same error whether or not
+    they exist."""
+    try:
+        return await validation_executor.run(
+            sample_compression,
+            form.source,
+            form.sample_mb * MB,
+            CHUNK_BYTES,
+            form.files,
+            form.seed,
+            SOURCE_ROOTS,
+        )
+    except (OSError, ValueError) as e:
+        error = {"type": "value_error", "loc": ["source"], "msg": str(e)}
+        raise HTTPException(status_code=422, detail={"form": [error]})
+
+
+@router.get("", response_model=FastUI, response_model_exclude_none=True)
+def compression_page(request: Request) -> Response:
+    """
+    Compression sampling page, the frontend will fetch this when the user
+    visits `/compression`.
+    """
+    body = page_json(
+        c.Paragraph(
+            text=(
+                "Compresses a random sample of a source with several codecs "
+                "to tell whether compress_raw_data is worth it."
+            )
+        ),
+        c.ModelForm(
+            model=CompressionForm,
+            submit_url="/api/compression",
+            display_mode="page",
+        ),
+        title="Compression",
+    )
+    return json_response(request, rendered_json(body))
+
+
+@router.post("", response_model=FastUI, response_model_exclude_none=True)
+async def compression_form_post(
+    form: Annotated[CompressionForm, offloaded_form(CompressionForm)],
+) -> FastUIResponse:
+    """Samples the source and shows the codec results"""
+    sample = await run_sample(form)
+    verdict = "Compress" if sample.compress else "Don't compress"
+    return FastUIResponse(
+        [
+            c.Heading(text=f"{verdict}: {sample.reason}", level=3),
+            c.Paragraph(
+                text=(
+                    f"{sample.files} files, "
+                    f"{sample.sampled_bytes / MB:.1f} MB sampled"
+                )
+            ),
+            c.Table(
+                data=sample.results,
+                data_model=CodecResult,
+                columns=[
+                    DisplayLookup(field="codec"),
+                    DisplayLookup(field="ratio"),
+                    DisplayLookup(field="mb_per_second"),
+                    DisplayLookup(field="output_bytes"),
+                ],
+            ),
+        ]
+    )
+
+
+@router.post("/sample")
+async def compression_sample(form: CompressionForm) -> CompressionSample:
+    """Same as the form, as json for scripts"""
+    return await run_sample(form)
@@ -1,23 +1,30 @@
-from collections import defaultdict
+import logging
+import uuid
 from typing import Annotated, Literal, TypeAlias
 
-import requests
 from aind_data_transfer_models.core import (
     BasicUploadJobConfigs,
     SubmitJobRequest,
 )
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Request, Response
 from fastui import AnyComponent, FastUI
 from fastui import components as c
-from fastui.events import GoToEvent, PageEvent
-from fastui.forms import SelectSearchResponse, fastui_form
+from fastui.events import PageEvent
+from fastui.forms import SelectSearchResponse
+from pydantic import BaseModel
 
+from aind_data_transfer_ui_demo.fast_ui.executor import offloaded_form, validation_executor
+from aind_data_transfer_ui_demo.fast_ui.metrics import span
+from aind_data_transfer_ui_demo.fast_ui.rendering import ComponentCache, FastUIResponse, json_response
+from aind_data_transfer_ui_demo.fast_ui.search_index import country_index
 from aind_data_transfer_ui_demo.fast_ui.shared import page
 from aind_data_transfer_ui_demo.models.simple import LoginForm, SelectForm
 from aind_data_transfer_ui_demo.models.modality_configs import ModalityConfigsFastUI
 from aind_data_transfer_ui_demo.models.basic_upload_job_configs import BasicUploadJobConfigsFastUI
 from aind_data_transfer_ui_demo.models.submit_job_request import SubmitJobRequestFastUI
 
+logger = logging.getLogger(__name__)
+
 ## FORMS #######################
 router = APIRouter()
 FormType: TypeAlias = Literal[
@@ -28,35 +35,39 @@ FormType: TypeAlias = Literal[
     # Attempt to render full versions (unchanged from aind-data-transfer-models)
     'BasicUploadJobConfigs', 'SubmitJobRequest',
 ]
+# forms only depend on their form_type, so render each page once
+form_cache = ComponentCache()
 
 @router.get('/search', response_model=SelectSearchResponse)
 async def search_view(request: Request, q: str) -> SelectSearchResponse:
-    path_ends = f'name/{q}' if q else 'all'
-    r = requests.get(
-        url=f'https://restcountries.com/v3.1/{path_ends}',
-    )
-    if r.status_code == 404:
-        options = []
-    else:
-        r.raise_for_status()
-        data = r.json()
-        if path_ends == 'all':
-            # if we got all, filter to the 20 most populous countries
-            data.sort(key=lambda x: x['population'], reverse=True)
-            data = data[0:20]
-            data.sort(key=lambda x: x['name']['common'])
-
-        regions = defaultdict(list)
-        for co in data:
-            regions[co['region']].append({'value': co['cca3'], 'label': co['name']['common']})
-        options = [{'label': k, 'options': v} for k, v in regions.items()]
+    # answered from the in-memory option index (see fast_ui/search_index.py)
+    index = await country_index.get()
+    options = index.search_grouped(q)
     return SelectSearchResponse(options=options)
 
 @router.get('/{form_type}', response_model=FastUI, response_model_exclude_none=True)
-def forms_view(form_type: FormType) -> list[AnyComponent]:
+def forms_view(request: Request, form_type: FormType) -> Response:
     """Display the forms page as a tabbed view.
     """
-    print(form_type)
+    logger.debug('Form page %s', form_type, extra={'form_type': form_type})
+    rendered = form_cache.get(
+        ('page', form_type), lambda: build_forms_page(form_type)
+    )
+    return json_response(request, rendered)
+
+
+@router.get('/content/{form_type}', response_model=FastUI, response_model_exclude_none=True)
+def form_content(request: Request, form_type: FormType) -> Response:
+    '''Return the form content for the given form_type.'''
+    logger.debug('Form content %s', form_type, extra={'form_type': form_type})
+    rendered = form_cache.get(
+        ('content', form_type), lambda: build_form_content(form_type)
+    )
+    return json_response(request, rendered)
+
+
+def build_forms_page(form_type: FormType) -> list[AnyComponent]:
+    """Builds the tabbed forms page with the given form_type selected."""
     return page(
         c.LinkList(
             links=[
@@ -104,16 +115,14 @@ def forms_view(form_type: FormType) -> list[AnyComponent]:
         c.ServerLoad(
             path='/forms/content/{form_type}',
             load_trigger=PageEvent(name='change-form'),
-            components=form_content(form_type),
+            components=build_form_content(form_type),
         ),
         title='Forms',
     )
 
 
-@router.get('/content/{form_type}', response_model=FastUI, response_model_exclude_none=True)
-def form_content(form_type: FormType):
-    '''Return the form content for the given form_type.'''
-    print(form_type)
+def build_form_content(form_type: FormType) -> list[AnyComponent]:
+    '''Builds the form content for the given form_type.'''
     match form_type:
         case 'login':
             return [
@@ -164,63 +173,66 @@ def form_content(form_type: FormType):
 
 # POST METHODS for Submit actions for each form ############################
 @router.post('/login', response_model=FastUI, response_model_exclude_none=True)
-async def login_form_post(form: Annotated[LoginForm, fastui_form(LoginForm)]):
-    print(form)
-    form_json = form.model_dump_json( indent=3)
-    return display_submitted_form_data(form_json)
+async def login_form_post(form: Annotated[LoginForm, offloaded_form(LoginForm)]):
+    logger.debug('Submitted %r', form, extra={'form': type(form).__name__})
+    form_json, _ = await process_form(form)
+    return FastUIResponse(display_submitted_form_data(form_json))
 
 @router.post('/select', response_model=FastUI, response_model_exclude_none=True)
-async def select_form_post(form: Annotated[SelectForm, fastui_form(SelectForm)]):
-    print(form)
-    form_json = form.model_dump_json( indent=3)
-    return display_submitted_form_data(form_json)
+async def select_form_post(form: Annotated[SelectForm, offloaded_form(SelectForm)]):
+    logger.debug('Submitted %r', form, extra={'form': type(form).__name__})
+    form_json, _ = await process_form(form)
+    return FastUIResponse(display_submitted_form_data(form_json))
 
 # Attempt to submit trimmed versions (validates with full version from aind-data-transfer-models)
 @router.post('/ModalityConfigsFastUI', response_model=FastUI, response_model_exclude_none=True)
-async def modality_configs_fast_ui_form_post(form: Annotated[ModalityConfigsFastUI, fastui_form(ModalityConfigsFastUI)]):
-    form_json = form.model_dump_json(indent=3)
-    submit_json = None
-    try:
-        submit_json = form.process_and_validate_form_data()
-    except Exception as e:
-        print(repr(e))
-    return display_submitted_form_data(form_json, submit_json)
+async def modality_configs_fast_ui_form_post(form: Annotated[ModalityConfigsFastUI, offloaded_form(ModalityConfigsFastUI)]):
+    form_json, submit_json = await process_form(form)
+    # a modality on its own is not a job, so there is nothing to submit
+    return FastUIResponse(display_submitted_form_data(form_json, submit_json, submittable=False))
 
 @router.post('/BasicUploadJobConfigsFastUI', response_model=FastUI, response_model_exclude_none=True)
-async def basic_upload_job_configs_fast_ui_form_post(form: Annotated[BasicUploadJobConfigsFastUI, fastui_form(BasicUploadJobConfigsFastUI)]):
-    form_json = form.model_dump_json(indent=3)
-    submit_json = None
-    try:
-        submit_json = form.process_and_validate_form_data()
-    except Exception as e:
-        print(repr(e))
-    return display_submitted_form_data(form_json, submit_json)
+async def basic_upload_job_configs_fast_ui_form_post(form: Annotated[BasicUploadJobConfigsFastUI, offloaded_form(BasicUploadJobConfigsFastUI)]):
+    form_json, submit_json = await process_form(form)
+    return FastUIResponse(display_submitted_form_data(form_json, submit_json))
 
 @router.post('/SubmitJobRequestFastUI', response_model=FastUI, response_model_exclude_none=True)
-async def submit_job_request_fast_ui_form_post(form: Annotated[SubmitJobRequestFastUI, fastui_form(SubmitJobRequestFastUI)]):
-    form_json = form.model_dump_json(indent=3)
-    submit_json = None
-    try:
-        submit_json = form.process_and_validate_form_data()
-    except Exception as e:
-        print(repr(e))
-    return display_submitted_form_data(form_json, submit_json)
+async def submit_job_request_fast_ui_form_post(form: Annotated[SubmitJobRequestFastUI, offloaded_form(SubmitJobRequestFastUI)]):
+    form_json, submit_json = await process_form(form)
+    return FastUIResponse(display_submitted_form_data(form_json, submit_json))
 
 # Attempt to submit full versions (unchanged from aind-data-transfer-models)
 @router.post('/BasicUploadJobConfigs', response_model=FastUI, response_model_exclude_none=True)
-async def basic_upload_job_configs_form_post(form: Annotated[BasicUploadJobConfigs, fastui_form(BasicUploadJobConfigs)]):
-    print(form)
-    form_json = form.model_dump_json(indent=3)
-    return display_submitted_form_data(form_json)
+async def basic_upload_job_configs_form_post(form: Annotated[BasicUploadJobConfigs, offloaded_form(BasicUploadJobConfigs)]):
+    logger.debug('Submitted %r', form, extra={'form': type(form).__name__})
+    form_json, _ = await process_form(form)
+    return FastUIResponse(display_submitted_form_data(form_json))
 
 @router.post('/SubmitJobRequest', response_model=FastUI, response_model_exclude_none=True)
-async def submit_job_request_form_post(form: Annotated[SubmitJobRequest, fastui_form(SubmitJobRequest)]):
-    print(form)
-    form_json = form.model_dump_json(indent=3)
-    return display_submitted_form_data(form_json)
+async def submit_job_request_form_post(form: Annotated[SubmitJobRequest, offloaded_form(SubmitJobRequest)]):
+    logger.debug('Submitted %r', form, extra={'form': type(form).__name__})
+    form_json, _ = await process_form(form)
+    return FastUIResponse(display_submitted_form_data(form_json))
 
 # Helper methods ###########################################################
-def display_submitted_form_data(form_json: str, submit_json=None) -> list[AnyComponent]:
+async def process_form(form: BaseModel) -> tuple[str, str | None]:
+    """serialize_form in the validation executor, timed as a span"""
+    with span('process_and_validate_form_data'):
+        return await validation_executor.run(serialize_form, form)
+
+def serialize_form(form: BaseModel) -> tuple[str, str | None]:
+    """Submitted form data as json and, for the trimmed forms, the validated
+    aind-data-transfer-models json. Runs in the validation executor."""
+    form_json = form.model_dump_json(indent=3)
+    submit_json = None
+    if hasattr(form, 'process_and_validate_form_data'):
+        try:
+            submit_json = form.process_and_validate_form_data()
+        except Exception as e:
+            logger.warning('process_and_validate_form_data failed: %r', e, extra={'form': type(form).__name__})
+    return form_json, submit_json
+
+def display_submitted_form_data(form_json: str, submit_json=None, submittable=True) -> list[AnyComponent]:
     """Displays the submitted form data back to user"""
     components = [
         c.Paragraph(text=f'Submitted form content!'),
@@ -231,7 +243,18 @@ def display_submitted_form_data(form_json: str, submit_json=None) -> list[AnyCom
         components.extend([
             c.Heading(text='Submit to server (validated using aind-data-transfer-models):', level=3),
             c.Code(language='json', text=submit_json),
-            # TODO: submit to aind-data-transfer-service
-            c.Button(text='Submit', on_click=GoToEvent(url='/')),
         ])
+    if submit_json is not None and submittable:
+        # queued for aind-data-transfer-service, see jobs/submission.py. The
+        # key makes a second click on Submit a no-op. Jobs that were already
+        # submitted are refused unless the checkbox is ticked.
+        components.append(c.Form(
+            form_fields=[
+                c.FormFieldInput(name='submit_job_request', title='SubmitJobRequest', html_type='hidden', initial=submit_json),
+                c.FormFieldInput(name='idempotency_key', title='Idempotency key', html_type='hidden', initial=uuid.uuid4().hex),
+                c.FormFieldBoolean(name='allow_duplicates', title='Submit jobs that were already submitted', initial=False),
+            ],
+            submit_url='/api/jobs/submit',
+            footer=[c.Button(text='Submit', html_type='submit')],
+        ))
     return components
\ No newline at end of file
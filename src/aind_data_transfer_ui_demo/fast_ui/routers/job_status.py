@@ -0,0 +1,87 @@
+"""Job Status pages, read from the job status store"""
+
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastui import FastUI
+from fastui import components as c
+from fastui.components.display import DisplayLookup, DisplayMode
+from fastui.events import BackEvent, GoToEvent
+
+from aind_data_transfer_ui_demo.fast_ui.rendering import (
+    json_response,
+    rendered_json,
+)
+from aind_data_transfer_ui_demo.fast_ui.shared import page_json
+from aind_data_transfer_ui_demo.jobs.store import (
+    JobFilter,
+    JobStatus,
+    job_status_store,
+)
+
+router = APIRouter()
+
+PAGE_SIZE = 50
+
+
+@router.get("", response_model=FastUI, response_model_exclude_none=True)
+def job_status_table_page(
+    request: Request,
+    job_filter: Annotated[JobFilter, Depends()],
+    page_number: Annotated[int, Query(alias="page", ge=1)] = 1,
+) -> Response:
+    """
+    Job status table page, the frontend will fetch this when the user visits
+    `/job_status`. Filtering, sorting and pagination are done by the store,
+    only the requested page is loaded.
+    """
+    jobs, total = job_status_store.query(
+        job_filter, page=page_number, page_size=PAGE_SIZE
+    )
+    body = page_json(
+        c.ModelForm(
+            model=JobFilter,
+            submit_url=".",
+            initial=job_filter.model_dump(mode="json", exclude_none=True),
+            method="GOTO",
+            display_mode="inline",
+        ),
+        c.Table(
+            data=jobs,
+            data_model=JobStatus,
+            columns=[
+                DisplayLookup(
+                    field="job_id",
+                    on_click=GoToEvent(url="/job_status/{job_id}/"),
+                ),
+                DisplayLookup(field="subject_id"),
+                DisplayLookup(field="project_name"),
+                DisplayLookup(field="platform"),
+                DisplayLookup(field="status"),
+                DisplayLookup(field="submit_time", mode=DisplayMode.datetime),
+            ],
+            no_data_message="No jobs found",
+        ),
+        c.Pagination(page=page_number, page_size=PAGE_SIZE, total=total),
+        title="Job Status",
+    )
+    return json_response(request, rendered_json(body))
+
+
+@router.get(
+    "/{job_id}/", response_model=FastUI, response_model_exclude_none=True
+)
+def job_status_page(request: Request, job_id: str) -> Response:
+    """
+    Job details page, the frontend will fetch this when the user visits
+    `/job_status/{job_id}/`.
+    """
+    job = job_status_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    body = page_json(
+        c.Link(components=[c.Text(text="Back")], on_click=BackEvent()),
+        c.Details(data=job),
+        title=f"Job: {job.job_id}",
+    )
+    return json_response(request, rendered_json(body))
@@ -0,0 +1,331 @@
+"""Bulk job endpoints for batches of upload jobs"""
+
+import asyncio
+import json
+import logging
+from typing import Annotated, AsyncIterator, Iterable, Iterator, Optional
+
+from fastapi import APIRouter, Form, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from fastui import FastUI
+from fastui import components as c
+from fastui.events import GoToEvent
+from pydantic import (
+    BaseModel,
+    EmailStr,
+    Field,
+    NonNegativeInt,
+    model_validator,
+)
+
+from aind_data_transfer_ui_demo.fast_ui.executor import validation_executor
+from aind_data_transfer_ui_demo.fast_ui.rendering import FastUIResponse
+from aind_data_transfer_ui_demo.jobs.duplicates import (
+    DuplicateJobsError,
+    find_duplicates,
+    try_job_identity,
+)
+from aind_data_transfer_ui_demo.jobs.packing import imbalance, pack_jobs
+from aind_data_transfer_ui_demo.jobs.preflight import (
+    estimate_sizes,
+    preflight_jobs,
+)
+from aind_data_transfer_ui_demo.jobs.submission import (
+    MAX_UPLOAD_JOBS,
+    submission_worker,
+)
+from aind_data_transfer_ui_demo.models.job_template import (
+    DEFAULT_CHUNK_SIZE,
+    create_job_template,
+    iter_job_rows,
+    iter_submit_job_requests,
+)
+from aind_data_transfer_ui_demo.models.validation import (
+    ValidationStats,
+    validate_submit_job_request,
+    validate_upload_job,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+class BatchJobsRequest(BaseModel):
+    """A batch of BasicUploadJobConfigsSimple-shaped upload jobs"""
+
+    upload_jobs: list[dict] = Field(
+        ..., description="Upload jobs to validate", min_length=1
+    )
+
+
+class PackJobsRequest(BatchJobsRequest):
+    """Upload jobs to split into SubmitJobRequests"""
+
+    sizes: Optional[list[NonNegativeInt]] = Field(
+        default=None,
+        description=(
+            "Estimated bytes of each upload job. If left out, the bytes "
+            "below each job's sources are measured."
+        ),
+    )
+    max_jobs: int = Field(
+        default=MAX_UPLOAD_JOBS,
+        description="Upload jobs per SubmitJobRequest",
+        ge=1,
+        le=MAX_UPLOAD_JOBS,
+    )
+    max_bytes: Optional[int] = Field(
+        default=None,
+        description="Target bytes per SubmitJobRequest",
+        ge=1,
+    )
+    user_email: Optional[EmailStr] = Field(default=None)
+
+    @model_validator(mode="after")
+    def check_sizes(self) -> "PackJobsRequest":
+        """One size per upload job"""
+        if self.sizes is not None and len(self.sizes) != len(self.upload_jobs):
+            raise ValueError("sizes must have one entry per upload job")
+        return self
+
+
+async def stream_validation_results(
+    jobs: Iterable[dict],
+) -> AsyncIterator[str]:
+    """
+    Validates jobs concurrently in the validation executor and yields one
+    ndjson line per job as soon as it finishes, followed by a summary line.
+    Jobs wait for room in the executor rather than being rejected. Jobs
+    that were already submitted, or repeat an earlier job, get a
+    "duplicate" entry.
+    """
+    stats = ValidationStats()
+    jobs = list(jobs)
+    identities = [try_job_identity(job) for job in jobs]
+    submitted = await asyncio.to_thread(
+        submission_worker.queue.submitted_jobs,
+        [i for i in identities if i is not None],
+    )
+    duplicates = {
+        d.index: d.to_json() for d in find_duplicates(identities, submitted)
+    }
+
+    async def validate(index: int, job: dict) -> tuple[int, dict]:
+        """Validate a job in the executor, keeping track of its position"""
+        return index, await validation_executor.run(
+            validate_upload_job, job, wait=True
+        )
+
+    tasks = [
+        asyncio.ensure_future(validate(i, job)) for i, job in enumerate(jobs)
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            index, result = await next_done
+            stats.add(result)
+            if index in duplicates:
+                result = {**result, "duplicate": duplicates[index]}
+            yield json.dumps({"index": index, **result}) + "\n"
+        summary = {**stats.summary(), "duplicates": len(duplicates)}
+        yield json.dumps({"summary": summary}) + "\n"
+    finally:
+        # client went away, don't keep validating
+        for task in tasks:
+            task.cancel()
+
+
+@router.post("/validate")
+async def validate_jobs(request: BatchJobsRequest) -> StreamingResponse:
+    """
+    Validates each upload job with aind-data-transfer-models in parallel and
+    streams the results back as ndjson while work is still running.
+    """
+    return StreamingResponse(
+        stream_validation_results(request.upload_jobs),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.post("/validate/upload")
+async def validate_jobs_upload(file: UploadFile) -> StreamingResponse:
+    """Same as /validate for jobs read from a job template xlsx/csv file"""
+    jobs = await run_in_threadpool(
+        lambda: [
+            job for _, job in iter_job_rows(file.file, file.filename or "")
+        ]
+    )
+    return StreamingResponse(
+        stream_validation_results(jobs),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.post("/preflight")
+async def preflight(request: BatchJobsRequest) -> dict:
+    """
+    Checks that the source, extra_configs and metadata_dir paths of each
+    upload job exist, with the number of files and bytes below them
+    """
+    return await preflight_jobs(request.upload_jobs)
+
+
+@router.post("/pack")
+async def pack(request: PackJobsRequest) -> dict:
+    """
+    Splits the upload jobs into as few SubmitJobRequests as max_jobs and
+    max_bytes allow, with bytes balanced between them, and validates each.
+    Errors are located by the jobs' positions in the request body.
+    """
+    jobs = request.upload_jobs
+    sizes = request.sizes or await estimate_sizes(jobs)
+    packs = pack_jobs(sizes, request.max_jobs, request.max_bytes)
+    request_fields = (
+        {"user_email": request.user_email} if request.user_email else {}
+    )
+    results = await asyncio.gather(
+        *(
+            validation_executor.run(
+                validate_submit_job_request,
+                json.dumps(
+                    {
+                        **request_fields,
+                        "upload_jobs": [jobs[i] for i in p.indices],
+                    }
+                ),
+                wait=True,
+            )
+            for p in packs
+        )
+    )
+    for p, result in zip(packs, results):
+        for err in result.get("errors", []):
+            loc = err["loc"]
+            if len(loc) > 1 and loc[0] == "upload_jobs":
+                err["loc"] = [loc[0], p.indices[loc[1]], *loc[2:]]
+    return {
+        "requests": [
+            {"indices": p.indices, "bytes": p.bytes, **result}
+            for p, result in zip(packs, results)
+        ],
+        "summary": {
+            "requests": len(packs),
+            "jobs": len(jobs),
+            "bytes": sum(sizes),
+            "valid": all(r["valid"] for r in results),
+            "imbalance": imbalance(packs),
+        },
+    }
+
+
+def job_template_response() -> Response:
+    """Job template xlsx as a download"""
+    return Response(
+        content=create_job_template(),
+        media_type=(
+            "application/"
+            "vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        ),
+        headers={
+            "Content-Disposition": 'attachment; filename="job_template.xlsx"'
+        },
+    )
+
+
+@router.get("/template")
+def job_template() -> Response:
+    """Download the job template"""
+    return job_template_response()
+
+
+def _iter_chunk_lines(chunks: Iterator[dict]) -> Iterator[str]:
+    """Serializes the chunks of iter_submit_job_requests as ndjson. The 200
+    status is sent with the first line, so a file that can't be read ends
+    the stream with an {"error": ...} line instead."""
+    try:
+        for i, chunk in enumerate(chunks):
+            request = chunk["submit_job_request"]
+            yield json.dumps(
+                {
+                    "chunk": i,
+                    "rows": chunk["rows"],
+                    "submit_job_request": (
+                        None
+                        if request is None
+                        else request.model_dump(mode="json")
+                    ),
+                    "errors": chunk["errors"],
+                }
+            ) + "\n"
+    except Exception as e:
+        logger.exception("Failed to read job template")
+        error = {"type": type(e).__name__, "msg": str(e)}
+        yield json.dumps({"error": error}) + "\n"
+
+
+@router.post("/upload")
+def upload_job_template(
+    file: UploadFile,
+    chunk_size: int = Form(DEFAULT_CHUNK_SIZE, ge=1, le=DEFAULT_CHUNK_SIZE),
+    user_email: Optional[EmailStr] = Form(None),
+) -> StreamingResponse:
+    """
+    Reads a filled in job template row by row and streams back validated
+    SubmitJobRequests as ndjson, one per chunk of chunk_size rows.
+    """
+    request_fields = {"user_email": user_email} if user_email else {}
+    chunks = iter_submit_job_requests(
+        file.file, file.filename or "", chunk_size, **request_fields
+    )
+    # the sync iterator is run in a threadpool by StreamingResponse
+    return StreamingResponse(
+        _iter_chunk_lines(chunks), media_type="application/x-ndjson"
+    )
+
+
+@router.post(
+    "/submit", response_model=FastUI, response_model_exclude_none=True
+)
+async def submit_jobs(
+    submit_job_request: Annotated[str, Form()],
+    idempotency_key: Annotated[Optional[str], Form()] = None,
+    allow_duplicates: Annotated[bool, Form()] = False,
+) -> FastUIResponse:
+    """
+    Submit button of the forms. Validates the SubmitJobRequest (or single
+    BasicUploadJobConfigs) json, queues it for aind-data-transfer-service
+    and goes to the Job Status page without waiting for the service.
+    Resubmitting with the same idempotency_key is a no-op. Upload jobs that
+    were already submitted are refused unless allow_duplicates is set.
+    """
+    result = await validation_executor.run(
+        validate_submit_job_request, submit_job_request
+    )
+    if not result["valid"]:
+        errors = [
+            {**err, "loc": ["submit_job_request", *err["loc"]]}
+            for err in result["errors"]
+        ]
+        raise HTTPException(status_code=422, detail={"form": errors})
+    try:
+        await submission_worker.submit(
+            result["submit_job_request"],
+            key=idempotency_key,
+            allow_duplicates=allow_duplicates,
+        )
+    except DuplicateJobsError as e:
+        error = {
+            "type": "duplicate_jobs",
+            "loc": ["allow_duplicates"],
+            "msg": f"{e}. Check to submit them again anyway.",
+            "duplicates": [d.to_json() for d in e.duplicates],
+        }
+        raise HTTPException(status_code=422, detail={"form": [error]})
+    return FastUIResponse([c.FireEvent(event=GoToEvent(url="/job_status"))])
+
+
+@router.get("/submissions")
+def submission_counts() -> dict[str, int]:
+    """Number of queued, sending, sent and failed submissions"""
+    return submission_worker.queue.counts()
@@ -0,0 +1,78 @@
+"""Home page, shared endpoints and the catch-alls, registered after the
+other routers since they match every path under their prefix"""
+
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastui import FastUI
+
+from aind_data_transfer_ui_demo.fast_ui.assets import (
+    PREBUILT_VERSION,
+    bundle_asset,
+    landing_page,
+)
+from aind_data_transfer_ui_demo.fast_ui.executor import validation_executor
+from aind_data_transfer_ui_demo.fast_ui.rendering import (
+    asset_response,
+    json_response,
+    rendered_json,
+)
+from aind_data_transfer_ui_demo.fast_ui.routers.jobs import (
+    job_template_response,
+)
+from aind_data_transfer_ui_demo.fast_ui.shared import page_json
+
+# MAIN #######################
+
+router = APIRouter()
+
+
+@router.get("/", response_model=FastUI, response_model_exclude_none=True)
+def home(request: Request) -> Response:
+    """
+    Show blank homepage when a user visits `/`
+    """
+    return json_response(request, rendered_json(page_json(title="Home")))
+
+
+@router.get("/job_upload_template")
+def job_upload_template():
+    """Download the job template linked from the navbar"""
+    return job_template_response()
+
+
+@router.get("/executor")
+def executor_stats() -> dict:
+    """Load and queue wait times of the validation executor"""
+    return validation_executor.stats()
+
+
+@router.get("/{path:path}", status_code=404)
+async def api_404():
+    """Catch-all for endpoints that don't exist, returns a 404 status code."""
+    # so we don't fall through to the index page
+    return {"message": "Not Found"}
+
+
+# ASSETS #######################
+
+assets_router = APIRouter()
+
+
+@assets_router.get("/{version}/{name:path}")
+def fastui_asset(request: Request, version: str, name: str) -> Response:
+    """File of the vendored FastUI bundle, see assets.py"""
+    asset = bundle_asset(name) if version == PREBUILT_VERSION else None
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return asset_response(request, asset)
+
+
+# INDEX #######################
+
+index_router = APIRouter()
+
+
+@index_router.get("/{path:path}")
+async def html_landing(request: Request) -> Response:
+    """Simple HTML page which serves the React app, comes last as it matches
+    all paths. Rendered once, clients revalidate it with its ETag."""
+    return asset_response(request, landing_page(), cache_control="no-cache")
@@ -0,0 +1,114 @@
+"""Json schemas of the job models, for the json editor demos
+
+Each schema is generated once and served under its content hash:
+
+- /api/schemas/{model} is revalidated by clients on every use, which is a
+  304 unless the schema changed.
+- /api/schemas/{model}/{digest} never changes, so it is served with
+  immutable cache headers and can be cached by browsers and proxies.
+
+At startup the files written by generate_schemas.py are loaded through its
+manifest, skipping any whose fingerprint or content is out of date. Those
+are generated live on first use instead.
+"""
+
+import logging
+from pathlib import Path
+
+from fastapi import APIRouter, HTTPException, Request, Response
+
+from aind_data_transfer_ui_demo.fast_ui.metrics import span
+from aind_data_transfer_ui_demo.fast_ui.rendering import asset_response
+from aind_data_transfer_ui_demo.models.schema_registry import (
+    SCHEMA_DIR,
+    SCHEMA_MODELS,
+    content_hash,
+    read_manifest,
+    schema_fingerprint,
+    schema_json,
+)
+from aind_data_transfer_ui_demo.static_assets import StaticAsset
+
+MEDIA_TYPE = "application/schema+json"
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+_assets: dict[str, StaticAsset] = {}
+
+
+def load_schema_manifest(folder: Path = SCHEMA_DIR) -> list[str]:
+    """Load the current prebuilt schemas listed in folder's manifest.
+    Returns the names of the models that were loaded."""
+    loaded = []
+    for name, entry in read_manifest(folder).items():
+        model = SCHEMA_MODELS.get(name)
+        if model is None or entry["fingerprint"] != schema_fingerprint(model):
+            continue
+        try:
+            body = (folder / entry["file"]).read_bytes()
+        except FileNotFoundError:
+            continue
+        if content_hash(body) != entry["hash"]:
+            continue
+        try:
+            encoded = {
+                encoding: (folder / file).read_bytes()
+                for encoding, file in entry.get("encoded", {}).items()
+            }
+            asset = StaticAsset(body, entry["hash"], MEDIA_TYPE, encoded)
+        except FileNotFoundError:
+            # compressed copies are build outputs and not checked in
+            asset = StaticAsset.build(body, MEDIA_TYPE, entry["hash"])
+        _assets[name] = asset
+        loaded.append(name)
+    stale = sorted(set(SCHEMA_MODELS) - set(loaded))
+    if stale:
+        logger.info("Generating out of date schemas on use: %s", stale)
+    return loaded
+
+
+def schema_asset(name: str) -> StaticAsset:
+    """Compressed schema of a published model, generated on first use if
+    it was not prebuilt"""
+    asset = _assets.get(name)
+    if asset is None:
+        with span("schema_generation"):
+            body = schema_json(SCHEMA_MODELS[name])
+            asset = StaticAsset.build(body, MEDIA_TYPE, content_hash(body))
+        _assets[name] = asset
+    return asset
+
+
+def _get_asset(name: str) -> StaticAsset:
+    """Asset for name, or a 404"""
+    if name not in SCHEMA_MODELS:
+        raise HTTPException(status_code=404, detail="Unknown model")
+    return schema_asset(name)
+
+
+@router.get("")
+def schema_index() -> dict[str, str]:
+    """Url of each published schema"""
+    return {name: f"/api/schemas/{name}" for name in SCHEMA_MODELS}
+
+
+@router.get("/{name}")
+def current_schema(request: Request, name: str) -> Response:
+    """Current schema of a model. Content-Location is its immutable url."""
+    asset = _get_asset(name)
+    return asset_response(
+        request,
+        asset,
+        cache_control="no-cache",
+        headers={"Content-Location": f"/api/schemas/{name}/{asset.digest}"},
+    )
+
+
+@router.get("/{name}/{digest}")
+def schema_version(request: Request, name: str, digest: str) -> Response:
+    """Schema of a model by content hash. Only the current one is kept."""
+    asset = _get_asset(name)
+    if digest != asset.digest:
+        raise HTTPException(status_code=404, detail="Unknown schema version")
+    return asset_response(request, asset)
@@ -0,0 +1,137 @@
+"""Incremental validation for the json editor demo
+
+POST /api/validate/{model} stores the editor's document as a draft and
+validates it. After that the editor only sends JSON Patches of its edits to
+/api/validate/{model}/{draft_id}, and only the upload jobs a patch touched
+are validated again, in the validation executor. Every response carries
+all current errors of the draft, each scoped to the json pointer of the
+field it is about.
+"""
+
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Body, HTTPException
+from pydantic import BaseModel, Field
+
+from aind_data_transfer_ui_demo.fast_ui.executor import validation_executor
+from aind_data_transfer_ui_demo.models.basic_upload_job_configs import (
+    BasicUploadJobConfigsSimple,
+)
+from aind_data_transfer_ui_demo.models.drafts import (
+    Draft,
+    PatchError,
+    PatchOperation,
+    draft_store,
+    request_errors,
+    scoped_errors,
+)
+from aind_data_transfer_ui_demo.models.submit_job_request import (
+    SubmitJobRequestSimple,
+)
+from aind_data_transfer_ui_demo.models.validation import upload_job_errors
+
+DRAFT_MODELS = (
+    SubmitJobRequestSimple.__name__,
+    BasicUploadJobConfigsSimple.__name__,
+)
+
+router = APIRouter()
+
+
+class DraftPatch(BaseModel):
+    """Edits to a draft, made against version"""
+
+    version: int = Field(..., description="Draft version the patch is for")
+    patch: list[PatchOperation] = Field(..., description="RFC 6902 patch")
+
+
+class DraftErrors(BaseModel):
+    """Validation state of a draft after a request"""
+
+    draft_id: str
+    version: int
+    valid: bool
+    validated: list[int] = Field(
+        default=[], description="Upload jobs validated by this request"
+    )
+    errors: list[dict]
+
+
+async def validate_draft(draft: Draft) -> DraftErrors:
+    """Validate the parts of draft that changed since the last call"""
+    validated = []
+    if draft.has_jobs:
+        jobs = draft.jobs() or []
+        validated = draft.pending_jobs()
+        if validated:
+            results = await validation_executor.run(
+                upload_job_errors, [jobs[i] for i in validated]
+            )
+            for i, errors in zip(validated, results):
+                draft.job_errors[i] = scoped_errors(errors)
+        if draft.errors is None:
+            draft.errors = request_errors(draft.document)
+    elif draft.errors is None:
+        (errors,) = await validation_executor.run(
+            upload_job_errors, [draft.document]
+        )
+        draft.errors = scoped_errors(errors)
+    errors = draft.all_errors()
+    return DraftErrors(
+        draft_id=draft.id,
+        version=draft.version,
+        valid=not errors,
+        validated=validated,
+        errors=errors,
+    )
+
+
+def _check_model(model: str) -> None:
+    """404 for models without draft validation"""
+    if model not in DRAFT_MODELS:
+        raise HTTPException(status_code=404, detail="Unknown model")
+
+
+@router.post("/{model}")
+async def create_draft(
+    model: str, document: Annotated[Any, Body()]
+) -> DraftErrors:
+    """Start a draft of a model's document and validate all of it"""
+    _check_model(model)
+    draft = Draft(model, document)
+    async with draft.lock:
+        draft_store.add(draft)
+        return await validate_draft(draft)
+
+
+@router.patch("/{model}/{draft_id}")
+async def patch_draft(
+    model: str, draft_id: str, request: DraftPatch
+) -> DraftErrors:
+    """
+    Apply a patch to a draft and validate what it changed. A 409 means the
+    client's copy is out of sync (unknown draft, version mismatch or a
+    patch that doesn't apply) and should be sent again in full.
+    """
+    _check_model(model)
+    draft = draft_store.get(draft_id)
+    if draft is None or draft.model_name != model:
+        raise HTTPException(status_code=409, detail="Unknown draft")
+    async with draft.lock:
+        if request.version != draft.version:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Draft is at version {draft.version}",
+            )
+        try:
+            draft.apply(request.patch)
+        except PatchError as e:
+            draft_store.discard(draft_id)
+            raise HTTPException(status_code=409, detail=str(e))
+        return await validate_draft(draft)
+
+
+@router.delete("/{model}/{draft_id}", status_code=204)
+def delete_draft(model: str, draft_id: str) -> None:
+    """Forget a draft, e.g. when the editor is closed"""
+    draft_store.discard(draft_id)
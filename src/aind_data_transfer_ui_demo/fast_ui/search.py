@@ -0,0 +1,132 @@
+"""Async client for the upstream API backing the search-select fields.
+
+A single pooled ``httpx.AsyncClient`` is shared by every request. Responses
+are kept in a small TTL+LRU cache keyed on the request path, and concurrent
+identical queries share one upstream call (single-flight).
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+import httpx
+
+from aind_data_transfer_ui_demo.fast_ui.shared import SEARCH_API_URL
+
+
+class SearchClient:
+    """Pooled, cached and deduplicated client for the search upstream"""
+
+    def __init__(
+        self,
+        base_url: str,
+        ttl: float = 300.0,
+        max_entries: int = 1024,
+        timeout: float = 10.0,
+        max_connections: int = 20,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """
+        Parameters
+        ----------
+        base_url : str
+          Root url of the upstream api, e.g. https://restcountries.com/v3.1
+        ttl : float
+          Seconds a cached response stays fresh
+        max_entries : int
+          Maximum number of cached responses (least recently used evicted)
+        timeout : float
+          Upstream request timeout in seconds
+        max_connections : int
+          Size of the connection pool
+        transport : Optional[httpx.AsyncBaseTransport]
+          Custom transport, e.g. to point the client at a local stub
+        """
+        self.base_url = base_url.rstrip("/")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._timeout = timeout
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        )
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._cache: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Task] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared http client, created on first use"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self._timeout,
+                limits=self._limits,
+                transport=self._transport,
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the pooled connections and drop the cache"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._cache.clear()
+
+    def _cache_get(self, key: str) -> tuple[bool, Any]:
+        """Returns (hit, value) for a fresh cache entry"""
+        entry = self._cache.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._cache[key]
+            return False, None
+        self._cache.move_to_end(key)
+        return True, value
+
+    def _cache_set(self, key: str, value: Any) -> None:
+        """Stores a value and evicts the least recently used entries"""
+        self._cache[key] = (time.monotonic() + self.ttl, value)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    async def _fetch(self, path: str) -> Any:
+        """Requests path from the upstream. Returns None on a 404."""
+        response = await self.client.get(f"/{path}")
+        if response.status_code == 404:
+            data = None
+        else:
+            response.raise_for_status()
+            data = response.json()
+        self._cache_set(path, data)
+        return data
+
+    @staticmethod
+    def _consume_exception(task: asyncio.Task) -> None:
+        """Marks a failed task as retrieved if every waiter went away"""
+        if not task.cancelled():
+            task.exception()
+
+    async def get_json(self, path: str) -> Any:
+        """
+        Returns the decoded json for path, or None if the upstream returned
+        a 404. Identical concurrent calls share a single upstream request.
+        """
+        hit, value = self._cache_get(path)
+        if hit:
+            return value
+        task = self._in_flight.get(path)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(path))
+            self._in_flight[path] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(path, None))
+            task.add_done_callback(self._consume_exception)
+        # shield so a disconnecting client doesn't cancel the shared request
+        return await asyncio.shield(task)
+
+
+search_client = SearchClient(SEARCH_API_URL)
@@ -0,0 +1,225 @@
+"""In-memory prefix/trigram index for the search-select option universe.
+
+The countries are downloaded once, indexed, and refreshed in the
+background, so `/search?q=` is answered locally instead of calling the
+upstream on every keystroke.
+"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+from aind_data_transfer_ui_demo.fast_ui.search import (
+    SearchClient,
+    search_client,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Option:
+    """A single selectable option"""
+
+    value: str
+    label: str
+    group: str
+    # static popularity, higher ranks first among equal matches
+    weight: float = 0.0
+
+
+def _trigrams(text: str) -> set[str]:
+    """Set of 3-character substrings of text"""
+    return {a + b + c for a, b, c in zip(text, text[1:], text[2:])}
+
+
+class OptionIndex:
+    """Immutable prefix + trigram index over a list of options"""
+
+    def __init__(self, options: list[Option], default_limit: int = 20):
+        """
+        Parameters
+        ----------
+        options : list[Option]
+          Option universe to index
+        default_limit : int
+          Number of highest weighted options returned for an empty query
+        """
+        self.options = tuple(options)
+        self._labels = tuple(o.label.lower() for o in self.options)
+        self._prefixes: dict[str, set[int]] = defaultdict(set)
+        self._trigrams: dict[str, set[int]] = defaultdict(set)
+        for i, label in enumerate(self._labels):
+            for word in label.split():
+                for end in range(1, len(word) + 1):
+                    self._prefixes[word[:end]].add(i)
+            for gram in _trigrams(label):
+                self._trigrams[gram].add(i)
+        by_weight = sorted(
+            range(len(self.options)), key=lambda i: -self.options[i].weight
+        )[:default_limit]
+        self._default = sorted(by_weight, key=lambda i: self._labels[i])
+
+    def _candidates(self, query: str, tokens: list[str]) -> set[int]:
+        """Options where every token prefixes a word, or containing query"""
+        matches = set.intersection(
+            *(self._prefixes.get(t, set()) for t in tokens)
+        )
+        if len(query) >= 3:
+            grams = [self._trigrams.get(g, set()) for g in _trigrams(query)]
+            substring = set.intersection(*grams) if grams else set()
+            matches |= {i for i in substring if query in self._labels[i]}
+        return matches
+
+    def _score(self, i: int, query: str) -> int:
+        """Lower is better: exact, label prefix, substring, word prefixes"""
+        label = self._labels[i]
+        if label == query:
+            return 0
+        if label.startswith(query):
+            return 1
+        if query in label:
+            return 2
+        return 3
+
+    def search(self, query: str, limit: int = 50) -> list[Option]:
+        """Ranked options matching query"""
+        query = " ".join(query.lower().split())
+        if not query:
+            return [self.options[i] for i in self._default]
+        matches = self._candidates(query, query.split())
+        ranked = sorted(
+            matches,
+            key=lambda i: (
+                self._score(i, query),
+                -self.options[i].weight,
+                self._labels[i],
+            ),
+        )
+        return [self.options[i] for i in ranked[:limit]]
+
+    def search_grouped(self, query: str, limit: int = 50) -> list[dict]:
+        """Ranked options grouped for a SelectSearchResponse"""
+        groups: dict[str, list[dict]] = {}
+        for option in self.search(query, limit=limit):
+            groups.setdefault(option.group, []).append(
+                {"value": option.value, "label": option.label}
+            )
+        return [{"label": k, "options": v} for k, v in groups.items()]
+
+
+EMPTY_INDEX = OptionIndex([])
+
+OptionLoader = Callable[[], Awaitable[list[Option]]]
+
+
+class RefreshingOptionIndex:
+    """
+    Holds the current OptionIndex and rebuilds it in the background. The
+    last good index is served while the upstream fails, and an empty one
+    until the first load succeeds. Failed loads are retried with an
+    exponential backoff rather than on every search.
+    """
+
+    def __init__(
+        self,
+        loader: OptionLoader,
+        refresh_interval: float = 3600,
+        retry_delay: float = 5.0,
+    ):
+        """
+        Parameters
+        ----------
+        loader : OptionLoader
+          Coroutine function returning the full option universe
+        refresh_interval : float
+          Seconds between background refreshes
+        retry_delay : float
+          Seconds before retrying a failed load, doubled after every
+          consecutive failure up to refresh_interval
+        """
+        self.loader = loader
+        self.refresh_interval = refresh_interval
+        self.retry_delay = retry_delay
+        self._index: Optional[OptionIndex] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._failures = 0
+        self._retry_at = 0.0
+
+    def _backoff(self) -> float:
+        """Seconds to wait after the current run of failures"""
+        if not self._failures:
+            return self.refresh_interval
+        delay = self.retry_delay * 2 ** (self._failures - 1)
+        return min(self.refresh_interval, delay)
+
+    async def refresh(self) -> OptionIndex:
+        """Reload the options and swap in a new index"""
+        try:
+            options = await self.loader()
+        except Exception:
+            self._failures += 1
+            self._retry_at = time.monotonic() + self._backoff()
+            raise
+        self._failures = 0
+        self._retry_at = 0.0
+        self._index = OptionIndex(options)
+        logger.info("Indexed %d options", len(options))
+        return self._index
+
+    async def get(self) -> OptionIndex:
+        """Current index, loading it on first use unless a failed load is
+        backing off. Empty until a load succeeds."""
+        if self._index is None and time.monotonic() >= self._retry_at:
+            async with self._lock:
+                if self._index is None and time.monotonic() >= self._retry_at:
+                    try:
+                        await self.refresh()
+                    except Exception:
+                        logger.exception("Failed to load option index")
+        return self._index or EMPTY_INDEX
+
+    async def _refresh_forever(self) -> None:
+        """Background loop, keeps serving the old index if a refresh fails"""
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Failed to refresh option index")
+            await asyncio.sleep(self._backoff())
+
+    def start(self) -> None:
+        """Start refreshing in the background"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_forever())
+
+    async def stop(self) -> None:
+        """Cancel the background refresh"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+async def load_countries(client: SearchClient = search_client) -> list[Option]:
+    """Countries from restcountries, grouped by region"""
+    data = await client.get_json("all?fields=name,cca3,region,population")
+    return [
+        Option(
+            value=co["cca3"],
+            label=co["name"]["common"],
+            group=co["region"],
+            weight=co.get("population", 0),
+        )
+        for co in data or []
+    ]
+
+
+country_index = RefreshingOptionIndex(load_countries)
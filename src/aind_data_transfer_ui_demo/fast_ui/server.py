@@ -1,45 +1,64 @@
-from fastapi import APIRouter, FastAPI
-from fastapi.responses import HTMLResponse
-from fastui import AnyComponent, FastUI, prebuilt_html
+from contextlib import asynccontextmanager
+from pathlib import Path
 
-from aind_data_transfer_ui_demo.fast_ui.routers.forms import (
-    router as forms_router,
-)
-from aind_data_transfer_ui_demo.fast_ui.routers.users import (
-    router as user_router,
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, Response
+from fastapi.staticfiles import StaticFiles
+
+from aind_data_transfer_ui_demo.fast_ui.logs import configure_logging
+from aind_data_transfer_ui_demo.fast_ui.metrics import (
+    PROMETHEUS_CONTENT_TYPE,
+    MetricsMiddleware,
+    render_metrics,
 )
-from aind_data_transfer_ui_demo.fast_ui.shared import APP_TITLE, page
+from aind_data_transfer_ui_demo.fast_ui.shared import PROFILING_ENABLED
+from aind_data_transfer_ui_demo.fast_ui.startup import WarmUpGate, warm_up
 
-# MAIN #######################
+# Only what is needed to accept connections and answer health checks is
+# imported here. The routers are included by the warm-up, see startup.py.
 
-main_router = APIRouter()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up once the server is accepting connections, and release shared
+    resources on shutdown."""
+    warm_up.start(app)
+    yield
+    await warm_up.stop()
 
-@main_router.get("/", response_model=FastUI, response_model_exclude_none=True)
-def home() -> list[AnyComponent]:
-    """
-    Show blank homepage when a user visits `/`
-    """
-    return page(title="Home")
 
+configure_logging()
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(WarmUpGate, warm_up=warm_up)
+# added last so it is outermost and request times include warm-up waits
+app.add_middleware(MetricsMiddleware, profiling=PROFILING_ENABLED)
 
-@main_router.get("/{path:path}", status_code=404)
-async def api_404():
-    """Catch-all for endpoints that don't exist, returns a 404 status code."""
-    # so we don't fall through to the index page
-    return {"message": "Not Found"}
 
+@app.get("/api/health")
+def health() -> dict:
+    """Liveness: the process is up, even if it is still warming up"""
+    return {"status": "ok"}
 
-# INDEX #######################
 
-app = FastAPI()
+@app.get("/api/ready")
+def ready() -> JSONResponse:
+    """Readiness: every route can be served. 503 during warm-up."""
+    return JSONResponse(
+        warm_up.status(), status_code=200 if warm_up.ready else 503
+    )
 
-app.include_router(forms_router, prefix="/api/forms")
-app.include_router(user_router, prefix="/api/users")
-app.include_router(main_router, prefix="/api")
 
+@app.get("/metrics")
+def metrics() -> Response:
+    """Request latency and phase histograms for Prometheus"""
+    return Response(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
 
-@app.get("/{path:path}")
-async def html_landing() -> HTMLResponse:
-    """Simple HTML page which serves the React app, comes last as it matches all paths."""
-    return HTMLResponse(prebuilt_html(title=APP_TITLE))
+
+# json editor demos, which load their schemas from /api/schemas
+app.mount(
+    "/jsonschema",
+    StaticFiles(
+        directory=Path(__file__).parent.parent / "jsonschema", html=True
+    ),
+    name="jsonschema",
+)
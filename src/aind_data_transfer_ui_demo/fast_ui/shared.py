@@ -1,7 +1,14 @@
+import os
+from functools import cache
+from pathlib import Path
+
 from fastui import AnyComponent
 from fastui import components as c
 from fastui.events import GoToEvent
 
+from aind_data_transfer_ui_demo.fast_ui.metrics import span
+from aind_data_transfer_ui_demo.fast_ui.rendering import components_json
+
 # global configs/variables
 APP_TITLE = "AIND Data Transfer Service"
 APP_READTHEDOCS_URL = "https://aind-data-transfer-service.readthedocs.io"
@@ -11,20 +18,43 @@ APP_GITHUB_URL = (
 AIND_METADATA_SERVICE_PROJECT_NAMES_URL = (
     "http://aind-metadata-service/project_names"
 )
+# upstream for the search-select fields, override to point at a local stub
+SEARCH_API_URL = os.getenv(
+    "AIND_SEARCH_API_URL", "https://restcountries.com/v3.1"
+)
+# pool that validation is offloaded to: "thread" or "process"
+EXECUTOR_KIND = os.getenv("AIND_EXECUTOR_KIND", "process")
+EXECUTOR_MAX_WORKERS = int(os.getenv("AIND_EXECUTOR_MAX_WORKERS", 0)) or None
+# calls waiting for or running on a worker before requests get a 429
+EXECUTOR_MAX_PENDING = int(os.getenv("AIND_EXECUTOR_MAX_PENDING", 64))
+# batch calls (bulk validation, packing) in the pool at a time, 0 for the
+# pool size
+EXECUTOR_MAX_BATCH = int(os.getenv("AIND_EXECUTOR_MAX_BATCH", 0)) or None
+# "1" lets requests with an X-Profile header be profiled, see profiling.py
+PROFILING_ENABLED = os.getenv("AIND_PROFILING", "0") == "1"
+# level of the app's loggers and "json" or "text" output, see logs.py
+LOG_LEVEL = os.getenv("AIND_LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("AIND_LOG_FORMAT", "text")
+# version of the @pydantic/fastui-prebuilt bundle the installed fastui
+# expects (0.0.26 for fastui 0.9), loaded from FASTUI_CDN_URL
+FASTUI_PREBUILT_VERSION = os.getenv("AIND_FASTUI_PREBUILT_VERSION", "0.0.26")
+FASTUI_CDN_URL = os.getenv(
+    "AIND_FASTUI_CDN_URL",
+    "https://cdn.jsdelivr.net/npm/@pydantic/fastui-prebuilt@{version}"
+    "/dist/assets",
+).format(version=FASTUI_PREBUILT_VERSION)
+# FastUI frontend bundle vendored by vendor_assets.py, served instead of the
+# CDN when present
+FASTUI_ASSETS_DIR = Path(
+    os.getenv(
+        "AIND_FASTUI_ASSETS_DIR", Path(__file__).parent / "static" / "fastui"
+    )
+)
 
 
-def page(
-    *components: AnyComponent, title: str | None = None
-) -> list[AnyComponent]:
-    """
-    Displays a page that contains the provided components, along with the shared
-    title, navbar, and footer.
-    """
-    # Render the shared components
-    title_component = c.PageTitle(
-        text=f"{APP_TITLE} — {title}" if title else APP_TITLE
-    )
-    navbar_component = c.Navbar(
+def navbar() -> c.Navbar:
+    """Navbar shared by every page"""
+    return c.Navbar(
         title=APP_TITLE,
         title_event=GoToEvent(url="/"),
         start_links=[
@@ -36,8 +66,13 @@ def page(
             ),
             c.Link(
                 components=[c.Text(text="Job Status")],
-                on_click=GoToEvent(url="/users"),
-                active="startswith:/users",
+                on_click=GoToEvent(url="/job_status"),
+                active="startswith:/job_status",
+            ),
+            c.Link(
+                components=[c.Text(text="Compression")],
+                on_click=GoToEvent(url="/compression"),
+                active="startswith:/compression",
             ),
             c.Link(
                 components=[c.Text(text="Job Submit Template")],
@@ -71,8 +106,12 @@ def page(
             ),
         ],
     )
+
+
+def footer() -> c.Footer:
+    """Footer shared by every page"""
     # NOTE: this may crowd the page, consider removing
-    footer = c.Footer(
+    return c.Footer(
         extra_text=APP_TITLE,
         links=[
             c.Link(
@@ -91,6 +130,20 @@ def page(
             ),
         ],
     )
+
+
+def page_title(title: str | None = None) -> c.PageTitle:
+    """Browser tab title of a page"""
+    return c.PageTitle(text=f"{APP_TITLE} — {title}" if title else APP_TITLE)
+
+
+def page(
+    *components: AnyComponent, title: str | None = None
+) -> list[AnyComponent]:
+    """
+    Displays a page that contains the provided components, along with the shared
+    title, navbar, and footer.
+    """
     # Render the page contents
     page_component = c.Page(
         components=[
@@ -98,4 +151,37 @@ def page(
             *components,
         ],
     )
-    return [title_component, navbar_component, page_component, footer]
+    return [page_title(title), navbar(), page_component, footer()]
+
+
+@cache
+def _chrome_json() -> tuple[bytes, bytes]:
+    """The navbar and footer, serialized once, without the list brackets"""
+    return (
+        components_json([navbar()])[1:-1],
+        components_json([footer()])[1:-1],
+    )
+
+
+def page_json(*components: AnyComponent, title: str | None = None) -> bytes:
+    """
+    Same json as page() returns, but only the title and page contents are
+    serialized per call. The navbar and footer are spliced in from
+    _chrome_json().
+    """
+    navbar_json, footer_json = _chrome_json()
+    heading = (c.Heading(text=title),) if title else ()
+    with span("serialization"):
+        return b"".join(
+            [
+                b"[",
+                components_json([page_title(title)])[1:-1],
+                b",",
+                navbar_json,
+                b',{"components":',
+                components_json([*heading, *components]),
+                b',"type":"Page"},',
+                footer_json,
+                b"]",
+            ]
+        )
@@ -0,0 +1,184 @@
+"""Two phase start-up of the FastUI server
+
+Importing the routers pulls in aind-data-transfer-models, aind-data-schema
+and the FastUI mini-models, which takes seconds. server.py only imports
+what it needs to accept connections and answer health checks. The routers
+are imported by a warm-up task that starts once the server is up (uvicorn
+binds its socket right after the lifespan startup returns).
+
+Requests that arrive during warm-up wait for it to finish, except /metrics
+and the health endpoints: /api/health answers as soon as the process is up
+and /api/ready only succeeds once the app can serve every route.
+When the app is run without its lifespan (e.g. through
+httpx.ASGITransport), the first request includes the routers, without
+starting the background services.
+"""
+
+import asyncio
+import importlib
+import logging
+import time
+from typing import Optional
+
+from fastapi import FastAPI
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+HEALTH_PATHS = ("/api/health", "/api/ready", "/metrics")
+# seconds a request waits for warm-up before giving up with a 503
+WARM_UP_TIMEOUT = 60.0
+
+_ROUTERS = "aind_data_transfer_ui_demo.fast_ui.routers"
+# (module, router attribute, prefix) in the order they are included, the
+# catch-alls in routers.main go last
+ROUTERS = [
+    (f"{_ROUTERS}.compression", "router", "/api/compression"),
+    (f"{_ROUTERS}.forms", "router", "/api/forms"),
+    (f"{_ROUTERS}.jobs", "router", "/api/jobs"),
+    (f"{_ROUTERS}.job_status", "router", "/api/job_status"),
+    (f"{_ROUTERS}.schemas", "router", "/api/schemas"),
+    (f"{_ROUTERS}.validate", "router", "/api/validate"),
+    (f"{_ROUTERS}.main", "router", "/api"),
+    (f"{_ROUTERS}.main", "assets_router", "/assets/fastui"),
+    (f"{_ROUTERS}.main", "index_router", ""),
+]
+
+
+async def start_services() -> None:
+    """Background services and caches, started once the routers are in"""
+    from aind_data_transfer_ui_demo.fast_ui.routers.schemas import (
+        load_schema_manifest,
+    )
+    from aind_data_transfer_ui_demo.fast_ui.search_index import country_index
+    from aind_data_transfer_ui_demo.jobs.submission import submission_worker
+
+    await asyncio.to_thread(load_schema_manifest)
+    country_index.start()
+    submission_worker.start()
+
+
+async def stop_services() -> None:
+    """Stop what start_services started and release shared resources"""
+    from aind_data_transfer_ui_demo.fast_ui.executor import (
+        validation_executor,
+    )
+    from aind_data_transfer_ui_demo.fast_ui.search import search_client
+    from aind_data_transfer_ui_demo.fast_ui.search_index import country_index
+    from aind_data_transfer_ui_demo.jobs.preflight import path_checker
+    from aind_data_transfer_ui_demo.jobs.submission import submission_worker
+
+    await submission_worker.stop()
+    await country_index.stop()
+    await search_client.aclose()
+    validation_executor.shutdown()
+    path_checker.shutdown()
+
+
+class WarmUp:
+    """Imports the routers into an app and starts the services"""
+
+    def __init__(self, routers: list[tuple[str, str, str]] = ROUTERS):
+        """routers are (module, attribute, prefix), included in order"""
+        self.routers = routers
+        self.ready = False
+        self.error: Optional[str] = None
+        self.duration: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._done: Optional[asyncio.Event] = None
+        self._services_started = False
+
+    @property
+    def started(self) -> bool:
+        """Whether start() was called"""
+        return self._task is not None
+
+    def start(self, app: FastAPI, services: bool = True) -> None:
+        """Warm up app in the background"""
+        self._done = asyncio.Event()
+        self._task = asyncio.create_task(self._run(app, services))
+
+    async def _run(self, app: FastAPI, services: bool) -> None:
+        """Include the routers, then start the services"""
+        start = time.perf_counter()
+        try:
+            for module_name, attribute, prefix in self.routers:
+                # imported in a thread so health checks are still answered
+                module = await asyncio.to_thread(
+                    importlib.import_module, module_name
+                )
+                app.include_router(getattr(module, attribute), prefix=prefix)
+            if services:
+                self._services_started = True
+                await start_services()
+            self.ready = True
+        except Exception as e:
+            # not ready, so the readiness probe fails and the pod restarts
+            logger.exception("Warm-up failed")
+            self.error = repr(e)
+        finally:
+            self.duration = time.perf_counter() - start
+            self._done.set()
+        logger.info("Warm-up finished in %.2fs", self.duration)
+
+    async def wait(self, timeout: float = WARM_UP_TIMEOUT) -> bool:
+        """Wait for warm-up to finish. Returns whether the app is ready."""
+        if not self.ready and self._done is not None:
+            try:
+                await asyncio.wait_for(self._done.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.ready
+
+    async def stop(self) -> None:
+        """Cancel an unfinished warm-up and stop the services"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._services_started:
+            await stop_services()
+            self._services_started = False
+
+    def status(self) -> dict:
+        """Json-able warm-up state for the readiness endpoint"""
+        return {
+            "ready": self.ready,
+            "warm_up_seconds": self.duration,
+            "error": self.error,
+        }
+
+
+class WarmUpGate:
+    """ASGI middleware holding requests until warm-up has finished"""
+
+    def __init__(self, app: ASGIApp, warm_up: WarmUp):
+        """Wraps app"""
+        self.app = app
+        self.warm_up = warm_up
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """Wait for warm-up, or 503 if it failed or takes too long"""
+        if scope["type"] == "http" and not self.warm_up.started:
+            # no lifespan: include the routers on first use
+            self.warm_up.start(scope["app"], services=False)
+        if (
+            scope["type"] == "http"
+            and not self.warm_up.ready
+            and scope["path"] not in HEALTH_PATHS
+            and not await self.warm_up.wait()
+        ):
+            response = JSONResponse(
+                {"detail": "Server is starting"},
+                status_code=503,
+                headers={"Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+warm_up = WarmUp()
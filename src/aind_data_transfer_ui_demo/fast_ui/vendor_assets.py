@@ -0,0 +1,101 @@
+"""Script to vendor the FastUI frontend bundle, so the server can run
+without the CDN
+
+Downloads the npm package of FASTUI_PREBUILT_VERSION of the bundle and
+writes its dist/assets files, with gzip (and brotli, if
+installed) compressed copies, to FASTUI_ASSETS_DIR/{version}. On a machine
+without internet access, download the tarball elsewhere and pass it with
+--tarball.
+
+    python -m aind_data_transfer_ui_demo.fast_ui.vendor_assets
+        [--tarball PATH] [--output DIR]
+"""
+
+import argparse
+import io
+import mimetypes
+import tarfile
+from pathlib import Path, PurePosixPath
+
+import httpx
+
+from aind_data_transfer_ui_demo.fast_ui.assets import (
+    ENTRY_POINTS,
+    PREBUILT_VERSION,
+    vendored_dir,
+)
+from aind_data_transfer_ui_demo.fast_ui.shared import FASTUI_ASSETS_DIR
+from aind_data_transfer_ui_demo.models.schema_registry import write_atomic
+from aind_data_transfer_ui_demo.static_assets import (
+    ENCODING_SUFFIXES,
+    StaticAsset,
+)
+
+NPM_TARBALL_URL = (
+    "https://registry.npmjs.org/@pydantic/fastui-prebuilt/-/"
+    "fastui-prebuilt-{version}.tgz"
+)
+# where the files linked from the shell are in the npm package
+ASSETS_PREFIX = PurePosixPath("package/dist/assets")
+
+
+def download_tarball(version: str = PREBUILT_VERSION) -> bytes:
+    """npm package of a version of the bundle"""
+    response = httpx.get(
+        NPM_TARBALL_URL.format(version=version),
+        follow_redirects=True,
+        timeout=60,
+    )
+    response.raise_for_status()
+    return response.content
+
+
+def vendor_bundle(tarball: bytes, output: Path) -> list[str]:
+    """
+    Write the assets in an npm package of the bundle to output, each next
+    to its compressed copies. Returns the names of the files written.
+    """
+    written = []
+    with tarfile.open(fileobj=io.BytesIO(tarball), mode="r:gz") as tar:
+        for member in tar.getmembers():
+            path = PurePosixPath(member.name)
+            if not member.isfile() or ASSETS_PREFIX not in path.parents:
+                continue
+            name = path.relative_to(ASSETS_PREFIX)
+            if ".." in name.parts:
+                continue
+            target = output.joinpath(*name.parts)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            body = tar.extractfile(member).read()
+            media_type, _ = mimetypes.guess_type(target.name)
+            asset = StaticAsset.build(
+                body, media_type or "application/octet-stream"
+            )
+            write_atomic(target, body)
+            for encoding, data in asset.encoded.items():
+                suffix = ENCODING_SUFFIXES[encoding]
+                write_atomic(target.with_name(target.name + suffix), data)
+            written.append(name.as_posix())
+    missing = set(ENTRY_POINTS) - set(written)
+    if missing:
+        raise ValueError(f"Not a FastUI bundle, missing {sorted(missing)}")
+    return written
+
+
+def main() -> None:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tarball", type=Path)
+    parser.add_argument("--output", type=Path, default=FASTUI_ASSETS_DIR)
+    args = parser.parse_args()
+    if args.tarball is not None:
+        tarball = args.tarball.read_bytes()
+    else:
+        tarball = download_tarball()
+    output = vendored_dir(args.output)
+    for name in vendor_bundle(tarball, output):
+        print(f"Wrote {output / name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+"""Job bookkeeping that is independent of the web UI: status storage,
+submission and planning of upload jobs.
+"""
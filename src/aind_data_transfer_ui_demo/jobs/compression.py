@@ -0,0 +1,302 @@
+"""Compression sampling of a modality's source, to decide compress_raw_data
+
+Reads a bounded random sample of a source folder and compresses it with
+each candidate codec, to tell whether compression pays off for the
+dataset before cluster hours are spent on it. Files are picked with
+probability proportional to their size (weighted reservoir sampling over
+one walk of the folder), so the sample looks like the bytes that would be
+transferred rather than like the many small metadata files. A window of
+up to chunk_bytes at a random offset of each picked file is read through
+mmap, so only the sampled pages are read from disk. Symlinks are not
+followed, so with roots (see jobs/preflight.py) nothing outside them is
+read.
+
+The codecs stand in for the ones the transfer jobs use (e.g. WavPack for
+ephys, blosc/zstd for imaging), which compress at least as well, so a
+dataset that none of them shrinks is not worth compressing. zstd is used
+if zstandard is installed (the compression extra).
+
+    python -m aind_data_transfer_ui_demo.jobs.compression SOURCE
+        [--sample-mb 16] [--chunk-mb 1] [--files 16] [--seed N] [--json]
+"""
+
+import argparse
+import bz2
+import heapq
+import lzma
+import math
+import mmap
+import os
+import random
+import time
+import zlib
+from typing import Callable, Iterator, Optional
+
+from pydantic import BaseModel, Field
+
+from aind_data_transfer_ui_demo.jobs.preflight import (
+    OUTSIDE_ROOTS,
+    allowed_path,
+)
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+MB = 1024 * 1024
+SAMPLE_BYTES = 16 * MB
+CHUNK_BYTES = 1 * MB
+MAX_FILES = 16
+# files looked at when picking the sample, bounds the walk of huge folders
+MAX_SCANNED_FILES = 100_000
+# compression pays off if a codec saves this much, at least this fast
+MIN_RATIO = 1.15
+MIN_MB_PER_SECOND = 20.0
+
+
+def _codecs() -> dict[str, Callable[[memoryview], bytes]]:
+    """Candidate codecs by name, each compressing one buffer"""
+    codecs = {
+        "zlib-6": lambda data: zlib.compress(data, 6),
+        "bz2-9": lambda data: bz2.compress(data, 9),
+        "lzma-1": lambda data: lzma.compress(data, preset=1),
+    }
+    if zstandard is not None:
+        compressor = zstandard.ZstdCompressor(level=3)
+        codecs["zstd-3"] = compressor.compress
+    return codecs
+
+
+CODECS = _codecs()
+
+
+class CodecResult(BaseModel):
+    """How well and how fast a codec compressed the sample"""
+
+    codec: str = Field(..., title="Codec")
+    ratio: float = Field(..., title="Ratio")
+    mb_per_second: float = Field(..., title="MB/s")
+    input_bytes: int = Field(..., title="Input bytes")
+    output_bytes: int = Field(..., title="Output bytes")
+
+
+class CompressionSample(BaseModel):
+    """Codec results for a sample of a source and what they suggest"""
+
+    source: str
+    files: int = Field(..., description="Files sampled")
+    sampled_bytes: int
+    results: list[CodecResult]
+    compress: bool = Field(
+        ..., description="Whether compression pays off for the data"
+    )
+    codec: Optional[str] = Field(
+        default=None, description="Best codec that pays off"
+    )
+    reason: str
+
+
+def iter_files(
+    source: str, max_scanned: int = MAX_SCANNED_FILES
+) -> Iterator[tuple[str, int]]:
+    """(path, size) of the first max_scanned files below source, symlinks
+    are left out"""
+    scanned = 0
+    folders = [source]
+    while folders:
+        try:
+            entries = list(os.scandir(folders.pop()))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    folders.append(entry.path)
+                    continue
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                size = entry.stat().st_size
+            except OSError:
+                continue
+            yield entry.path, size
+            scanned += 1
+            if scanned >= max_scanned:
+                return
+
+
+def pick_files(
+    source: str,
+    max_files: int = MAX_FILES,
+    rng: Optional[random.Random] = None,
+    max_scanned: int = MAX_SCANNED_FILES,
+) -> list[tuple[str, int]]:
+    """
+    (path, size) of up to max_files non-empty files below source, picked
+    with probability proportional to size in one walk (Efraimidis-Spirakis
+    weighted reservoir sampling). Only the first max_scanned files are
+    considered.
+    """
+    rng = rng or random.Random()
+    # (key, path, size), the max_files largest keys are kept. log(u) / size
+    # orders files like u ** (1 / size) without rounding to 1 for large ones
+    reservoir: list[tuple[float, str, int]] = []
+    for path, size in iter_files(source, max_scanned):
+        if size == 0:
+            continue
+        item = (math.log(1.0 - rng.random()) / size, path, size)
+        if len(reservoir) < max_files:
+            heapq.heappush(reservoir, item)
+        elif item[0] > reservoir[0][0]:
+            heapq.heapreplace(reservoir, item)
+    return [(path, size) for _, path, size in reservoir]
+
+
+def read_window(
+    path: str, size: int, length: int, rng: random.Random
+) -> bytes:
+    """length bytes (at most the file) at a random offset, read with mmap"""
+    length = min(length, size)
+    offset = rng.randrange(size - length + 1)
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return mapped[offset : offset + length]  # noqa: E203
+
+
+def recommend(results: list[CodecResult]) -> tuple[bool, Optional[str], str]:
+    """(compress, codec, reason) from the codec results. The codec is the
+    one with the best ratio among those fast enough."""
+    best = max(results, key=lambda r: r.ratio)
+    if best.ratio < MIN_RATIO:
+        reason = (
+            f"Best ratio {best.ratio:.2f} ({best.codec}) is below "
+            f"{MIN_RATIO:g}, the data is close to incompressible"
+        )
+        return False, None, reason
+    fast = [r for r in results if r.mb_per_second >= MIN_MB_PER_SECOND]
+    fast = [r for r in fast if r.ratio >= MIN_RATIO]
+    if not fast:
+        reason = (
+            f"{best.codec} reaches a ratio of {best.ratio:.2f}, but no codec "
+            f"that compresses it is faster than {MIN_MB_PER_SECOND:g} MB/s"
+        )
+        return False, None, reason
+    best = max(fast, key=lambda r: r.ratio)
+    saved = 1 - 1 / best.ratio
+    reason = f"{best.codec} saves {saved:.0%} at {best.mb_per_second:.0f} MB/s"
+    return True, best.codec, reason
+
+
+def sample_compression(
+    source: str,
+    sample_bytes: int = SAMPLE_BYTES,
+    chunk_bytes: int = CHUNK_BYTES,
+    max_files: int = MAX_FILES,
+    seed: Optional[int] = None,
+    roots: Optional[list[str]] = None,
+) -> CompressionSample:
+    """
+    Compress a random sample of source with every codec.
+
+    Parameters
+    ----------
+    source : str
+      Folder (or single file) to sample
+    sample_bytes : int
+      Upper bound on the bytes read
+    chunk_bytes : int
+      Bytes read from each picked file
+    max_files : int
+      Files picked
+    seed : Optional[int]
+      Seed for a reproducible sample
+    roots : Optional[list[str]]
+      Real paths of the folders source has to be below, None to allow any
+
+    Raises
+    ------
+    PermissionError
+      If source is not below one of roots, whether or not it exists
+    FileNotFoundError
+      If source does not exist
+    ValueError
+      If source has no non-empty files
+    """
+    path = allowed_path(source, roots)
+    if path is None:
+        raise PermissionError(OUTSIDE_ROOTS)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{source} does not exist")
+    rng = random.Random(seed)
+    if os.path.isdir(path):
+        files = pick_files(path, max_files, rng)
+    else:
+        files = [(path, os.path.getsize(path))]
+    files = [(path, size) for path, size in files if size > 0]
+    if not files:
+        raise ValueError(f"{source} has no files to sample")
+    per_file = max(1, min(chunk_bytes, sample_bytes // len(files)))
+    chunks = [read_window(path, size, per_file, rng) for path, size in files]
+    sampled = sum(len(chunk) for chunk in chunks)
+    results = []
+    for name, compress in CODECS.items():
+        start = time.perf_counter()
+        output = sum(len(compress(chunk)) for chunk in chunks)
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        results.append(
+            CodecResult(
+                codec=name,
+                ratio=round(sampled / max(output, 1), 3),
+                mb_per_second=round(sampled / MB / elapsed, 1),
+                input_bytes=sampled,
+                output_bytes=output,
+            )
+        )
+    compress, codec, reason = recommend(results)
+    return CompressionSample(
+        source=source,
+        files=len(files),
+        sampled_bytes=sampled,
+        results=results,
+        compress=compress,
+        codec=codec,
+        reason=reason,
+    )
+
+
+def main() -> None:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("source")
+    parser.add_argument("--sample-mb", type=float, default=SAMPLE_BYTES / MB)
+    parser.add_argument("--chunk-mb", type=float, default=CHUNK_BYTES / MB)
+    parser.add_argument("--files", type=int, default=MAX_FILES)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+    try:
+        sample = sample_compression(
+            args.source,
+            sample_bytes=int(args.sample_mb * MB),
+            chunk_bytes=int(args.chunk_mb * MB),
+            max_files=args.files,
+            seed=args.seed,
+        )
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if args.json:
+        print(sample.model_dump_json(indent=2))
+        return
+    print(f"{sample.files} files, {sample.sampled_bytes / MB:.1f} MB sampled")
+    for r in sample.results:
+        print(
+            f"  {r.codec:<8} ratio {r.ratio:6.2f}  {r.mb_per_second:7.1f} MB/s"
+        )
+    verdict = "compress" if sample.compress else "don't compress"
+    print(f"{verdict}: {sample.reason}")
+
+
+if __name__ == "__main__":
+    main()
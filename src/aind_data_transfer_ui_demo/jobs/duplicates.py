@@ -0,0 +1,167 @@
+"""Detection of upload jobs that were already submitted
+
+An upload job's identity is a hash of what it transfers: subject_id,
+acq_datetime, platform and the (modality, source) pairs of its modalities,
+canonicalized so that e.g. a trailing slash on a source or a different
+datetime format doesn't make a resubmission look new. Identities can be
+computed from BasicUploadJobConfigsFastUI or BasicUploadJobConfigsSimple
+form data as well as from validated BasicUploadJobConfigs dumps.
+
+The submission queue records the identity of every queued upload job (see
+jobs/submission.py), so a job can be checked against history with a
+primary key lookup, and against the other jobs of its batch in memory.
+"""
+
+import hashlib
+import json
+import posixpath
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Mapping, Optional, Sequence, Union
+
+from pydantic import BaseModel
+
+# acq_datetime formats accepted by BasicUploadJobConfigs besides ISO 8601
+DATETIME_FORMATS = ("%m/%d/%Y %I:%M:%S %p",)
+
+
+def _abbreviation(value: Any) -> str:
+    """Platform or modality abbreviation, from an enum or string form value
+    or from a full model dump"""
+    if isinstance(value, dict):
+        value = value["abbreviation"]
+    return str(getattr(value, "value", value)).strip().lower()
+
+
+def _datetime(value: Any) -> str:
+    """acq_datetime as ISO 8601 text, in UTC if it has a timezone"""
+    if isinstance(value, str):
+        text = value.strip()
+        try:
+            value = datetime.fromisoformat(text)
+        except ValueError:
+            for fmt in DATETIME_FORMATS:
+                try:
+                    value = datetime.strptime(text, fmt)
+                    break
+                except ValueError:
+                    continue
+            else:
+                # not a datetime the models accept, compare as given
+                return text
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.isoformat()
+
+
+def _source(value: Any) -> str:
+    """Source folder with separators, trailing slashes and dot segments
+    normalized"""
+    return posixpath.normpath(str(value).strip().replace("\\", "/"))
+
+
+def job_identity(job: Union[dict, BaseModel]) -> str:
+    """
+    Hex digest identifying the data an upload job transfers. Takes a
+    BasicUploadJobConfigsFastUI (single modality), BasicUploadJobConfigsSimple
+    or BasicUploadJobConfigs model or dump. Raises KeyError or TypeError if
+    an identity field is missing.
+    """
+    if isinstance(job, BaseModel):
+        job = job.model_dump()
+    modalities = job.get("modalities")
+    if modalities is None:
+        modalities = [job["modality"]]
+    canonical = [
+        str(job["subject_id"]).strip(),
+        _datetime(job["acq_datetime"]),
+        _abbreviation(job["platform"]),
+        sorted(
+            [_abbreviation(m["modality"]), _source(m["source"])]
+            for m in modalities
+        ),
+    ]
+    text = json.dumps(canonical, separators=(",", ":"))
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def try_job_identity(job: dict) -> Optional[str]:
+    """Identity of a job that may not be valid, None if it has none"""
+    try:
+        return job_identity(job)
+    except (KeyError, TypeError, AttributeError):
+        return None
+
+
+@dataclass(frozen=True)
+class Duplicate:
+    """An upload job that was already submitted, or that repeats an earlier
+    job of the same batch"""
+
+    index: int
+    identity: str
+    # job id of the earlier submission of the same data
+    job_id: Optional[str] = None
+    # index of the first job in the batch with the same data
+    batch_index: Optional[int] = None
+
+    @property
+    def message(self) -> str:
+        """Human readable description"""
+        if self.job_id is not None:
+            return (
+                f"upload job {self.index} was already submitted as job "
+                f"{self.job_id}"
+            )
+        return (
+            f"upload job {self.index} is the same as upload job "
+            f"{self.batch_index}"
+        )
+
+    def to_json(self) -> dict:
+        """Json-able description"""
+        return {
+            "index": self.index,
+            "identity": self.identity,
+            "job_id": self.job_id,
+            "batch_index": self.batch_index,
+            "message": self.message,
+        }
+
+
+def find_duplicates(
+    identities: Sequence[Optional[str]], submitted: Mapping[str, str]
+) -> list[Duplicate]:
+    """
+    Jobs of a batch, given by their identities (None to skip a job), that
+    are in submitted (identity -> job id of earlier submissions) or repeat
+    an earlier job of the batch. The first of repeated jobs is only
+    reported if it was submitted before.
+    """
+    duplicates = []
+    first_index: dict[str, int] = {}
+    for index, identity in enumerate(identities):
+        if identity is None:
+            continue
+        batch_index = first_index.setdefault(identity, index)
+        if batch_index == index:
+            batch_index = None
+        if identity in submitted or batch_index is not None:
+            duplicates.append(
+                Duplicate(
+                    index=index,
+                    identity=identity,
+                    job_id=submitted.get(identity),
+                    batch_index=batch_index,
+                )
+            )
+    return duplicates
+
+
+class DuplicateJobsError(Exception):
+    """A submission contains upload jobs that were already submitted"""
+
+    def __init__(self, duplicates: list[Duplicate]):
+        """duplicates are the offending jobs"""
+        self.duplicates = duplicates
+        super().__init__("; ".join(d.message for d in duplicates))
@@ -0,0 +1,119 @@
+"""Packing of large job lists into balanced SubmitJobRequests
+
+A SubmitJobRequest takes at most MAX_UPLOAD_JOBS upload jobs. Longer lists
+are split into as few requests as the cap (and an optional byte budget per
+request) allows, with the bytes to transfer spread as evenly as possible
+over the requests, so one request doesn't end up with all the largest
+sessions.
+
+Jobs are placed largest first, each into the request with the fewest bytes
+that still has room (longest processing time first), which is O(n log n)
+and leaves the largest request close to the mean unless a few jobs
+dominate the total. Jobs larger than the byte budget are set aside first,
+each in a request of its own.
+"""
+
+import heapq
+import math
+from dataclasses import dataclass, field
+from typing import Optional, Sequence
+
+from aind_data_transfer_ui_demo.jobs.submission import MAX_UPLOAD_JOBS
+
+
+@dataclass
+class Pack:
+    """Jobs sent together in one SubmitJobRequest"""
+
+    # positions of the jobs in the packed list, in their original order
+    indices: list[int] = field(default_factory=list)
+    bytes: int = 0
+
+
+def _is_oversize(size: int, max_bytes: Optional[int]) -> bool:
+    """Whether a job is too large to share a request within max_bytes"""
+    return bool(max_bytes) and size > max_bytes
+
+
+def num_packs(
+    sizes: Sequence[int],
+    max_jobs: int = MAX_UPLOAD_JOBS,
+    max_bytes: Optional[int] = None,
+) -> int:
+    """Fewest requests that respect max_jobs and, as far as possible,
+    max_bytes. A job larger than max_bytes gets a request to itself."""
+    oversize = sum(_is_oversize(size, max_bytes) for size in sizes)
+    rest = [size for size in sizes if not _is_oversize(size, max_bytes)]
+    count = math.ceil(len(rest) / max_jobs)
+    if max_bytes:
+        count = max(count, math.ceil(sum(rest) / max_bytes))
+    count = max(1, min(count, len(rest))) if rest else 0
+    return oversize + count
+
+
+def pack_jobs(
+    sizes: Sequence[int],
+    max_jobs: int = MAX_UPLOAD_JOBS,
+    max_bytes: Optional[int] = None,
+) -> list[Pack]:
+    """
+    Split jobs with estimated sizes into balanced requests of at most
+    max_jobs jobs.
+
+    Parameters
+    ----------
+    sizes : Sequence[int]
+      Estimated bytes of each job, 0 if unknown
+    max_jobs : int
+      Upload jobs per request
+    max_bytes : Optional[int]
+      Target bytes per request, which sets a lower bound on the number of
+      requests. Requests end up evenly loaded rather than filled up to it.
+      A job larger than max_bytes is sent in a request of its own.
+
+    Returns
+    -------
+    list[Pack]
+      Requests, largest first
+    """
+    if max_jobs < 1:
+        raise ValueError("max_jobs must be at least 1")
+    if any(size < 0 for size in sizes):
+        raise ValueError("sizes must not be negative")
+    packs = [
+        Pack([index], size)
+        for index, size in enumerate(sizes)
+        if _is_oversize(size, max_bytes)
+    ]
+    rest = [
+        i for i, size in enumerate(sizes) if not _is_oversize(size, max_bytes)
+    ]
+    shared = [
+        Pack()
+        for _ in range(
+            num_packs([sizes[i] for i in rest], max_jobs, max_bytes)
+        )
+    ]
+    # (bytes, jobs, position) of the packs with room left. Ties go to the
+    # pack with fewer jobs, which spreads jobs of unknown size evenly.
+    heap = [(0, 0, i) for i in range(len(shared))]
+    for index in sorted(rest, key=lambda i: sizes[i], reverse=True):
+        total, count, position = heapq.heappop(heap)
+        pack = shared[position]
+        pack.indices.append(index)
+        pack.bytes = total + sizes[index]
+        if count + 1 < max_jobs:
+            heapq.heappush(heap, (pack.bytes, count + 1, position))
+    for pack in shared:
+        pack.indices.sort()
+    packs.extend(shared)
+    packs.sort(key=lambda p: p.bytes, reverse=True)
+    return packs
+
+
+def imbalance(packs: Sequence[Pack]) -> Optional[float]:
+    """Bytes of the largest request over the mean, 1.0 when balanced"""
+    total = sum(p.bytes for p in packs)
+    if not packs or not total:
+        return None
+    return max(p.bytes for p in packs) / (total / len(packs))
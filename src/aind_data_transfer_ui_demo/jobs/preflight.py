@@ -0,0 +1,406 @@
+"""Preflight checks of the paths in upload jobs
+
+ModalityConfigs.source, extra_configs and metadata_dir are plain strings to
+the models, so a typo only shows when the job runs on the cluster. The
+preflight checks that they exist and counts the files and bytes below each
+one before the jobs are sent.
+
+Folders are walked one directory listing at a time on a bounded thread
+pool with os.scandir, so the listings of every path in a batch, and of the
+subfolders of a path, run concurrently instead of one stat call after the
+other on a network mount. A scanned folder's totals are cached by path and
+mtime, and reused for up to max_age seconds while its mtime is unchanged.
+Only the folder's own mtime is compared, which changes when entries are
+added to or removed from it but not when files deeper down change, hence
+the max_age.
+
+The server only looks at paths below AIND_SOURCE_ROOTS (os.pathsep
+separated folders). Other paths are reported as not allowed without being
+looked at, so the preflight doesn't tell whether they exist. With no roots
+configured, no path is allowed.
+"""
+
+import asyncio
+import os
+import stat
+import threading
+import time
+from collections import OrderedDict
+from concurrent import futures
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Iterable, Optional
+
+PREFLIGHT_MAX_WORKERS = int(os.getenv("AIND_PREFLIGHT_MAX_WORKERS", 32))
+PREFLIGHT_CACHE_SECONDS = float(os.getenv("AIND_PREFLIGHT_CACHE_SECONDS", 300))
+SOURCE_ROOTS = [
+    os.path.realpath(root)
+    for root in os.getenv("AIND_SOURCE_ROOTS", "").split(os.pathsep)
+    if root
+]
+OUTSIDE_ROOTS = "Path is not below an allowed root"
+
+
+@dataclass
+class PathReport:
+    """What was found at a path"""
+
+    path: str
+    exists: bool
+    is_dir: bool = False
+    files: int = 0
+    bytes: int = 0
+    # listings that could not be read, e.g. permission denied
+    errors: list[str] = field(default_factory=list)
+    cached: bool = False
+    # files and bytes extrapolated from a walk cut short, see check_sync
+    estimated: bool = False
+
+
+@dataclass
+class _Listing:
+    """Totals of one directory listing and the subdirectories to list"""
+
+    files: int = 0
+    bytes: int = 0
+    dirs: list[str] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+
+
+def _list_dir(path: str) -> _Listing:
+    """Count the files directly in a directory. Symlinks are not followed,
+    so a link can't count files outside the roots."""
+    listing = _Listing()
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        listing.dirs.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        listing.files += 1
+                        stat = entry.stat(follow_symlinks=False)
+                        listing.bytes += stat.st_size
+                except OSError as e:
+                    listing.errors.append(f"{entry.path}: {e.strerror}")
+    except OSError as e:
+        listing.errors.append(f"{path}: {e.strerror}")
+    return listing
+
+
+def allowed_path(path: str, roots: Optional[list[str]]) -> Optional[str]:
+    """Real path of path if it is below one of roots, else None. Symlinks
+    are resolved first, so a link can't lead out of a root. With roots None
+    every path is allowed."""
+    try:
+        real = os.path.realpath(path)
+    except (OSError, ValueError):
+        return None
+    if roots is None:
+        return real
+    for root in roots:
+        if os.path.commonpath([real, root]) == root:
+            return real
+    return None
+
+
+def _stat(path: str) -> Optional[os.stat_result]:
+    """stat of a path, None if it does not exist"""
+    try:
+        return os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+class PathChecker:
+    """Checks paths on a bounded thread pool and caches folder totals"""
+
+    def __init__(
+        self,
+        max_workers: int = PREFLIGHT_MAX_WORKERS,
+        max_age: float = PREFLIGHT_CACHE_SECONDS,
+        max_entries: int = 4096,
+        roots: Optional[list[str]] = None,
+    ):
+        """
+        Parameters
+        ----------
+        max_workers : int
+          Directory listings and stat calls running at once
+        max_age : float
+          Seconds a folder's cached totals are reused while its mtime is
+          unchanged
+        max_entries : int
+          Folders kept in the cache, least recently used are evicted
+        roots : Optional[list[str]]
+          Real paths of the folders paths have to be below, None to allow
+          every path
+        """
+        self.max_workers = max_workers
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.roots = roots
+        self._pool: Optional[ThreadPoolExecutor] = None
+        # path -> (mtime_ns, checked at, report)
+        self._cache: OrderedDict[str, tuple[int, float, PathReport]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._in_flight: dict[str, asyncio.Future] = {}
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        """Underlying pool, created on first use"""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                self.max_workers, thread_name_prefix="preflight"
+            )
+        return self._pool
+
+    def _cache_get(self, path: str, mtime_ns: int) -> Optional[PathReport]:
+        """Cached report of a folder, if fresh and its mtime is unchanged"""
+        with self._lock:
+            entry = self._cache.get(path)
+            if entry is None:
+                return None
+            cached_mtime, checked_at, report = entry
+            if (
+                cached_mtime != mtime_ns
+                or time.monotonic() - checked_at > self.max_age
+            ):
+                del self._cache[path]
+                return None
+            self._cache.move_to_end(path)
+        return PathReport(**{**asdict(report), "cached": True})
+
+    def _cache_set(self, path: str, mtime_ns: int, report: PathReport):
+        """Store a folder's report, evicting the least recently used"""
+        with self._lock:
+            self._cache[path] = (mtime_ns, time.monotonic(), report)
+            self._cache.move_to_end(path)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def _lookup(self, path: str) -> tuple[Optional[PathReport], int]:
+        """
+        stat a path. Returns its report unless it is a folder that has to
+        be walked (missing paths, files and cached folders need no walk),
+        and the folder's mtime to cache the walk under. Paths outside the
+        roots are not looked at.
+        """
+        if allowed_path(path, self.roots) is None:
+            report = PathReport(
+                path=path, exists=False, errors=[OUTSIDE_ROOTS]
+            )
+            return report, 0
+        try:
+            st = _stat(path)
+        except OSError as e:
+            return PathReport(path=path, exists=False, errors=[e.strerror]), 0
+        if st is None:
+            return PathReport(path=path, exists=False), 0
+        if not stat.S_ISDIR(st.st_mode):
+            return (
+                PathReport(path=path, exists=True, files=1, bytes=st.st_size),
+                0,
+            )
+        return self._cache_get(path, st.st_mtime_ns), st.st_mtime_ns
+
+    @staticmethod
+    def _add(report: PathReport, listing: _Listing) -> None:
+        """Add a directory listing to a folder's totals"""
+        report.files += listing.files
+        report.bytes += listing.bytes
+        report.errors.extend(listing.errors)
+
+    async def _walk(self, path: str) -> PathReport:
+        """Total the files below a folder, listing subfolders in parallel"""
+        loop = asyncio.get_running_loop()
+        report = PathReport(path=path, exists=True, is_dir=True)
+        pending = {loop.run_in_executor(self.pool, _list_dir, path)}
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for future in done:
+                listing: _Listing = future.result()
+                self._add(report, listing)
+                pending.update(
+                    loop.run_in_executor(self.pool, _list_dir, d)
+                    for d in listing.dirs
+                )
+        return report
+
+    def _walk_sync(
+        self, path: str, max_listings: Optional[int] = None
+    ) -> PathReport:
+        """Blocking version of _walk. After max_listings directory listings
+        no more folders are listed, and the totals are scaled up by the
+        number of folders that were found but not listed."""
+        report = PathReport(path=path, exists=True, is_dir=True)
+        pending = {self.pool.submit(_list_dir, path)}
+        listed = unlisted = 0
+        while pending:
+            done, pending = futures.wait(
+                pending, return_when=futures.FIRST_COMPLETED
+            )
+            for future in done:
+                listing = future.result()
+                listed += 1
+                self._add(report, listing)
+                for d in listing.dirs:
+                    if max_listings and listed + len(pending) >= max_listings:
+                        unlisted += 1
+                    else:
+                        pending.add(self.pool.submit(_list_dir, d))
+        if unlisted:
+            scale = (listed + unlisted) / listed
+            report.files = round(report.files * scale)
+            report.bytes = round(report.bytes * scale)
+            report.estimated = True
+        return report
+
+    async def _check(self, path: str) -> PathReport:
+        """Report on a path, from the cache if possible"""
+        loop = asyncio.get_running_loop()
+        report, mtime_ns = await loop.run_in_executor(
+            self.pool, self._lookup, path
+        )
+        if report is None:
+            report = await self._walk(path)
+            self._cache_set(path, mtime_ns, report)
+        return report
+
+    def check_sync(
+        self, path: str, max_listings: Optional[int] = None
+    ) -> PathReport:
+        """
+        Report on a path from code that can't await, e.g. in the
+        validation executor. Shares the cache with check() of the same
+        checker, so only within a process. A folder that takes more than
+        max_listings directory listings gets estimated totals, which are
+        not cached.
+        """
+        report, mtime_ns = self._lookup(path)
+        if report is None:
+            report = self._walk_sync(path, max_listings)
+            if not report.estimated:
+                self._cache_set(path, mtime_ns, report)
+        return report
+
+    async def check(self, path: str) -> PathReport:
+        """Report on a path. Concurrent checks of a path share one scan."""
+        task = self._in_flight.get(path)
+        if task is None:
+            task = asyncio.ensure_future(self._check(path))
+            self._in_flight[path] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(path, None))
+        return await asyncio.shield(task)
+
+    async def check_paths(self, paths: Iterable[str]) -> dict[str, PathReport]:
+        """Reports on paths, checked concurrently, by path"""
+        unique = list(dict.fromkeys(paths))
+        reports = await asyncio.gather(*(self.check(p) for p in unique))
+        return dict(zip(unique, reports))
+
+    def clear(self) -> None:
+        """Drop the cached folder totals"""
+        self._cache.clear()
+
+    def shutdown(self) -> None:
+        """Stop the workers, dropping listings that have not started"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+def job_paths(job: dict) -> list[tuple[list, str, bool]]:
+    """
+    (loc, path, whether it should be a folder) of the paths in a
+    BasicUploadJobConfigsFastUI, BasicUploadJobConfigsSimple or
+    BasicUploadJobConfigs dump. Blank optional paths are left out.
+    """
+    modalities = job.get("modalities")
+    if modalities is None:
+        modalities = [(["modality"], job.get("modality"))]
+    else:
+        modalities = [(["modalities", i], m) for i, m in enumerate(modalities)]
+    paths = []
+    for loc, modality in modalities:
+        if not isinstance(modality, dict):
+            continue
+        for name, is_dir in (("source", True), ("extra_configs", False)):
+            if modality.get(name):
+                paths.append(([*loc, name], str(modality[name]), is_dir))
+    if job.get("metadata_dir"):
+        paths.append((["metadata_dir"], str(job["metadata_dir"]), True))
+    return paths
+
+
+def _path_result(loc: list, is_dir: bool, report: PathReport) -> dict:
+    """Json-able result of one path of a job, with an error message if the
+    path is missing or of the wrong kind"""
+    error = None
+    if not report.exists:
+        error = "; ".join(report.errors) or "Path does not exist"
+    elif is_dir and not report.is_dir:
+        error = "Expected a folder, found a file"
+    elif not is_dir and report.is_dir:
+        error = "Expected a file, found a folder"
+    return {"loc": loc, **asdict(report), "error": error}
+
+
+async def preflight_jobs(
+    jobs: list[dict], checker: Optional[PathChecker] = None
+) -> dict[str, Any]:
+    """
+    Checks every path of the upload jobs concurrently. Returns
+    {"jobs": [{"index", "ok", "paths": [...]}, ...], "summary": {...}}
+    where each path has its loc, whether it exists, its file count and
+    bytes, and an error message if it is not usable.
+    """
+    checker = checker or path_checker
+    paths = [job_paths(job) for job in jobs]
+    reports = await checker.check_paths(
+        path for job in paths for _, path, _ in job
+    )
+    results = []
+    for index, job in enumerate(paths):
+        checked = [
+            _path_result(loc, is_dir, reports[path])
+            for loc, path, is_dir in job
+        ]
+        results.append(
+            {
+                "index": index,
+                "ok": all(p["error"] is None for p in checked),
+                "paths": checked,
+            }
+        )
+    return {
+        "jobs": results,
+        "summary": {
+            "jobs": len(results),
+            "failed": sum(not r["ok"] for r in results),
+            "paths": len(reports),
+            "files": sum(r.files for r in reports.values()),
+            "bytes": sum(r.bytes for r in reports.values()),
+        },
+    }
+
+
+async def estimate_sizes(
+    jobs: list[dict], checker: Optional[PathChecker] = None
+) -> list[int]:
+    """Bytes below the sources of each upload job, 0 for sources that
+    can't be read"""
+    checker = checker or path_checker
+    sources = [
+        [path for loc, path, _ in job_paths(job) if loc[-1] == "source"]
+        for job in jobs
+    ]
+    reports = await checker.check_paths(p for job in sources for p in job)
+    return [sum(reports[p].bytes for p in job) for job in sources]
+
+
+path_checker = PathChecker(roots=SOURCE_ROOTS)
@@ -0,0 +1,266 @@
+"""Job status store backed by SQLite
+
+The store is a single SQLite file in WAL mode, so the web workers can read
+while jobs are being recorded. Every filterable column has an index that
+ends in submit_time, so the default "newest first" ordering of a filtered
+page is read straight off the index instead of sorting the matching rows.
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Iterable, Literal, Optional
+
+from pydantic import BaseModel, Field, field_validator
+
+# in the user's data directory, not wherever the server was started from
+DATA_DIR = os.path.join(
+    os.getenv("XDG_DATA_HOME") or os.path.expanduser("~/.local/share"),
+    "aind-data-transfer-ui-demo",
+)
+JOB_STATUS_DB = os.getenv(
+    "AIND_JOB_STATUS_DB", os.path.join(DATA_DIR, "job_status.db")
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    name TEXT,
+    subject_id TEXT NOT NULL,
+    project_name TEXT NOT NULL,
+    platform TEXT,
+    modalities TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL,
+    submit_time TEXT NOT NULL,
+    start_time TEXT,
+    end_time TEXT,
+    message TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_submit_time ON jobs (submit_time);
+CREATE INDEX IF NOT EXISTS jobs_subject_id
+    ON jobs (subject_id, submit_time);
+CREATE INDEX IF NOT EXISTS jobs_project_name
+    ON jobs (project_name, submit_time);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, submit_time);
+"""
+COLUMNS = (
+    "job_id",
+    "name",
+    "subject_id",
+    "project_name",
+    "platform",
+    "modalities",
+    "status",
+    "submit_time",
+    "start_time",
+    "end_time",
+    "message",
+)
+
+
+class JobState(str, Enum):
+    """Lifecycle of a submitted job"""
+
+    PENDING = "pending"
+    SUBMITTED = "submitted"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class JobStatus(BaseModel):
+    """Status of one upload job"""
+
+    job_id: str = Field(..., title="Job ID")
+    name: Optional[str] = Field(default=None, title="Name")
+    subject_id: str = Field(..., title="Subject ID")
+    project_name: str = Field(..., title="Project Name")
+    platform: Optional[str] = Field(default=None, title="Platform")
+    modalities: list[str] = Field(default=[], title="Modalities")
+    status: JobState = Field(..., title="Status")
+    submit_time: datetime = Field(..., title="Submit Time")
+    start_time: Optional[datetime] = Field(default=None, title="Start Time")
+    end_time: Optional[datetime] = Field(default=None, title="End Time")
+    message: Optional[str] = Field(default=None, title="Message")
+
+
+class JobFilter(BaseModel):
+    """Filters and ordering for a page of jobs. Also used as the filter form
+    on the Job Status page, so every field is optional."""
+
+    subject_id: Optional[str] = Field(default=None, title="Subject ID")
+    project_name: Optional[str] = Field(default=None, title="Project Name")
+    status: Optional[JobState] = Field(default=None, title="Status")
+    sort: Literal["submit_time", "subject_id", "project_name", "status"] = (
+        Field(default="submit_time", title="Sort by")
+    )
+    order: Literal["desc", "asc"] = Field(default="desc", title="Order")
+
+    @field_validator("subject_id", "project_name", "status", mode="before")
+    def empty_as_none(cls, value):
+        """Blank filter form fields are submitted as empty strings"""
+        return None if value == "" else value
+
+
+def _timestamp(value: Optional[datetime]) -> Optional[str]:
+    """UTC ISO 8601 text, which sorts chronologically"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat()
+
+
+def _to_row(job: JobStatus) -> tuple:
+    """Column values for a job, in COLUMNS order"""
+    return (
+        job.job_id,
+        job.name,
+        job.subject_id,
+        job.project_name,
+        job.platform,
+        ",".join(job.modalities),
+        job.status.value,
+        _timestamp(job.submit_time),
+        _timestamp(job.start_time),
+        _timestamp(job.end_time),
+        job.message,
+    )
+
+
+def _from_row(row: sqlite3.Row) -> JobStatus:
+    """Job for a row selected with COLUMNS"""
+    values = dict(row)
+    values["modalities"] = [m for m in values["modalities"].split(",") if m]
+    return JobStatus(**values)
+
+
+class SQLiteStore:
+    """Base for stores in the job database. Safe to share between threads:
+    each thread gets its own connection. Subclasses set schema."""
+
+    schema = ""
+
+    def __init__(self, path: str = JOB_STATUS_DB):
+        """path is a file name, or ":memory:" for a private throwaway db"""
+        self.path = path
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use"""
+        conn = getattr(self._local, "connection", None)
+        if conn is None:
+            if self.path != ":memory:":
+                folder = os.path.dirname(os.path.abspath(self.path))
+                os.makedirs(folder, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            # durable at checkpoints, which is enough for status bookkeeping
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._schema_lock:
+                if not self._schema_ready or self.path == ":memory:":
+                    conn.executescript(self.schema)
+                    self._schema_ready = True
+            self._local.connection = conn
+        return conn
+
+    def close(self) -> None:
+        """Close this thread's connection"""
+        conn = getattr(self._local, "connection", None)
+        if conn is not None:
+            conn.close()
+            self._local.connection = None
+
+
+class JobStatusStore(SQLiteStore):
+    """Reads and writes job statuses"""
+
+    schema = SCHEMA
+
+    def upsert(self, jobs: Iterable[JobStatus]) -> None:
+        """Insert jobs, replacing any with the same job_id"""
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        updates = ", ".join(f"{c} = excluded.{c}" for c in COLUMNS[1:])
+        with self.connection as conn:
+            conn.executemany(
+                f"INSERT INTO jobs ({', '.join(COLUMNS)}) "
+                f"VALUES ({placeholders}) "
+                f"ON CONFLICT (job_id) DO UPDATE SET {updates}",
+                (_to_row(job) for job in jobs),
+            )
+
+    def set_status(
+        self,
+        job_ids: Iterable[str],
+        status: JobState,
+        message: Optional[str] = None,
+    ) -> None:
+        """Update the status of jobs, recording start and end times"""
+        now = _timestamp(datetime.now(timezone.utc))
+        start = now if status == JobState.RUNNING else None
+        end = now if status in (JobState.COMPLETED, JobState.FAILED) else None
+        with self.connection as conn:
+            conn.executemany(
+                "UPDATE jobs SET status = ?, message = ?, "
+                "start_time = coalesce(?, start_time), "
+                "end_time = coalesce(?, end_time) WHERE job_id = ?",
+                (
+                    (status.value, message, start, end, job_id)
+                    for job_id in job_ids
+                ),
+            )
+
+    def delete(self, job_ids: Iterable[str]) -> None:
+        """Remove jobs"""
+        with self.connection as conn:
+            conn.executemany(
+                "DELETE FROM jobs WHERE job_id = ?",
+                ((job_id,) for job_id in job_ids),
+            )
+
+    def get(self, job_id: str) -> Optional[JobStatus]:
+        """Job with job_id, or None"""
+        row = self.connection.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM jobs WHERE job_id = ?",
+            (job_id,),
+        ).fetchone()
+        return None if row is None else _from_row(row)
+
+    def query(
+        self, job_filter: JobFilter, page: int = 1, page_size: int = 50
+    ) -> tuple[list[JobStatus], int]:
+        """One page of the jobs matching job_filter and the total number of
+        matching jobs. Pages are numbered from 1."""
+        where, params = [], []
+        for column in ("subject_id", "project_name", "status"):
+            value = getattr(job_filter, column)
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(getattr(value, "value", value))
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+        # sort and order are Literals, so safe to format into the sql. The
+        # indexes end in (submit_time, rowid), so these orderings are index
+        # scans. rowid breaks ties so pages don't overlap.
+        keys = dict.fromkeys([job_filter.sort, "submit_time", "rowid"])
+        order = "ORDER BY " + ", ".join(
+            f"{k} {job_filter.order}" for k in keys
+        )
+        conn = self.connection
+        total = conn.execute(
+            f"SELECT count(*) FROM jobs {clause}", params
+        ).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM jobs {clause} {order} "
+            "LIMIT ? OFFSET ?",
+            [*params, page_size, (page - 1) * page_size],
+        ).fetchall()
+        return [_from_row(row) for row in rows], total
+
+
+job_status_store = JobStatusStore()
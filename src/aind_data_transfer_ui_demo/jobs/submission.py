@@ -0,0 +1,555 @@
+"""Durable submission queue toward aind-data-transfer-service
+
+Validated SubmitJobRequests are written to a queue table in the job
+database and acknowledged straight away. A background worker coalesces
+queued requests that share their request-level fields into batched POSTs
+of up to MAX_UPLOAD_JOBS upload jobs, and retries failed batches with
+exponential backoff.
+
+Each batch gets an idempotency key when it is first claimed and keeps it,
+and its members, across retries, so the service can drop a batch it has
+already accepted if only the response was lost.
+
+Several workers (web workers, pods) can share the queue. Claiming a batch
+moves its submissions to 'sending' with a lease, in the same transaction
+that selects them, so other workers skip it. A batch whose worker died is
+claimed again once its lease expires.
+
+The identity of every queued upload job (see jobs/duplicates.py) is
+recorded next to its submission, so submitting the same data again is
+refused unless duplicates are explicitly allowed. The check and the insert
+share one BEGIN IMMEDIATE transaction, so concurrent submissions of the
+same data can't both pass it. Jobs of failed submissions don't count as
+submitted.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+import httpx
+
+from aind_data_transfer_ui_demo.jobs.duplicates import (
+    Duplicate,
+    DuplicateJobsError,
+    find_duplicates,
+    job_identity,
+)
+from aind_data_transfer_ui_demo.jobs.store import (
+    JobState,
+    JobStatus,
+    JobStatusStore,
+    SQLiteStore,
+    job_status_store,
+)
+
+logger = logging.getLogger(__name__)
+
+DATA_TRANSFER_SERVICE_URL = os.getenv(
+    "AIND_DATA_TRANSFER_SERVICE_URL", "http://aind-data-transfer-service"
+)
+SUBMIT_JOBS_PATH = "/api/v1/submit_jobs"
+# SubmitJobRequest accepts up to 1000 upload_jobs
+MAX_UPLOAD_JOBS = 1000
+# responses worth retrying, anything else 4xx is a permanent failure
+RETRY_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+# identities per lookup, below SQLite's limit on query parameters
+LOOKUP_CHUNK_SIZE = 500
+# seconds a worker has to send a batch it claimed before others may retake
+# it, comfortably more than the request timeout
+SEND_LEASE = 120.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    key TEXT PRIMARY KEY,
+    request TEXT NOT NULL,
+    request_fields TEXT NOT NULL,
+    num_jobs INTEGER NOT NULL,
+    -- queued, sending, sent or failed
+    state TEXT NOT NULL,
+    batch TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    -- when a queued submission is due, or a sending one's lease expires
+    next_attempt REAL NOT NULL,
+    created REAL NOT NULL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS submissions_due
+    ON submissions (state, next_attempt);
+CREATE INDEX IF NOT EXISTS submissions_batch ON submissions (batch);
+CREATE TABLE IF NOT EXISTS job_identities (
+    identity TEXT NOT NULL,
+    submission TEXT NOT NULL,
+    job_index INTEGER NOT NULL,
+    PRIMARY KEY (identity, submission, job_index)
+) WITHOUT ROWID;
+"""
+
+
+@dataclass
+class Batch:
+    """Queued submissions sent together as one SubmitJobRequest"""
+
+    key: str
+    submissions: list[str]
+    jobs: list[str]
+    request: dict
+    attempts: int
+
+
+def _request_fields(request: dict) -> str:
+    """Request-level fields as canonical json. Submissions with the same
+    fields can share a SubmitJobRequest."""
+    fields = {k: v for k, v in request.items() if k != "upload_jobs"}
+    return json.dumps(fields, sort_keys=True)
+
+
+def job_id(key: str, index: int) -> str:
+    """Job Status id of an upload job in a submission"""
+    return f"{key}-{index}"
+
+
+class SubmissionQueue(SQLiteStore):
+    """Submissions waiting to be sent, in the job database"""
+
+    schema = SCHEMA
+
+    def enqueue(
+        self,
+        request: dict,
+        key: Optional[str] = None,
+        allow_duplicates: bool = True,
+    ) -> str:
+        """
+        Queue a json-mode dump of a validated SubmitJobRequest. Returns the
+        submission key. Enqueueing an existing key again is a no-op, so
+        clients can retry with their own key. Unless allow_duplicates,
+        raises DuplicateJobsError if the request repeats upload jobs. The
+        check and the insert are one transaction, so of two concurrent
+        submissions of the same jobs only the first is queued.
+        """
+        key = key or uuid.uuid4().hex
+        now = time.time()
+        conn = self.connection
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if self.exists(key):
+                return key
+            if not allow_duplicates:
+                duplicates = self.find_duplicates(request, key)
+                if duplicates:
+                    raise DuplicateJobsError(duplicates)
+            conn.execute(
+                "INSERT INTO submissions (key, request, "
+                "request_fields, num_jobs, state, next_attempt, created) "
+                "VALUES (?, ?, ?, ?, 'queued', ?, ?)",
+                (
+                    key,
+                    json.dumps(request),
+                    _request_fields(request),
+                    len(request["upload_jobs"]),
+                    now,
+                    now,
+                ),
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO job_identities "
+                "(identity, submission, job_index) VALUES (?, ?, ?)",
+                (
+                    (job_identity(job), key, i)
+                    for i, job in enumerate(request["upload_jobs"])
+                ),
+            )
+        return key
+
+    def submitted_jobs(
+        self, identities: list[str], exclude: Optional[str] = None
+    ) -> dict[str, str]:
+        """
+        Job ids of queued or sent upload jobs with any of identities, by
+        identity. Jobs of the submission with key exclude are left out.
+        """
+        submitted = {}
+        unique = list(dict.fromkeys(identities))
+        for start in range(0, len(unique), LOOKUP_CHUNK_SIZE):
+            end = start + LOOKUP_CHUNK_SIZE
+            chunk = unique[start:end]
+            rows = self.connection.execute(
+                "SELECT i.identity, i.submission, i.job_index "
+                "FROM job_identities i "
+                "JOIN submissions s ON s.key = i.submission "
+                f"WHERE i.identity IN ({', '.join('?' * len(chunk))}) "
+                "AND s.state != 'failed' AND s.key IS NOT ? "
+                "ORDER BY s.created",
+                (*chunk, exclude),
+            ).fetchall()
+            for row in rows:
+                submitted.setdefault(
+                    row["identity"],
+                    job_id(row["submission"], row["job_index"]),
+                )
+        return submitted
+
+    def find_duplicates(
+        self, request: dict, key: Optional[str] = None
+    ) -> list[Duplicate]:
+        """Upload jobs of a json-mode SubmitJobRequest dump that were
+        already submitted, other than as submission key, or that repeat
+        another job of the request"""
+        identities = [job_identity(job) for job in request["upload_jobs"]]
+        return find_duplicates(
+            identities, self.submitted_jobs(identities, exclude=key)
+        )
+
+    def exists(self, key: str) -> bool:
+        """Whether a submission with key was queued before"""
+        row = self.connection.execute(
+            "SELECT 1 FROM submissions WHERE key = ?", (key,)
+        ).fetchone()
+        return row is not None
+
+    def claim_batches(
+        self,
+        now: float,
+        max_jobs: int = MAX_UPLOAD_JOBS,
+        lease: float = SEND_LEASE,
+    ) -> list[Batch]:
+        """
+        Batches that are due to be sent, leased to the caller for lease
+        seconds. Submissions that have not been sent before are packed, in
+        the order they were queued, into new batches of up to max_jobs
+        upload jobs. Retried batches, and batches whose lease expired, are
+        returned as they were first sent.
+        """
+        conn = self.connection
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT key, request, request_fields, num_jobs, batch, "
+                "attempts FROM submissions "
+                "WHERE state IN ('queued', 'sending') AND next_attempt <= ? "
+                "ORDER BY created",
+                (now,),
+            ).fetchall()
+            batches: dict[str, list[sqlite3.Row]] = {}
+            open_batches: dict[str, tuple[str, int]] = {}
+            for row in rows:
+                batch = row["batch"]
+                if batch is None:
+                    batch, size = open_batches.get(
+                        row["request_fields"], (None, 0)
+                    )
+                    if batch is None or size + row["num_jobs"] > max_jobs:
+                        batch, size = uuid.uuid4().hex, 0
+                    open_batches[row["request_fields"]] = (
+                        batch,
+                        size + row["num_jobs"],
+                    )
+                    conn.execute(
+                        "UPDATE submissions SET batch = ? WHERE key = ?",
+                        (batch, row["key"]),
+                    )
+                batches.setdefault(batch, []).append(row)
+            conn.executemany(
+                "UPDATE submissions SET state = 'sending', next_attempt = ? "
+                "WHERE key = ?",
+                ((now + lease, row["key"]) for row in rows),
+            )
+        return [self._batch(key, members) for key, members in batches.items()]
+
+    @staticmethod
+    def _batch(key: str, rows: list[sqlite3.Row]) -> Batch:
+        """Merge the requests of a batch's submissions"""
+        request = json.loads(rows[0]["request_fields"])
+        request["upload_jobs"] = [
+            job
+            for row in rows
+            for job in json.loads(row["request"])["upload_jobs"]
+        ]
+        return Batch(
+            key=key,
+            submissions=[row["key"] for row in rows],
+            jobs=[
+                job_id(row["key"], i)
+                for row in rows
+                for i in range(row["num_jobs"])
+            ],
+            request=request,
+            attempts=max(row["attempts"] for row in rows),
+        )
+
+    def mark_sent(self, batch: str) -> None:
+        """The service accepted the batch"""
+        with self.connection as conn:
+            conn.execute(
+                "UPDATE submissions SET state = 'sent', error = NULL, "
+                "attempts = attempts + 1 WHERE batch = ?",
+                (batch,),
+            )
+
+    def mark_retry(self, batch: str, error: str, delay: float) -> None:
+        """Sending failed, try the batch again after delay seconds"""
+        with self.connection as conn:
+            conn.execute(
+                "UPDATE submissions SET state = 'queued', "
+                "attempts = attempts + 1, error = ?, next_attempt = ? "
+                "WHERE batch = ?",
+                (error, time.time() + delay, batch),
+            )
+
+    def mark_failed(self, batch: str, error: str) -> None:
+        """The service rejected the batch, or retries ran out"""
+        with self.connection as conn:
+            conn.execute(
+                "UPDATE submissions SET state = 'failed', error = ?, "
+                "attempts = attempts + 1 WHERE batch = ?",
+                (error, batch),
+            )
+
+    def next_due(self) -> Optional[float]:
+        """Time the next queued submission is due, or the next lease
+        expires, if any"""
+        row = self.connection.execute(
+            "SELECT min(next_attempt) FROM submissions "
+            "WHERE state IN ('queued', 'sending')"
+        ).fetchone()
+        return row[0]
+
+    def counts(self) -> dict[str, int]:
+        """Number of submissions in each state"""
+        rows = self.connection.execute(
+            "SELECT state, count(*) FROM submissions GROUP BY state"
+        ).fetchall()
+        return {state: count for state, count in rows}
+
+
+def job_statuses(key: str, request: dict) -> list[JobStatus]:
+    """Pending Job Status entries for the upload jobs of a submission"""
+    submit_time = datetime.now(timezone.utc)
+    return [
+        JobStatus(
+            job_id=job_id(key, i),
+            name=job.get("s3_prefix"),
+            subject_id=job["subject_id"],
+            project_name=job["project_name"],
+            platform=(job.get("platform") or {}).get("abbreviation"),
+            modalities=[
+                m["modality"]["abbreviation"] for m in job["modalities"]
+            ],
+            status=JobState.PENDING,
+            submit_time=submit_time,
+        )
+        for i, job in enumerate(request["upload_jobs"])
+    ]
+
+
+class SubmissionWorker:
+    """Background task sending queued submissions to the service"""
+
+    def __init__(
+        self,
+        queue: SubmissionQueue,
+        status_store: JobStatusStore = job_status_store,
+        service_url: str = DATA_TRANSFER_SERVICE_URL,
+        max_jobs: int = MAX_UPLOAD_JOBS,
+        max_attempts: int = 8,
+        base_delay: float = 1.0,
+        max_delay: float = 300.0,
+        poll_interval: float = 30.0,
+        timeout: float = 30.0,
+        lease: float = SEND_LEASE,
+        max_connections: int = 4,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """
+        Parameters
+        ----------
+        queue : SubmissionQueue
+          Queue to drain
+        status_store : JobStatusStore
+          Where job statuses are recorded
+        service_url : str
+          Root url of aind-data-transfer-service
+        max_jobs : int
+          Maximum upload jobs per POST
+        max_attempts : int
+          Attempts before a batch is marked failed
+        base_delay : float
+          Seconds before the first retry, doubled for each further retry
+        max_delay : float
+          Upper bound on the retry delay in seconds
+        poll_interval : float
+          Seconds between checks of the queue when not woken up
+        timeout : float
+          Request timeout in seconds
+        lease : float
+          Seconds other workers leave a claimed batch alone, more than
+          timeout
+        max_connections : int
+          Size of the connection pool
+        transport : Optional[httpx.AsyncBaseTransport]
+          Custom transport, e.g. to point the worker at a local stand-in
+        """
+        self.queue = queue
+        self.status_store = status_store
+        self.service_url = service_url.rstrip("/")
+        self.max_jobs = max_jobs
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self._timeout = timeout
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        )
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared http client, created on first use"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.service_url,
+                timeout=self._timeout,
+                limits=self._limits,
+                transport=self._transport,
+            )
+        return self._client
+
+    async def submit(
+        self,
+        request: dict,
+        key: Optional[str] = None,
+        allow_duplicates: bool = False,
+    ) -> str:
+        """Queue a json-mode SubmitJobRequest dump and wake the worker.
+        Returns once the submission is stored, not when it is sent. Raises
+        DuplicateJobsError if the request repeats upload jobs, unless
+        allow_duplicates."""
+
+        key = key or uuid.uuid4().hex
+
+        def store() -> None:
+            """Blocking writes. Statuses go first so the worker never
+            updates statuses that don't exist yet, and are removed again if
+            the queue refuses the jobs as duplicates."""
+            if self.queue.exists(key):
+                return
+            statuses = job_statuses(key, request)
+            self.status_store.upsert(statuses)
+            try:
+                self.queue.enqueue(request, key, allow_duplicates)
+            except DuplicateJobsError:
+                self.status_store.delete(s.job_id for s in statuses)
+                raise
+
+        await asyncio.to_thread(store)
+        self._wakeup.set()
+        return key
+
+    def retry_delay(self, attempts: int) -> float:
+        """Exponential backoff with full jitter"""
+        delay = min(self.max_delay, self.base_delay * 2**attempts)
+        return random.uniform(delay / 2, delay)
+
+    async def _set_statuses(
+        self, batch: Batch, status: JobState, message: Optional[str]
+    ) -> None:
+        """Record the outcome of a batch on its jobs' statuses"""
+        await asyncio.to_thread(
+            self.status_store.set_status, batch.jobs, status, message
+        )
+
+    async def send(self, batch: Batch) -> None:
+        """POST one batch and record the outcome"""
+        try:
+            response = await self.client.post(
+                SUBMIT_JOBS_PATH,
+                json=batch.request,
+                headers={"Idempotency-Key": batch.key},
+            )
+        except httpx.TransportError as e:
+            error, retry = repr(e), True
+        else:
+            if response.is_success:
+                await asyncio.to_thread(self.queue.mark_sent, batch.key)
+                await self._set_statuses(batch, JobState.SUBMITTED, None)
+                return
+            error = f"{response.status_code}: {response.text[:500]}"
+            retry = response.status_code in RETRY_STATUS_CODES
+        if retry and batch.attempts + 1 < self.max_attempts:
+            delay = self.retry_delay(batch.attempts)
+            logger.warning(
+                "Batch %s failed (%s), retrying in %.1fs",
+                batch.key,
+                error,
+                delay,
+            )
+            await asyncio.to_thread(
+                self.queue.mark_retry, batch.key, error, delay
+            )
+        else:
+            logger.error("Batch %s failed: %s", batch.key, error)
+            await asyncio.to_thread(self.queue.mark_failed, batch.key, error)
+            await self._set_statuses(batch, JobState.FAILED, error)
+
+    async def run_once(self) -> int:
+        """Send every batch that is due. Returns the number of batches."""
+        batches = await asyncio.to_thread(
+            self.queue.claim_batches, time.time(), self.max_jobs, self.lease
+        )
+        await asyncio.gather(*(self.send(batch) for batch in batches))
+        return len(batches)
+
+    async def _run_forever(self) -> None:
+        """Background loop, sleeps until woken or the next retry is due"""
+        while True:
+            self._wakeup.clear()
+            try:
+                await self.run_once()
+                next_due = await asyncio.to_thread(self.queue.next_due)
+            except Exception:
+                logger.exception("Failed to process the submission queue")
+                next_due = None
+            timeout = self.poll_interval
+            if next_due is not None:
+                timeout = min(timeout, max(0.0, next_due - time.time()))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        """Start sending in the background"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run_forever())
+
+    async def stop(self) -> None:
+        """Cancel the background task and close the client. Queued
+        submissions stay in the queue for the next start."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+submission_worker = SubmissionWorker(SubmissionQueue())
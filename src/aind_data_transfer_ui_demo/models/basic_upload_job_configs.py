@@ -55,6 +55,8 @@ Unchanged:
 Added:
 - @field_validator('email_notification_types', mode='before')
 - _process_form_data(): converts single modality to list
+- to_service_model(): converts to BasicUploadJobConfigs without a json round-trip
+    - sets slurm_settings recommended for measured sources (slurm_sizing.py)
 - process_and_validate_form_data(): validates with aind-data-transfer-models
 
 #### Streamlit Pydantic
@@ -62,7 +64,6 @@ Added:
 
 """
 
-import json
 from datetime import datetime
 from enum import Enum
 from typing import List, Literal, Optional, Set
@@ -78,9 +79,18 @@ from aind_data_transfer_ui_demo.models.modality_configs import (
     ModalityConfigsFastUI,
     ModalityConfigsStreamlit,
 )
+from aind_data_transfer_ui_demo.models.slurm_sizing import size_modalities
+from aind_data_transfer_ui_demo.models.validation_service import get_validator
 
 # NOTE: FastUI requires enums for dropdowns, cannot use Platform.ONE_OF
-PlatformEnum = Enum("PlatformType", BasicUploadJobConfigs._PLATFORM_MAP)
+# str members are accepted as-is by BasicUploadJobConfigs.parse_platform_string
+# qualname lets the enum (and forms using it) be pickled for worker processes
+PlatformEnum = Enum(
+    "PlatformType",
+    BasicUploadJobConfigs._PLATFORM_MAP,
+    type=str,
+    qualname="PlatformEnum",
+)
 
 
 class BasicUploadJobConfigsFastUI(BaseModel):
@@ -249,14 +259,21 @@ class BasicUploadJobConfigsFastUI(BaseModel):
             del form_data["modality"]
         return form_data
 
-    def process_and_validate_form_data(self) -> str:
+    def to_service_model(self) -> BasicUploadJobConfigs:
         """Tries to create aind-data-transfer-models from the submitted data.
         If the model is not valid, an exception is raised."""
-        form_data = json.loads(self.model_dump_json())
-        processed_form_data = self._process_form_data(form_data)
-        validated_model = BasicUploadJobConfigs(**processed_form_data)
-        # return the validated model as a json string
-        return validated_model.model_dump_json(indent=3)
+        # python mode dump, enums are str and accepted by the full model
+        processed_form_data = self._process_form_data(self.model_dump())
+        processed_form_data["modalities"] = size_modalities(
+            processed_form_data["modalities"]
+        )
+        validator = get_validator(BasicUploadJobConfigs)
+        return validator.validate(processed_form_data)
+
+    def process_and_validate_form_data(self, indent: Optional[int] = 3) -> str:
+        """Validates with aind-data-transfer-models and returns the validated
+        model as a json string, pretty-printed for display by default."""
+        return self.to_service_model().model_dump_json(indent=indent)
 
 class BasicUploadJobConfigsSimple(BaseModel):
     """Minimal version of BasicUploadJobConfigs from aind-data-transfer-models"""
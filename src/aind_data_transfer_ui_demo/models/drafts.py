@@ -0,0 +1,342 @@
+"""Server-held drafts of documents being edited in the json editor
+
+The editor sends its document once, then only JSON Patches (RFC 6902) for
+what changed. Each draft keeps the validation errors of every upload job,
+and a patch only marks the jobs it touches for re-validation, so an edit
+to one job of a 1000 job request validates that one job.
+"""
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Annotated, Any, Optional
+
+from pydantic import BaseModel, Field, TypeAdapter
+
+from aind_data_transfer_ui_demo.models.submit_job_request import (
+    SubmitJobRequestSimple,
+)
+from aind_data_transfer_ui_demo.models.validation_service import (
+    validation_errors,
+)
+
+JOBS_FIELD = "upload_jobs"
+
+
+class PatchError(ValueError):
+    """Raised for a patch that can't be applied to the draft"""
+
+
+class PatchOperation(BaseModel):
+    """One RFC 6902 operation"""
+
+    op: str = Field(..., pattern="^(add|remove|replace|move|copy|test)$")
+    path: str
+    value: Any = None
+    from_: Optional[str] = Field(default=None, alias="from")
+
+
+def parse_pointer(pointer: str) -> list[str]:
+    """Reference tokens of an RFC 6901 json pointer"""
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise PatchError(f"Invalid json pointer {pointer!r}")
+    return [
+        token.replace("~1", "/").replace("~0", "~")
+        for token in pointer[1:].split("/")
+    ]
+
+
+def _index(container: list, token: str, append: bool = False) -> int:
+    """List index for a token, len(container) for "-" if append"""
+    if append and token == "-":
+        return len(container)
+    if not token.isdigit() or (token != "0" and token.startswith("0")):
+        raise PatchError(f"Invalid list index {token!r}")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not append):
+        raise PatchError(f"List index {index} out of range")
+    return index
+
+
+def _parent(document: Any, tokens: list[str]) -> Any:
+    """Container of the value tokens point to"""
+    container = document
+    for token in tokens[:-1]:
+        try:
+            if isinstance(container, list):
+                container = container[_index(container, token)]
+            else:
+                container = container[token]
+        except (KeyError, TypeError):
+            raise PatchError(f"Path /{'/'.join(tokens)} does not exist")
+    if not isinstance(container, (dict, list)):
+        raise PatchError(f"Path /{'/'.join(tokens)} does not exist")
+    return container
+
+
+def _get(document: Any, tokens: list[str]) -> Any:
+    """Value tokens point to"""
+    if not tokens:
+        return document
+    container = _parent(document, tokens)
+    if isinstance(container, list):
+        return container[_index(container, tokens[-1])]
+    if tokens[-1] not in container:
+        raise PatchError(f"Path /{'/'.join(tokens)} does not exist")
+    return container[tokens[-1]]
+
+
+def _add(document: Any, tokens: list[str], value: Any) -> Any:
+    """Add value at tokens, returning the (possibly new) document"""
+    if not tokens:
+        return value
+    container = _parent(document, tokens)
+    if isinstance(container, list):
+        container.insert(_index(container, tokens[-1], append=True), value)
+    else:
+        container[tokens[-1]] = value
+    return document
+
+
+def _remove(document: Any, tokens: list[str]) -> Any:
+    """Remove and return the value at tokens"""
+    if not tokens:
+        raise PatchError("Can't remove the whole document")
+    value = _get(document, tokens)
+    container = _parent(document, tokens)
+    if isinstance(container, list):
+        del container[_index(container, tokens[-1])]
+    else:
+        del container[tokens[-1]]
+    return value
+
+
+def _job_change(tokens: list[str]) -> Optional[tuple[str, Optional[int]]]:
+    """How a change at tokens affects the upload jobs: ("all", None) for the
+    whole list, ("item", i) for the whole item i (which may shift the rest),
+    ("field", i) for something inside item i, None for other fields"""
+    if not tokens or tokens[0] != JOBS_FIELD:
+        return ("all", None) if not tokens else None
+    if len(tokens) == 1:
+        return "all", None
+    if tokens[1] == "-":
+        return "item", None
+    if not tokens[1].isdigit():
+        return "all", None
+    index = int(tokens[1])
+    return ("item" if len(tokens) == 2 else "field"), index
+
+
+class Draft:
+    """A document being edited and the errors of its parts. For documents
+    with upload jobs, errors are kept per job: None marks a job that needs
+    to be validated again. Hold lock while patching and validating."""
+
+    def __init__(self, model_name: str, document: Any):
+        """New draft at version 0, with everything to be validated"""
+        self.id = uuid.uuid4().hex
+        self.model_name = model_name
+        self.document = document
+        self.version = 0
+        self.has_jobs = model_name == SubmitJobRequestSimple.__name__
+        self.job_errors: list[Optional[list[dict]]] = []
+        self.errors: Optional[list[dict]] = None
+        self.lock = asyncio.Lock()
+        self.invalidate_all()
+
+    def invalidate_all(self) -> None:
+        """Mark the whole document for validation"""
+        self.errors = None
+        jobs = self.jobs()
+        self.job_errors = [None] * (len(jobs) if jobs is not None else 0)
+
+    def jobs(self) -> Optional[list]:
+        """The upload jobs list, if the document has one"""
+        if not self.has_jobs or not isinstance(self.document, dict):
+            return None
+        jobs = self.document.get(JOBS_FIELD)
+        return jobs if isinstance(jobs, list) else None
+
+    def _track(self, tokens: list[str], removed: bool) -> None:
+        """Update job_errors for an add (or remove) at tokens"""
+        # errors of the rest of the document are cheap to recompute
+        self.errors = None
+        change = _job_change(tokens) if self.has_jobs else None
+        if change is None:
+            return
+        kind, index = change
+        # an index past the end means upload_jobs was not a list before
+        limit = len(self.job_errors) + (kind == "item" and not removed)
+        if kind == "all" or (index is not None and index >= limit):
+            self.invalidate_all()
+        elif kind == "field":
+            self.job_errors[index] = None
+        elif removed:
+            del self.job_errors[index]
+        else:
+            index = len(self.job_errors) if index is None else index
+            self.job_errors.insert(index, None)
+
+    def _apply_operation(self, operation: PatchOperation) -> None:
+        """Apply one operation of a patch"""
+        tokens = parse_pointer(operation.path)
+        value = operation.value
+        if operation.op == "test":
+            if _get(self.document, tokens) != value:
+                raise PatchError(f"Test failed at {operation.path}")
+            return
+        if not tokens and operation.op == "replace":
+            self.document = value
+            self.invalidate_all()
+            return
+        if operation.op in ("move", "copy"):
+            if operation.from_ is None:
+                raise PatchError(f"{operation.op} needs a from path")
+            source = parse_pointer(operation.from_)
+            if operation.op == "copy":
+                value = _copy(_get(self.document, source))
+            else:
+                value = _remove(self.document, source)
+                self._track(source, removed=True)
+        elif operation.op in ("remove", "replace"):
+            _remove(self.document, tokens)
+            self._track(tokens, removed=True)
+            if operation.op == "remove":
+                return
+        self.document = _add(self.document, tokens, value)
+        self._track(tokens, removed=False)
+
+    def apply(self, operations: list[PatchOperation]) -> None:
+        """
+        Apply a patch, marking what it touched for validation. The document
+        is left partially patched if this raises, so the draft should then
+        be discarded.
+        """
+        for operation in operations:
+            self._apply_operation(operation)
+        jobs = self.jobs()
+        if len(self.job_errors) != (len(jobs) if jobs is not None else 0):
+            # e.g. upload_jobs was patched while it was not a list
+            self.invalidate_all()
+        self.version += 1
+
+    def pending_jobs(self) -> list[int]:
+        """Indices of the upload jobs that need to be validated"""
+        return [
+            i for i, errors in enumerate(self.job_errors) if errors is None
+        ]
+
+    def all_errors(self) -> list[dict]:
+        """Errors of the whole document, each scoped to a json pointer"""
+        errors = list(self.errors or [])
+        for i, job_errors in enumerate(self.job_errors):
+            errors.extend(
+                {**error, "path": f"/{JOBS_FIELD}/{i}{error['path']}"}
+                for error in job_errors or []
+            )
+        return errors
+
+
+def _copy(value: Any) -> Any:
+    """Copy of a json value"""
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy(v) for v in value]
+    return value
+
+
+def scoped_errors(errors: list[dict]) -> list[dict]:
+    """Errors from validation_errors with their loc as a json pointer"""
+    return [
+        {
+            "path": "".join(
+                "/" + str(loc).replace("~", "~0").replace("/", "~1")
+                for loc in error["loc"]
+            ),
+            "type": error["type"],
+            "msg": error["msg"],
+        }
+        for error in errors
+    ]
+
+
+def _request_field_adapters() -> dict[str, TypeAdapter]:
+    """Validators for the fields of SubmitJobRequestSimple besides its
+    upload jobs, which are validated one by one"""
+    return {
+        name: TypeAdapter(Annotated[field.annotation, field])
+        for name, field in SubmitJobRequestSimple.model_fields.items()
+        if name != JOBS_FIELD
+    }
+
+
+_REQUEST_FIELDS = _request_field_adapters()
+_JOBS_LENGTH = TypeAdapter(
+    Annotated[list, SubmitJobRequestSimple.model_fields[JOBS_FIELD]]
+)
+
+
+def request_errors(document: Any) -> list[dict]:
+    """Errors of a SubmitJobRequestSimple document other than those of its
+    individual upload jobs"""
+    if not isinstance(document, dict):
+        return [{"path": "", "type": "dict_type", "msg": "Not an object"}]
+    errors = []
+    try:
+        _JOBS_LENGTH.validate_python(document.get(JOBS_FIELD))
+    except Exception as e:
+        errors.extend(
+            {**error, "path": f"/{JOBS_FIELD}{error['path']}"}
+            for error in scoped_errors(validation_errors(e))
+        )
+    for name, adapter in _REQUEST_FIELDS.items():
+        if name not in document:
+            continue
+        try:
+            adapter.validate_python(document[name])
+        except Exception as e:
+            errors.extend(
+                {**error, "path": f"/{name}{error['path']}"}
+                for error in scoped_errors(validation_errors(e))
+            )
+    return errors
+
+
+class DraftStore:
+    """Drafts by id, expiring after ttl seconds without edits. The least
+    recently edited drafts are dropped past max_entries."""
+
+    def __init__(self, ttl: float = 3600.0, max_entries: int = 256):
+        """Empty store"""
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._drafts: OrderedDict[str, tuple[float, Draft]] = OrderedDict()
+
+    def add(self, draft: Draft) -> None:
+        """Store a draft, evicting old ones"""
+        self._drafts[draft.id] = (time.monotonic() + self.ttl, draft)
+        self._drafts.move_to_end(draft.id)
+        while len(self._drafts) > self.max_entries:
+            self._drafts.popitem(last=False)
+
+    def get(self, draft_id: str) -> Optional[Draft]:
+        """Draft with draft_id if it hasn't expired, refreshing its ttl"""
+        entry = self._drafts.get(draft_id)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._drafts[draft_id]
+            return None
+        self.add(entry[1])
+        return entry[1]
+
+    def discard(self, draft_id: str) -> None:
+        """Forget a draft"""
+        self._drafts.pop(draft_id, None)
+
+
+draft_store = DraftStore()
@@ -1,35 +1,165 @@
-"""Script to write json schema files for job config models"""
+"""Script to write json schema files for job config models
 
-import json
-import os
+Only models whose fingerprint changed since the last run are regenerated,
+in parallel worker processes. Each schema is written next to gzip (and
+brotli, if installed) compressed copies, using atomic replaces, and a
+manifest mapping model -> fingerprint -> content hash -> files is written
+last. The server loads schemas through the manifest instead of generating
+them. The compressed copies are not checked in, so on a fresh checkout
+they are written from the json files of the unchanged models.
+
+    python -m aind_data_transfer_ui_demo.models.generate_schemas
+        [MODEL ...] [--force] [--jobs N] [--output DIR]
+"""
 
-FOLDER = os.path.dirname(os.path.abspath(__file__)) + "/schemas"
+import argparse
+import json
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
 
-# aind-data-transfer-models
-from aind_data_transfer_models.core import (
-    BasicUploadJobConfigs,
-    SubmitJobRequest,
+from aind_data_transfer_ui_demo.models.schema_registry import (
+    MANIFEST_FILE,
+    SCHEMA_DIR,
+    SCHEMA_MODELS,
+    content_hash,
+    read_manifest,
+    schema_fingerprint,
+    schema_json,
+    write_atomic,
 )
-# Fast UI mini models
-from aind_data_transfer_ui_demo.models.modality_configs import ModalityConfigsFastUI
-from aind_data_transfer_ui_demo.models.basic_upload_job_configs import BasicUploadJobConfigsFastUI
-from aind_data_transfer_ui_demo.models.submit_job_request import SubmitJobRequestFastUI
-# Simplified mini models (without FastUI flatten lists)
-from aind_data_transfer_ui_demo.models.basic_upload_job_configs import BasicUploadJobConfigsSimple
-from aind_data_transfer_ui_demo.models.submit_job_request import SubmitJobRequestSimple
-
-models_to_write = [
-    SubmitJobRequest,
-    BasicUploadJobConfigs,
-    ModalityConfigsFastUI,
-    BasicUploadJobConfigsFastUI,
-    SubmitJobRequestFastUI,
-    BasicUploadJobConfigsSimple,
-    SubmitJobRequestSimple,
-]
-
-for model in models_to_write:
-    filename = model.__name__ + ".json"
-    with open(FOLDER + "/" + filename, "w") as f:
-        json.dump(model.model_json_schema(by_alias=True), f, indent=3)
-    print(f"Created {filename}")
+from aind_data_transfer_ui_demo.static_assets import (
+    ENCODING_SUFFIXES,
+    StaticAsset,
+)
+
+MEDIA_TYPE = "application/schema+json"
+
+
+def is_current(name: str, entry: Optional[dict], folder: Path) -> bool:
+    """Whether the manifest entry for a model matches its fingerprint and
+    its schema file is still there. The compressed copies are build outputs
+    that are not checked in, see restore_encoded."""
+    if entry is None:
+        return False
+    if entry["fingerprint"] != schema_fingerprint(SCHEMA_MODELS[name]):
+        return False
+    try:
+        body = (folder / entry["file"]).read_bytes()
+    except FileNotFoundError:
+        return False
+    return content_hash(body) == entry["hash"]
+
+
+def restore_encoded(entry: dict, folder: Path) -> list[str]:
+    """Write the missing compressed copies of a current schema from its
+    json file, without generating the schema. Returns the files written."""
+    missing = {
+        encoding: file
+        for encoding, file in entry.get("encoded", {}).items()
+        if not (folder / file).exists()
+    }
+    if not missing:
+        return []
+    body = (folder / entry["file"]).read_bytes()
+    asset = StaticAsset.build(body, MEDIA_TYPE, entry["hash"])
+    written = []
+    for encoding, file in missing.items():
+        # e.g. br listed but brotli not installed here
+        if encoding in asset.encoded:
+            write_atomic(folder / file, asset.encoded[encoding])
+            written.append(file)
+    return written
+
+
+def build_schema(name: str, folder: Path) -> dict:
+    """Generate and write one model's schema files. Returns its manifest
+    entry. Module level so it can run in worker processes."""
+    model = SCHEMA_MODELS[name]
+    fingerprint = schema_fingerprint(model)
+    body = schema_json(model)
+    asset = StaticAsset.build(body, MEDIA_TYPE)
+    filename = f"{name}.json"
+    write_atomic(folder / filename, body)
+    encoded = {}
+    for encoding, data in asset.encoded.items():
+        encoded[encoding] = filename + ENCODING_SUFFIXES[encoding]
+        write_atomic(folder / encoded[encoding], data)
+    return {
+        "fingerprint": fingerprint,
+        "hash": content_hash(body),
+        "file": filename,
+        "encoded": encoded,
+    }
+
+
+def build_schemas(
+    names: list[str], folder: Path, force: bool = False, jobs: int = 0
+) -> dict[str, dict]:
+    """
+    Rebuild the schemas of names that are out of date and update the
+    manifest.
+
+    Parameters
+    ----------
+    names : list[str]
+      Models to consider, keys of SCHEMA_MODELS
+    folder : Path
+      Output directory, created if missing
+    force : bool
+      Rebuild even if the fingerprint did not change
+    jobs : int
+      Worker processes, 0 for one per CPU, 1 to build in this process
+
+    Returns
+    -------
+    dict[str, dict]
+      Manifest entries of the rebuilt models
+    """
+    folder.mkdir(parents=True, exist_ok=True)
+    manifest = read_manifest(folder)
+    stale = []
+    for name in names:
+        if force or not is_current(name, manifest.get(name), folder):
+            stale.append(name)
+        else:
+            restore_encoded(manifest[name], folder)
+    if jobs == 1 or len(stale) <= 1:
+        built = {name: build_schema(name, folder) for name in stale}
+    else:
+        with ProcessPoolExecutor(jobs or None) as pool:
+            entries = pool.map(build_schema, stale, [folder] * len(stale))
+            built = dict(zip(stale, entries))
+    if built:
+        manifest.update(built)
+        manifest = {k: manifest[k] for k in sorted(manifest)}
+        write_atomic(
+            folder / MANIFEST_FILE,
+            json.dumps(manifest, indent=3).encode(),
+        )
+    return built
+
+
+def main() -> None:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "models",
+        nargs="*",
+        help=f"Models to build (default all): {', '.join(SCHEMA_MODELS)}",
+    )
+    parser.add_argument("--force", action="store_true")
+    parser.add_argument("--jobs", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=SCHEMA_DIR)
+    args = parser.parse_args()
+    unknown = set(args.models) - set(SCHEMA_MODELS)
+    if unknown:
+        parser.error(f"unknown models: {', '.join(sorted(unknown))}")
+    names = args.models or list(SCHEMA_MODELS)
+    built = build_schemas(names, args.output, args.force, args.jobs)
+    for name in names:
+        print(f"{'Created' if name in built else 'Unchanged'} {name}.json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""Job template spreadsheet (xlsx or csv) generation and parsing
+
+Each row is one BasicUploadJobConfigsSimple. Modalities are flattened into
+numbered columns, e.g. modality0, modality0.source, modality1, ...
+
+Parsing streams the sheet row by row (openpyxl read-only mode) so memory use
+does not depend on the number of rows.
+"""
+
+import codecs
+import csv
+import io
+import re
+from datetime import datetime
+from enum import Enum
+from typing import Any, BinaryIO, Iterator, Optional, get_args
+
+from aind_data_transfer_models.core import SubmitJobRequest
+from openpyxl import Workbook, load_workbook
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.datavalidation import DataValidation
+
+from aind_data_transfer_ui_demo.models.basic_upload_job_configs import (
+    BasicUploadJobConfigsSimple,
+    PlatformEnum,
+)
+from aind_data_transfer_ui_demo.models.modality_configs import (
+    ModalityConfigsFastUI,
+    ModalityEnum,
+)
+from aind_data_transfer_ui_demo.models.validation import (
+    to_upload_job_configs,
+)
+from aind_data_transfer_ui_demo.models.validation_service import (
+    get_validator,
+    validation_errors,
+)
+
+MODALITY_COLUMN = re.compile(r"^modality(\d+)(?:\.(\w+))?$")
+LIST_COLUMNS = {"email_notification_types"}
+# SubmitJobRequest accepts up to 1000 upload_jobs
+DEFAULT_CHUNK_SIZE = 1000
+TEMPLATE_EXAMPLE = {
+    "project_name": "Behavior Platform",
+    "platform": "behavior",
+    "subject_id": "123456",
+    "acq_datetime": datetime(2024, 1, 1, 10, 0, 0),
+    "modality0": "behavior",
+    "modality0.source": "/allen/aind/stage/fake/behavior",
+    "modality1": "behavior-videos",
+    "modality1.source": "/allen/aind/stage/fake/behavior-videos",
+}
+
+
+def template_columns(num_modalities: int = 2) -> list[str]:
+    """Template header built from the BasicUploadJobConfigsSimple fields,
+    with required fields first"""
+    fields = [
+        (name, field)
+        for name, field in BasicUploadJobConfigsSimple.model_fields.items()
+        if name != "modalities"
+    ]
+    fields.sort(key=lambda f: not f[1].is_required())
+    modality_columns = [
+        f"modality{i}" if name == "modality" else f"modality{i}.{name}"
+        for i in range(num_modalities)
+        for name in ModalityConfigsFastUI.model_fields
+    ]
+    required = [name for name, field in fields if field.is_required()]
+    optional = [name for name, field in fields if not field.is_required()]
+    return required + modality_columns + optional
+
+
+def _column_options(column: str) -> Optional[list[str]]:
+    """Allowed values for dropdown columns"""
+    name = MODALITY_COLUMN.sub(lambda m: m.group(2) or "modality", column)
+    if name == "platform":
+        return [p.value for p in PlatformEnum]
+    if name == "modality":
+        return [m.value for m in ModalityEnum]
+    field = BasicUploadJobConfigsSimple.model_fields.get(name)
+    if field is None:
+        field = ModalityConfigsFastUI.model_fields.get(name)
+    if field is None:
+        return None
+    args = get_args(field.annotation)
+    if field.annotation is bool or bool in args:
+        return ["TRUE", "FALSE"]
+    if args and all(isinstance(a, Enum) for a in args):
+        return [a.value for a in args]
+    return None
+
+
+def create_job_template(num_modalities: int = 2) -> bytes:
+    """Job template xlsx with a header, dropdowns and an example row"""
+    columns = template_columns(num_modalities)
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "jobs"
+    sheet.append(columns)
+    sheet.append([TEMPLATE_EXAMPLE.get(c) for c in columns])
+    for i, column in enumerate(columns, start=1):
+        letter = get_column_letter(i)
+        sheet.column_dimensions[letter].width = max(12, len(column) + 2)
+        options = _column_options(column)
+        if options:
+            validation = DataValidation(
+                type="list",
+                formula1=f'"{",".join(options)}"',
+                allow_blank=True,
+            )
+            validation.add(f"{letter}2:{letter}1048576")
+            sheet.add_data_validation(validation)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def _cell(value: Any) -> Any:
+    """Normalizes a spreadsheet cell for BasicUploadJobConfigsSimple, which
+    expects strings where Excel stores numbers (e.g. subject_id)"""
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    return value
+
+
+def row_to_job(row: dict[str, Any]) -> dict:
+    """Maps a {column: value} row onto a BasicUploadJobConfigsSimple dict"""
+    job = {}
+    modalities: dict[int, dict] = {}
+    for column, value in row.items():
+        value = _cell(value)
+        if column is None or value is None or value == "":
+            continue
+        # openpyxl returns numbers for numeric header cells
+        column = str(column).strip().lower()
+        if not column:
+            continue
+        match = MODALITY_COLUMN.match(column)
+        if match:
+            index, attr = int(match.group(1)), match.group(2) or "modality"
+            modalities.setdefault(index, {})[attr] = value
+        elif column in LIST_COLUMNS:
+            job[column] = [v.strip() for v in str(value).split(",")]
+        else:
+            job[column] = value
+    job["modalities"] = [modalities[i] for i in sorted(modalities)]
+    return job
+
+
+def _iter_csv_rows(file: BinaryIO) -> Iterator[dict]:
+    """Rows of a csv file as dicts"""
+    yield from csv.DictReader(codecs.getreader("utf-8-sig")(file))
+
+
+def _iter_xlsx_rows(file: BinaryIO) -> Iterator[dict]:
+    """Rows of the active sheet as dicts, read in read-only mode"""
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None) or ()
+        for values in rows:
+            yield dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def iter_job_rows(file: BinaryIO, filename: str) -> Iterator[tuple[int, dict]]:
+    """Yields (row number, BasicUploadJobConfigsSimple dict) for each
+    non-empty row. Row numbers are as shown in Excel, the header is row 1."""
+    if filename.lower().endswith(".csv"):
+        rows = _iter_csv_rows(file)
+    else:
+        rows = _iter_xlsx_rows(file)
+    for row_number, row in enumerate(rows, start=2):
+        if any(v not in (None, "") for v in row.values()):
+            yield row_number, row_to_job(row)
+
+
+def _submit_job_request(
+    upload_jobs: list, job_rows: list[int], request_fields: dict
+) -> tuple[Optional[SubmitJobRequest], list[dict]]:
+    """(SubmitJobRequest, []) of the valid jobs of a chunk, or (None,
+    errors) with each error under the row of the job it is located in, or
+    row None for errors about the request itself"""
+    if not upload_jobs:
+        return None, []
+    try:
+        request = get_validator(SubmitJobRequest).validate(
+            dict(upload_jobs=upload_jobs, **request_fields)
+        )
+    except Exception as e:
+        errors = []
+        for error in validation_errors(e):
+            loc = error["loc"]
+            row = None
+            if len(loc) > 1 and loc[0] == "upload_jobs":
+                if isinstance(loc[1], int) and loc[1] < len(job_rows):
+                    row = job_rows[loc[1]]
+            errors.append({"row": row, "errors": [error]})
+        return None, errors
+    return request, []
+
+
+def iter_submit_job_requests(
+    file: BinaryIO,
+    filename: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    **request_fields: Any,
+) -> Iterator[dict]:
+    """
+    Validates the rows of a job template one at a time and yields a chunk
+    every chunk_size rows, so only one chunk is held in memory.
+
+    Parameters
+    ----------
+    file : BinaryIO
+      xlsx or csv file
+    filename : str
+      Used to tell csv from xlsx
+    chunk_size : int
+      Rows per chunk, at most the number of upload_jobs a SubmitJobRequest
+      accepts
+    request_fields : Any
+      Extra SubmitJobRequest fields, e.g. user_email
+
+    Yields
+    ------
+    dict
+      {"rows": [first, last], "submit_job_request": SubmitJobRequest | None,
+      "errors": [{"row": n, "errors": [...]}]}. If the SubmitJobRequest of
+      the valid rows fails, submit_job_request is None and its errors are
+      listed under the row of the job they are about, or row None.
+    """
+    rows = []
+    # row of each valid job
+    job_rows = []
+    upload_jobs = []
+    errors = []
+
+    def chunk() -> dict:
+        """Bundle the valid jobs of the current chunk into a request"""
+        request, request_errors = _submit_job_request(
+            upload_jobs, job_rows, request_fields
+        )
+        return {
+            "rows": [rows[0], rows[-1]],
+            "submit_job_request": request,
+            "errors": errors + request_errors,
+        }
+
+    for row_number, job in iter_job_rows(file, filename):
+        rows.append(row_number)
+        try:
+            upload_jobs.append(to_upload_job_configs(job))
+            job_rows.append(row_number)
+        except Exception as e:
+            errors.append({"row": row_number, "errors": validation_errors(e)})
+        if len(rows) == chunk_size:
+            yield chunk()
+            rows, job_rows, upload_jobs, errors = [], [], [], []
+    if rows:
+        yield chunk()
@@ -30,21 +30,32 @@ Changes:
 Unchanged:
 - compress_raw_data
 Added:
+- to_service_model(): converts to ModalityConfigs without a json round-trip
+    - sets slurm_settings recommended for the measured source (slurm_sizing.py)
 - process_and_validate_form_data(): validates with aind-data-transfer-models
 
 #### Streamlit Pydantic
 - Additionally remove optional fields
 """
 
-import json
 from enum import Enum
 from typing import Optional
 
 from aind_data_transfer_models.core import ModalityConfigs
 from pydantic import BaseModel, Field
 
+from aind_data_transfer_ui_demo.models.slurm_sizing import with_slurm_settings
+from aind_data_transfer_ui_demo.models.validation_service import get_validator
+
 # NOTE: FastUI requires enums for dropdowns, cannot use Modality.ONE_OF
-ModalityEnum = Enum("ModalityType", ModalityConfigs._MODALITY_MAP)
+# str members are accepted as-is by ModalityConfigs.parse_modality_string
+# qualname lets the enum (and forms using it) be pickled for worker processes
+ModalityEnum = Enum(
+    "ModalityType",
+    ModalityConfigs._MODALITY_MAP,
+    type=str,
+    qualname="ModalityEnum",
+)
 
 class ModalityConfigsFastUI(BaseModel):
     """Minimal version of ModalityConfigs from aind-data-transfer-models"""
@@ -100,14 +111,17 @@ class ModalityConfigsFastUI(BaseModel):
     #     title="Slurm Settings",
     # )
 
-    def process_and_validate_form_data(self) -> str:
+    def to_service_model(self) -> ModalityConfigs:
         """Tries to create aind-data-transfer-models from the submitted data.
         If the model is not valid, an exception is raised."""
-        form_data = json.loads(self.model_dump_json())
         # nothing needs to be explicitly handled, can pass directly to ModalityConfigs
-        validated_model = ModalityConfigs(**form_data)
-        # return the validated model as a json string
-        return validated_model.model_dump_json(indent=3)
+        processed_form_data = with_slurm_settings(self.model_dump())
+        return get_validator(ModalityConfigs).validate(processed_form_data)
+
+    def process_and_validate_form_data(self, indent: Optional[int] = 3) -> str:
+        """Validates with aind-data-transfer-models and returns the validated
+        model as a json string, pretty-printed for display by default."""
+        return self.to_service_model().model_dump_json(indent=indent)
 
 class ModalityConfigsStreamlit(ModalityConfigsFastUI):
     """Minimal version of ModalityConfigs from aind-data-transfer-models"""
@@ -0,0 +1,174 @@
+"""Models whose json schemas are published, and how they are serialized
+
+The serialization is the same as the files written by generate_schemas.py,
+so a schema has the same content hash whether it was generated live or
+read from disk.
+
+A model's fingerprint identifies everything its schema is generated from:
+the source of this package's modules defining the model and the models,
+enums and base classes it refers to, and the versions of the other
+distributions (aind-data-transfer-models, pydantic, ...) they come from.
+generate_schemas.py records fingerprints in a manifest so unchanged
+schemas are not rebuilt, and the server uses them to tell whether the
+files on disk are current.
+"""
+
+import hashlib
+import importlib.metadata
+import inspect
+import json
+import os
+import sys
+import tempfile
+from enum import Enum
+from functools import cache
+from pathlib import Path
+from typing import Any, get_args
+
+import pydantic
+import pydantic_core
+from aind_data_transfer_models.core import (
+    BasicUploadJobConfigs,
+    SubmitJobRequest,
+)
+from pydantic import BaseModel
+
+from aind_data_transfer_ui_demo.models.basic_upload_job_configs import (
+    BasicUploadJobConfigsFastUI,
+    BasicUploadJobConfigsSimple,
+)
+from aind_data_transfer_ui_demo.models.modality_configs import (
+    ModalityConfigsFastUI,
+)
+from aind_data_transfer_ui_demo.models.submit_job_request import (
+    SubmitJobRequestFastUI,
+    SubmitJobRequestSimple,
+)
+
+SCHEMA_DIR = Path(__file__).parent / "schemas"
+MANIFEST_FILE = "manifest.json"
+# bump when schema_json changes, so existing files are rebuilt
+SCHEMA_FORMAT = 1
+
+SCHEMA_MODELS: dict[str, type[BaseModel]] = {
+    model.__name__: model
+    for model in [
+        # aind-data-transfer-models
+        SubmitJobRequest,
+        BasicUploadJobConfigs,
+        # Fast UI mini models
+        ModalityConfigsFastUI,
+        BasicUploadJobConfigsFastUI,
+        SubmitJobRequestFastUI,
+        # Simplified mini models (without FastUI flatten lists)
+        BasicUploadJobConfigsSimple,
+        SubmitJobRequestSimple,
+    ]
+}
+
+
+def schema_json(model: type[BaseModel]) -> bytes:
+    """Json schema of a model as utf-8 bytes"""
+    return json.dumps(
+        model.model_json_schema(by_alias=True), indent=3
+    ).encode()
+
+
+def content_hash(body: bytes) -> str:
+    """Short sha256 hex digest identifying a schema's content"""
+    return hashlib.sha256(body).hexdigest()[:32]
+
+
+def _referenced_types(annotation: Any) -> set[type]:
+    """Model and enum classes appearing anywhere in a type annotation"""
+    if isinstance(annotation, type) and issubclass(
+        annotation, (BaseModel, Enum)
+    ):
+        return {annotation}
+    found = set()
+    for arg in get_args(annotation):
+        found |= _referenced_types(arg)
+    return found
+
+
+def _schema_classes(model: type[BaseModel]) -> set[type]:
+    """Classes a model's schema depends on: the model, the models and enums
+    of its fields (recursively) and their base classes"""
+    seen: set[type] = set()
+    pending: list[type] = [model]
+    while pending:
+        cls = pending.pop()
+        if cls in seen:
+            continue
+        seen.add(cls)
+        if issubclass(cls, BaseModel):
+            pending.extend(cls.__mro__[1:])
+            for field in cls.model_fields.values():
+                pending.extend(_referenced_types(field.annotation))
+    return seen
+
+
+@cache
+def _module_source_hash(module_name: str) -> str:
+    """sha256 of a module's source file"""
+    path = inspect.getsourcefile(sys.modules[module_name])
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+@cache
+def _distribution_versions(top_level: str) -> list[str]:
+    """name==version of the distributions providing a top-level package"""
+    distributions = importlib.metadata.packages_distributions()
+    return [
+        f"{dist}=={importlib.metadata.version(dist)}"
+        for dist in sorted(set(distributions.get(top_level, [])))
+    ]
+
+
+@cache
+def _dependency(module_name: str) -> str:
+    """What a module's contribution to a schema is identified by: its
+    source for this package, the distribution version otherwise"""
+    top_level = module_name.partition(".")[0]
+    if top_level == __name__.partition(".")[0]:
+        return f"{module_name}:{_module_source_hash(module_name)}"
+    versions = _distribution_versions(top_level)
+    if versions:
+        return ",".join(versions)
+    # standard library
+    return f"{module_name}:python{sys.version_info[0]}.{sys.version_info[1]}"
+
+
+def schema_fingerprint(model: type[BaseModel]) -> str:
+    """Changes whenever the schema of model may have changed"""
+    parts = {
+        f"format:{SCHEMA_FORMAT}",
+        f"pydantic=={pydantic.VERSION}",
+        f"pydantic-core=={pydantic_core.__version__}",
+        f"model:{model.__module__}.{model.__qualname__}",
+    }
+    parts.update(_dependency(cls.__module__) for cls in _schema_classes(model))
+    return hashlib.sha256("\n".join(sorted(parts)).encode()).hexdigest()[:32]
+
+
+def read_manifest(folder: Path = SCHEMA_DIR) -> dict[str, dict]:
+    """Manifest written by generate_schemas.py, empty if there is none.
+    Maps model name to its fingerprint, content hash and files."""
+    try:
+        return json.loads((folder / MANIFEST_FILE).read_text())
+    except FileNotFoundError:
+        return {}
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Write a file so readers see either the old or the new content"""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        # mkstemp creates files readable by the owner only
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
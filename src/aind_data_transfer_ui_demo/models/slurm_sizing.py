@@ -0,0 +1,201 @@
+"""Recommended slurm resources for modality jobs
+
+The FastUI models drop ModalityConfigs.slurm_settings (V0036JobProperties
+can't be rendered), so every job would run with the service's defaults
+whatever its size. Instead, the bytes and files below a modality's source
+are measured (see jobs/preflight.py) and run through a per-modality cost
+model to get cpus, memory and a time limit, which to_service_model() of
+the FastUI models sets as slurm_settings. Settings that are already there
+are kept, and sources that can't be read from the server are left to the
+service's defaults.
+
+Sizing runs on every form submit, in the validation executor, so a source
+is only walked for up to SLURM_SIZING_MAX_LISTINGS directory listings.
+Larger sources are sized from totals extrapolated from the folders that
+were listed.
+
+The cost models can be tuned without code changes: AIND_SLURM_COST_MODEL
+points to a json file of CostModel fields by modality abbreviation, e.g.
+{"ecephys": {"mb_per_cpu_second": 15}, "default": {"max_cpus": 16}},
+applied over the defaults below. AIND_SLURM_SIZING=0 turns sizing off,
+AIND_SLURM_SIZING_MAX_LISTINGS sets the walk budget.
+"""
+
+import json
+import math
+import os
+from dataclasses import dataclass, fields, replace
+from typing import Any, Optional
+
+from aind_slurm_rest.models import V0036JobProperties
+
+from aind_data_transfer_ui_demo.jobs.preflight import PathChecker, path_checker
+
+SLURM_SIZING_ENABLED = os.getenv("AIND_SLURM_SIZING", "1") == "1"
+SLURM_COST_MODEL = os.getenv("AIND_SLURM_COST_MODEL")
+# directory listings per source before its size is extrapolated
+SLURM_SIZING_MAX_LISTINGS = int(
+    os.getenv("AIND_SLURM_SIZING_MAX_LISTINGS", 200)
+)
+# cost model of modalities without one, and of jobs that only copy data
+DEFAULT = "default"
+COPY = "copy"
+
+
+@dataclass(frozen=True)
+class SlurmSizing:
+    """Resources recommended for one modality job"""
+
+    cpus: int
+    memory_mb: int
+    time_minutes: int
+
+    def job_properties(self) -> V0036JobProperties:
+        """As slurm job properties. environment is required, and is
+        overwritten downstream."""
+        return V0036JobProperties(
+            environment={},
+            cpus_per_task=self.cpus,
+            memory_per_node=self.memory_mb,
+            time_limit=self.time_minutes,
+        )
+
+
+@dataclass(frozen=True)
+class CostModel:
+    """Resources a modality job needs as a function of its data"""
+
+    # cpus, one more for every gb_per_cpu GB of data
+    base_cpus: int = 2
+    gb_per_cpu: float = 100.0
+    max_cpus: int = 32
+    # memory, per cpu and per thousand files to keep track of
+    base_memory_mb: int = 4000
+    memory_mb_per_cpu: int = 2000
+    memory_mb_per_1000_files: float = 50.0
+    max_memory_mb: int = 256000
+    # time, from the rate each cpu processes data at and a cost per file
+    mb_per_cpu_second: float = 50.0
+    ms_per_file: float = 20.0
+    min_minutes: int = 30
+    max_minutes: int = 2880
+    # headroom on memory and time, undersized jobs are killed and retried
+    margin: float = 1.5
+
+    def size(self, num_bytes: int, files: int) -> SlurmSizing:
+        """Resources for num_bytes of data in files files"""
+        gb = num_bytes / 1e9
+        cpus = min(self.max_cpus, self.base_cpus + int(gb / self.gb_per_cpu))
+        memory_mb = (
+            self.base_memory_mb
+            + cpus * self.memory_mb_per_cpu
+            + files / 1000 * self.memory_mb_per_1000_files
+        ) * self.margin
+        seconds = (
+            num_bytes / 1e6 / (self.mb_per_cpu_second * cpus)
+            + files * self.ms_per_file / 1e3
+        ) * self.margin
+        return SlurmSizing(
+            cpus=cpus,
+            memory_mb=min(self.max_memory_mb, math.ceil(memory_mb)),
+            time_minutes=min(
+                self.max_minutes,
+                max(self.min_minutes, math.ceil(seconds / 60)),
+            ),
+        )
+
+
+# by modality abbreviation, lowercase. Compression is what costs: ephys is
+# cpu bound, videos are transcoded, light sheet and other imaging data is
+# rechunked in memory. Anything else is mostly copied.
+DEFAULT_COST_MODELS = {
+    DEFAULT: CostModel(),
+    COPY: CostModel(base_cpus=1, gb_per_cpu=500.0, mb_per_cpu_second=200.0),
+    "ecephys": CostModel(gb_per_cpu=50.0, mb_per_cpu_second=20.0),
+    "behavior-videos": CostModel(gb_per_cpu=20.0, mb_per_cpu_second=10.0),
+    "spim": CostModel(
+        base_cpus=4,
+        memory_mb_per_cpu=8000,
+        max_memory_mb=512000,
+        mb_per_cpu_second=30.0,
+    ),
+    "fmost": CostModel(memory_mb_per_cpu=4000, mb_per_cpu_second=30.0),
+    "pophys": CostModel(memory_mb_per_cpu=4000, mb_per_cpu_second=40.0),
+    "confocal": CostModel(memory_mb_per_cpu=4000, mb_per_cpu_second=40.0),
+}
+
+
+def load_cost_models(path: Optional[str] = SLURM_COST_MODEL) -> dict:
+    """Default cost models with the overrides of a json file applied.
+    Modalities that are only in the file start from the default model."""
+    models = dict(DEFAULT_COST_MODELS)
+    if not path:
+        return models
+    with open(path) as f:
+        overrides = json.load(f)
+    names = {f.name for f in fields(CostModel)}
+    for modality, values in overrides.items():
+        unknown = set(values) - names
+        if unknown:
+            raise ValueError(
+                f"Unknown cost model fields for {modality}: {sorted(unknown)}"
+            )
+        key = modality.lower()
+        base = models.get(key, models[DEFAULT])
+        models[key] = replace(base, **values)
+    return models
+
+
+COST_MODELS = load_cost_models()
+
+
+def cost_model(modality: str, compress: Optional[bool] = None) -> CostModel:
+    """Cost model of a modality. compress=False only copies the data, None
+    leaves it to the modality's default."""
+    if compress is False:
+        return COST_MODELS[COPY]
+    return COST_MODELS.get(modality.lower(), COST_MODELS[DEFAULT])
+
+
+def recommend(
+    modality: str,
+    num_bytes: int,
+    files: int,
+    compress: Optional[bool] = None,
+) -> SlurmSizing:
+    """Resources for a modality job with num_bytes of data in files files"""
+    return cost_model(modality, compress).size(num_bytes, files)
+
+
+def with_slurm_settings(
+    modality: dict[str, Any], checker: Optional[PathChecker] = None
+) -> dict[str, Any]:
+    """
+    A ModalityConfigs dump with recommended slurm_settings for its measured
+    (or, past the walk budget, estimated) source. Returned as is if it has
+    slurm_settings, sizing is turned off, or the source is not a folder
+    the server can read.
+    """
+    if not SLURM_SIZING_ENABLED or modality.get("slurm_settings"):
+        return modality
+    source = modality.get("source")
+    abbreviation = modality.get("modality")
+    if not source or abbreviation is None:
+        return modality
+    report = (checker or path_checker).check_sync(
+        str(source), max_listings=SLURM_SIZING_MAX_LISTINGS
+    )
+    if not report.is_dir or report.errors:
+        return modality
+    sizing = recommend(
+        str(getattr(abbreviation, "value", abbreviation)),
+        report.bytes,
+        report.files,
+        modality.get("compress_raw_data"),
+    )
+    return {**modality, "slurm_settings": sizing.job_properties()}
+
+
+def size_modalities(modalities: list[dict]) -> list[dict]:
+    """with_slurm_settings of each ModalityConfigs dump"""
+    return [with_slurm_settings(m) for m in modalities]
@@ -23,6 +23,8 @@ Unchanged:
 Added:
 - @field_validator('email_notification_types', mode='before')
 - _process_form_data(): converts single upload_job to list, also processes upload_job
+- to_service_model(): converts to SubmitJobRequest without a json round-trip
+    - sets slurm_settings recommended for measured sources (slurm_sizing.py)
 - process_and_validate_form_data(): validates with aind-data-transfer-models
 
 #### Streamlit Pydantic
@@ -30,7 +32,6 @@ Added:
 
 """
 
-import json
 from typing import (
     List,
     Optional,
@@ -51,6 +52,8 @@ from aind_data_transfer_ui_demo.models.basic_upload_job_configs import (
     BasicUploadJobConfigsSimple,
     BasicUploadJobConfigsStreamlit,
 )
+from aind_data_transfer_ui_demo.models.slurm_sizing import size_modalities
+from aind_data_transfer_ui_demo.models.validation_service import get_validator
 
 
 class SubmitJobRequestFastUI(BaseModel):
@@ -126,14 +129,21 @@ class SubmitJobRequestFastUI(BaseModel):
             del form_data["upload_job"]
         return form_data
 
-    def process_and_validate_form_data(self) -> str:
+    def to_service_model(self) -> SubmitJobRequest:
         """Tries to create aind-data-transfer-models from the submitted data.
         If the model is not valid, an exception is raised."""
-        form_data = json.loads(self.model_dump_json())
-        processed_form_data = self._process_form_data(form_data)
-        validated_model = SubmitJobRequest(**processed_form_data)
-        # return the validated model as a json string
-        return validated_model.model_dump_json(indent=3)
+        # python mode dump, enums are str and accepted by the full model
+        processed_form_data = self._process_form_data(self.model_dump())
+        for upload_job in processed_form_data["upload_jobs"]:
+            upload_job["modalities"] = size_modalities(
+                upload_job["modalities"]
+            )
+        return get_validator(SubmitJobRequest).validate(processed_form_data)
+
+    def process_and_validate_form_data(self, indent: Optional[int] = 3) -> str:
+        """Validates with aind-data-transfer-models and returns the validated
+        model as a json string, pretty-printed for display by default."""
+        return self.to_service_model().model_dump_json(indent=indent)
 
 
 class SubmitJobRequestSimple(BaseModel):
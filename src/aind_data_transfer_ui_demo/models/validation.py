@@ -0,0 +1,109 @@
+"""Validation of upload jobs against aind-data-transfer-models
+
+Functions here are module level and only take/return plain json-able data so
+they can be sent to worker processes.
+"""
+
+import json
+from collections import Counter
+from typing import Any
+
+from aind_data_transfer_models.core import (
+    BasicUploadJobConfigs,
+    SubmitJobRequest,
+)
+
+from aind_data_transfer_ui_demo.models.basic_upload_job_configs import (
+    BasicUploadJobConfigsSimple,
+)
+from aind_data_transfer_ui_demo.models.validation_service import (
+    get_validator,
+    validation_errors,
+)
+
+
+def to_upload_job_configs(job: dict) -> BasicUploadJobConfigs:
+    """Converts a BasicUploadJobConfigsSimple-shaped job to the full
+    BasicUploadJobConfigs model. Raises if either model is invalid."""
+    simple = BasicUploadJobConfigsSimple(**job)
+    return get_validator(BasicUploadJobConfigs).validate(simple.model_dump())
+
+
+def validate_upload_job(job: dict) -> dict:
+    """Validates a BasicUploadJobConfigsSimple-shaped job with the full
+    BasicUploadJobConfigs model.
+    Returns {"valid": True, "upload_job": ...} or
+    {"valid": False, "errors": [...]}"""
+    try:
+        validated = to_upload_job_configs(job)
+    except Exception as e:
+        return {"valid": False, "errors": validation_errors(e)}
+    return {
+        "valid": True,
+        "upload_job": validated.model_dump(mode="json"),
+    }
+
+
+def upload_job_errors(jobs: list[dict]) -> list[list[dict]]:
+    """Errors of each BasicUploadJobConfigsSimple-shaped job, empty for a
+    valid job. Only errors are returned, which keeps the results cheap to
+    send back from a worker process."""
+    errors = []
+    for job in jobs:
+        try:
+            to_upload_job_configs(job)
+        except Exception as e:
+            errors.append(validation_errors(e))
+        else:
+            errors.append([])
+    return errors
+
+
+def validate_submit_job_request(text: str) -> dict:
+    """Validates json text of a SubmitJobRequest, or of a single
+    BasicUploadJobConfigs which is wrapped in one.
+    Returns {"valid": True, "submit_job_request": ...} or
+    {"valid": False, "errors": [...]}"""
+    try:
+        data = json.loads(text)
+        if "upload_jobs" not in data:
+            data = {"upload_jobs": [data]}
+        validated = get_validator(SubmitJobRequest).validate(data)
+    except Exception as e:
+        return {"valid": False, "errors": validation_errors(e)}
+    return {
+        "valid": True,
+        "submit_job_request": validated.model_dump(mode="json"),
+    }
+
+
+class ValidationStats:
+    """Aggregate error statistics for a batch of validation results"""
+
+    def __init__(self):
+        """Start with no results"""
+        self.total = 0
+        self.valid = 0
+        self.errors_by_field: Counter = Counter()
+        self.errors_by_type: Counter = Counter()
+
+    def add(self, result: dict) -> None:
+        """Count a result returned by validate_upload_job"""
+        self.total += 1
+        if result["valid"]:
+            self.valid += 1
+            return
+        for err in result["errors"]:
+            field = ".".join(str(loc) for loc in err["loc"]) or "__root__"
+            self.errors_by_field[field] += 1
+            self.errors_by_type[err["type"]] += 1
+
+    def summary(self) -> dict[str, Any]:
+        """Json-able summary"""
+        return {
+            "total": self.total,
+            "valid": self.valid,
+            "invalid": self.total - self.valid,
+            "errors_by_field": dict(self.errors_by_field.most_common()),
+            "errors_by_type": dict(self.errors_by_type.most_common()),
+        }
@@ -0,0 +1,223 @@
+"""Reusable validators for the aind-data-transfer-models service models
+
+SubmitJobRequest, BasicUploadJobConfigs and ModalityConfigs are
+BaseSettings: every construction re-reads the environment, dotenv and
+secrets sources, which is a large part of the cost of validating a job.
+Their core schemas are marked custom_init, so even the model's own
+__pydantic_validator__ calls __init__ for every dict, nested jobs included.
+
+A ServiceModelValidator prebuilds a SchemaValidator from a copy of its
+model's core schema in which the settings models validate without
+__init__, with their settings values merged under the input instead, as
+__init__ would. The values are resolved once, when the validator is built,
+and again only on clear_settings_cache(). Keyword arguments still take
+priority over the settings, and the validated models are instances of the
+upstream classes. Models that customise their own settings sources (e.g.
+job settings read from a user config file named in the input) keep their
+__init__, and the settings the upstream validators build internally
+(metadata, trigger capsule and codeocean settings) still read their
+sources every time.
+"""
+
+import json
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Generic, Optional, TypeVar
+
+from pydantic import BaseModel, ValidationError
+from pydantic_core import SchemaValidator
+from pydantic_settings import (
+    BaseSettings,
+    DotEnvSettingsSource,
+    EnvSettingsSource,
+    InitSettingsSource,
+    SecretsSettingsSource,
+)
+
+M = TypeVar("M", bound=BaseModel)
+# core schema nodes that wrap the schema of a model, e.g. model validators
+WRAPPERS = ("function-before", "function-after", "function-wrap")
+
+
+def _customises_sources(model: type[BaseModel]) -> bool:
+    """Whether a class of model defines its own settings sources"""
+    return any(
+        "settings_customise_sources" in cls.__dict__
+        for cls in model.__mro__
+        if cls is not BaseSettings
+    )
+
+
+def resolve_settings(model: type[BaseSettings]) -> dict[str, Any]:
+    """Values of a settings model's environment, dotenv and secrets
+    sources, as its __init__ would merge them under its keyword arguments"""
+    sources = model.settings_customise_sources(
+        model,
+        init_settings=InitSettingsSource(model, {}),
+        env_settings=EnvSettingsSource(model),
+        dotenv_settings=DotEnvSettingsSource(model),
+        file_secret_settings=SecretsSettingsSource(model),
+    )
+    values = {}
+    # lowest priority first. The service models don't set
+    # env_nested_delimiter, so a shallow merge is enough.
+    for source in reversed(sources):
+        values.update(source())
+    return values
+
+
+class SettingsValues:
+    """Resolved settings values of the settings models of a schema"""
+
+    def __init__(self):
+        """Nothing resolved yet"""
+        self._values: dict[type, dict[str, Any]] = {}
+
+    def add(self, model: type[BaseSettings]) -> None:
+        """Resolve the values of model"""
+        self._values[model] = resolve_settings(model)
+
+    def merge(self, model: type[BaseSettings], data: Any) -> Any:
+        """data with the values of model under it, if data is a dict"""
+        values = self._values[model]
+        if values and isinstance(data, dict):
+            return {**values, **data}
+        return data
+
+    def refresh(self) -> None:
+        """Resolve every model's values again"""
+        for model in self._values:
+            self.add(model)
+
+
+def _settings_model(schema: dict) -> Optional[type[BaseSettings]]:
+    """Settings model validated by schema or its wrappers, if it is one
+    whose sources can be resolved ahead of time"""
+    while schema.get("type") in WRAPPERS:
+        schema = schema["schema"]
+    cls = schema.get("cls")
+    if (
+        schema.get("type") == "model"
+        and schema.get("custom_init")
+        and issubclass(cls, BaseSettings)
+        and not _customises_sources(cls)
+    ):
+        return cls
+    return None
+
+
+def _without_init(schema: Any, values: SettingsValues, head=True) -> Any:
+    """
+    Copy of a core schema whose settings models validate without calling
+    __init__, with their resolved values merged under the input before
+    their model validators run. head is False for the schemas wrapped by a
+    model's validators, which are merged at the outermost wrapper.
+    """
+    if isinstance(schema, list):
+        return [_without_init(item, values) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+    wrapper = schema.get("type") in WRAPPERS
+    copy = {
+        key: _without_init(value, values, not (wrapper and key == "schema"))
+        for key, value in schema.items()
+    }
+    model = _settings_model(schema) if head else None
+    if model is None:
+        return copy
+    if copy.get("type") == "model":
+        copy["custom_init"] = False
+    else:
+        inner = copy
+        while inner["schema"].get("type") in WRAPPERS:
+            inner = inner["schema"]
+        inner["schema"] = {**inner["schema"], "custom_init": False}
+    values.add(model)
+    merged = {
+        "type": "function-before",
+        "function": {
+            "type": "no-info",
+            "function": partial(values.merge, model),
+        },
+        "schema": copy,
+    }
+    # references to the model point at the merge
+    if "ref" in copy:
+        merged["ref"] = copy.pop("ref")
+    return merged
+
+
+@dataclass
+class ValidationResult(Generic[M]):
+    """Validated model, or the errors that prevented validation"""
+
+    model: Optional[M] = None
+    errors: Optional[list[dict]] = None
+
+    @property
+    def valid(self) -> bool:
+        """Whether validation succeeded"""
+        return self.errors is None
+
+
+def validation_errors(e: Exception) -> list[dict]:
+    """Json-able list of errors for an exception raised during validation"""
+    if isinstance(e, ValidationError):
+        return [
+            {"type": err["type"], "loc": err["loc"], "msg": err["msg"]}
+            for err in json.loads(e.json(include_url=False))
+        ]
+    # some upstream validators raise e.g. AttributeError for unknown values
+    return [{"type": type(e).__name__, "loc": [], "msg": str(e)}]
+
+
+class ServiceModelValidator(Generic[M]):
+    """Validates dicts into one of the service models"""
+
+    def __init__(self, model: type[M]):
+        """Builds the validator of model and resolves its settings"""
+        self.model = model
+        self.settings_values = SettingsValues()
+        schema = _without_init(
+            model.__pydantic_core_schema__, self.settings_values
+        )
+        self._validator = SchemaValidator(schema)
+
+    def validate(self, data: dict) -> M:
+        """Validated model. Raises if data is not valid."""
+        return self._validator.validate_python(data)
+
+    def validate_many(self, items: list[dict]) -> list[ValidationResult[M]]:
+        """Validates each item, collecting errors instead of raising"""
+        results = []
+        for data in items:
+            try:
+                results.append(ValidationResult(model=self.validate(data)))
+            except Exception as e:
+                results.append(ValidationResult(errors=validation_errors(e)))
+        return results
+
+
+def clear_settings_cache() -> None:
+    """Resolve settings sources again, e.g. after changing the environment
+    or editing a dotenv or secrets file"""
+    for validator in _validators.values():
+        validator.settings_values.refresh()
+
+
+_validators: dict[type, ServiceModelValidator] = {}
+
+
+def get_validator(model: type[M]) -> ServiceModelValidator[M]:
+    """Shared validator for a service model"""
+    validator = _validators.get(model)
+    if validator is None:
+        validator = _validators[model] = ServiceModelValidator(model)
+    return validator
+
+
+def validate_many(
+    model: type[M], items: list[dict]
+) -> list[ValidationResult[M]]:
+    """Validates a batch of dicts into model"""
+    return get_validator(model).validate_many(items)
@@ -0,0 +1,65 @@
+"""Static payloads compressed once, with gzip (and brotli, if installed),
+and identified by their content hash. Shared by the schema generator, which
+writes the compressed copies next to the files, and the web layer, which
+serves them. Independent of both.
+"""
+
+import gzip
+import hashlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:  # optional, see the "compression" extra
+    brotli = None
+
+# file name suffix of the precompressed copies of a file
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+@dataclass(frozen=True)
+class StaticAsset:
+    """Payload identified by its content hash, with precompressed variants"""
+
+    body: bytes
+    digest: str
+    media_type: str
+    encoded: dict[str, bytes] = field(default_factory=dict)
+
+    @classmethod
+    def build(
+        cls, body: bytes, media_type: str, digest: Optional[str] = None
+    ) -> "StaticAsset":
+        """Compress body with gzip (and brotli if installed), keeping the
+        variants that are actually smaller"""
+        digest = digest or hashlib.sha256(body).hexdigest()[:32]
+        encoded = {}
+        if brotli is not None:
+            encoded["br"] = brotli.compress(body, quality=11)
+        # mtime=0 so the gzip bytes only depend on body
+        encoded["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+        encoded = {k: v for k, v in encoded.items() if len(v) < len(body)}
+        return cls(body, digest, media_type, encoded)
+
+    def etag(self, encoding: Optional[str]) -> str:
+        """Strong ETag, different for each encoding of the content"""
+        return (
+            f'"{self.digest}-{encoding}"' if encoding else f'"{self.digest}"'
+        )
+
+
+def read_asset(path: Path, media_type: str) -> StaticAsset:
+    """Asset for a file, using its precompressed copies (e.g. index.js.br)
+    if there are any, compressing it otherwise"""
+    body = path.read_bytes()
+    encoded = {}
+    for encoding, suffix in ENCODING_SUFFIXES.items():
+        compressed = path.with_name(path.name + suffix)
+        if compressed.is_file():
+            encoded[encoding] = compressed.read_bytes()
+    if not encoded:
+        return StaticAsset.build(body, media_type)
+    digest = hashlib.sha256(body).hexdigest()[:32]
+    return StaticAsset(body, digest, media_type, encoded)
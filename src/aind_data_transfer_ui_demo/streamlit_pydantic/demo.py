@@ -1,3 +1,5 @@
+import copy
+
 import streamlit as st
 import streamlit_pydantic as sp
 from aind_data_transfer_models.core import (
@@ -5,127 +7,95 @@ from aind_data_transfer_models.core import (
     ModalityConfigs,
     SubmitJobRequest,
 )
+from pydantic import BaseModel
 
-from aind_data_transfer_ui_demo.models.modality_configs import ModalityConfigsStreamlit, ModalityConfigsFastUI
-from aind_data_transfer_ui_demo.models.basic_upload_job_configs import BasicUploadJobConfigsStreamlit, BasicUploadJobConfigsFastUI, BasicUploadJobConfigsSimple
-from aind_data_transfer_ui_demo.models.submit_job_request import SubmitJobRequestStreamlit, SubmitJobRequestFastUI, SubmitJobRequestSimple
+from aind_data_transfer_ui_demo.models.basic_upload_job_configs import (
+    BasicUploadJobConfigsFastUI,
+    BasicUploadJobConfigsSimple,
+    BasicUploadJobConfigsStreamlit,
+)
+from aind_data_transfer_ui_demo.models.modality_configs import (
+    ModalityConfigsFastUI,
+    ModalityConfigsStreamlit,
+)
+from aind_data_transfer_ui_demo.models.submit_job_request import (
+    SubmitJobRequestFastUI,
+    SubmitJobRequestSimple,
+    SubmitJobRequestStreamlit,
+)
 
 # streamlit allows UI to group "optional" parameters into an expander
 # this doesn't actually allow Optional type, just ones with default set already
 
 # ___Streamlit models additionally remove optional fields but can render lists
 
+# section -> variant -> model. Streamlit reruns this whole script on every
+# widget interaction, so only the selected form is rendered (st.tabs would
+# build all eleven every time).
+FORMS = {
+    "Modality Configs": {
+        "streamlit": ModalityConfigsStreamlit,
+        "fast_ui": ModalityConfigsFastUI,
+        "full": ModalityConfigs,
+    },
+    "Basic Upload Job Configs": {
+        "streamlit": BasicUploadJobConfigsStreamlit,
+        "fast_ui": BasicUploadJobConfigsFastUI,
+        "simple": BasicUploadJobConfigsSimple,
+        "full": BasicUploadJobConfigs,
+    },
+    "Submit Job Request": {
+        "streamlit": SubmitJobRequestStreamlit,
+        "fast_ui": SubmitJobRequestFastUI,
+        "simple": SubmitJobRequestSimple,
+        "full": SubmitJobRequest,
+    },
+}
 
-# top level tabs
-top_level_tabs = st.tabs(["Modality Configs", "Basic Upload Job Configs", "Submit Job Request"])
-
-with top_level_tabs[0]:
-    st.header("Modality Configs")
-    modality_configs_tabs = st.tabs(['streamlit', 'fast_ui', 'full'])
 
-    with modality_configs_tabs[0]:
-        data = sp.pydantic_input(
-            key="ModalityConfigsStreamlit",
-            model=ModalityConfigsStreamlit,
-            group_optional_fields="expander",
-        )
-        if data:
-            st.json(data)
-    
-    with modality_configs_tabs[1]:
-        data = sp.pydantic_input(
-            key="ModalityConfigsFastUI",
-            model=ModalityConfigsFastUI,
-            group_optional_fields="expander",
-        )
-        if data:
-            st.json(data)
-    
-    with modality_configs_tabs[2]:
-        data = sp.pydantic_input(
-            key="ModalityConfigs",
-            model=ModalityConfigs,
-            group_optional_fields="expander",
-        )
-        if data:
-            st.json(data)
+@st.cache_resource
+def schema_cached_model(section: str, variant: str) -> type[BaseModel]:
+    """Subclass of a form's model whose json schema is generated once per
+    server process. streamlit_pydantic builds its widgets from the schema,
+    which for the full models takes hundreds of ms, on every rerun. Only
+    the schema is cached: the widgets themselves are still built from it on
+    every rerun, as Streamlit requires."""
+    model = FORMS[section][variant]
+    schema = model.model_json_schema(by_alias=True)
 
-with top_level_tabs[1]:
-    st.header("Basic Upload Job Configs")
-    basic_upload_job_configs_tabs = st.tabs(['streamlit', 'fast_ui', 'simple','full'])
+    def model_json_schema(cls, by_alias=True, *args, **kwargs):
+        """A copy of the cached schema for the default arguments"""
+        if by_alias and not args and not kwargs:
+            # copied since widgets may annotate the schema they are given
+            return copy.deepcopy(schema)
+        return model.model_json_schema(by_alias, *args, **kwargs)
 
-    with basic_upload_job_configs_tabs[0]:
-        data = sp.pydantic_input(
-            key="BasicUploadJobConfigsStreamlit",
-            model=BasicUploadJobConfigsStreamlit,
-            group_optional_fields="expander",
-        )
-        if data:
-            st.json(data)
+    return type(
+        model.__name__,
+        (model,),
+        {
+            "__module__": model.__module__,
+            "model_json_schema": classmethod(model_json_schema),
+        },
+    )
 
-    with basic_upload_job_configs_tabs[1]:
-        data = sp.pydantic_input(
-            key="BasicUploadJobConfigsFastUI",
-            model=BasicUploadJobConfigsFastUI,
-            group_optional_fields="expander",
-        )
-        if data:
-            st.json(data)
-    
-    with basic_upload_job_configs_tabs[2]:
-        data = sp.pydantic_input(
-            key="BasicUploadJobConfigsSimple",
-            model=BasicUploadJobConfigsSimple,
-            group_optional_fields="expander",
-        )
-        if data:
-            st.json(data)
-    
-    with basic_upload_job_configs_tabs[3]:
-        data = sp.pydantic_input(
-            key="BasicUploadJobConfigs",
-            model=BasicUploadJobConfigs,
-            group_optional_fields="expander",
-        )
-        if data:
-            st.json(data)
 
-with top_level_tabs[2]:
-    st.header("Submit Job Request")
-    submit_job_request_tabs =  st.tabs(['streamlit', 'fast_ui', 'simple','full'])
+# submitted data of each form, kept while other forms are shown
+submitted = st.session_state.setdefault("submitted", {})
 
-    with submit_job_request_tabs[0]:
-        data = sp.pydantic_input(
-            key="SubmitJobRequestStreamlit",
-            model=SubmitJobRequestStreamlit,
-            group_optional_fields="expander",
-        )
-        if data:
-            st.json(data)
-
-    with submit_job_request_tabs[1]:
-        data = sp.pydantic_input(
-            key="SubmitJobRequestFastUI",
-            model=SubmitJobRequestFastUI,
-            group_optional_fields="expander",
-        )
-        if data:
-            st.json(data)
-
-    with submit_job_request_tabs[2]:
-        data = sp.pydantic_input(
-            key="SubmitJobRequestSimple",
-            model=SubmitJobRequestSimple,
-            group_optional_fields="expander",
-        )
-        if data:
-            st.json(data)
+section = st.radio("Model", list(FORMS), horizontal=True, key="section")
+st.header(section)
+variant = st.radio(
+    "Version", list(FORMS[section]), horizontal=True, key=f"variant-{section}"
+)
 
-    with submit_job_request_tabs[3]:
-        data = sp.pydantic_input(
-            key="SubmitJobRequest",
-            model=SubmitJobRequest,
-            group_optional_fields="expander",
-        )
-        if data:
-            st.json(data)
\ No newline at end of file
+key = FORMS[section][variant].__name__
+data = sp.pydantic_input(
+    key=key,
+    model=schema_cached_model(section, variant),
+    group_optional_fields="expander",
+)
+if data:
+    submitted[key] = data
+if key in submitted:
+    st.json(submitted[key])
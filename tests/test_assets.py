@@ -0,0 +1,45 @@
+"""Tests for the FastUI page shell"""
+
+import unittest
+from unittest.mock import patch
+
+from fastui import prebuilt_html
+
+from aind_data_transfer_ui_demo.fast_ui import assets
+from aind_data_transfer_ui_demo.fast_ui.shared import (
+    APP_TITLE,
+    FASTUI_CDN_URL,
+)
+
+
+class TestLandingPage(unittest.TestCase):
+    """Tests for landing_page"""
+
+    def setUp(self):
+        """Render the shell again in each test"""
+        assets.landing_page.cache_clear()
+        self.addCleanup(assets.landing_page.cache_clear)
+
+    def test_pinned_bundle_matches_fastui(self):
+        """The pinned bundle is the one the installed fastui links to, so
+        upgrading fastui without updating the pin fails here"""
+        self.assertIn(f"{FASTUI_CDN_URL}/index.js", prebuilt_html())
+
+    def test_loads_bundle_from_cdn(self):
+        """Without a vendored bundle the shell links to the CDN"""
+        with patch.object(assets, "is_vendored", return_value=False):
+            page = assets.landing_page().body.decode()
+        self.assertIn(f'src="{FASTUI_CDN_URL}/index.js"', page)
+        self.assertIn(f"<title>{APP_TITLE}</title>", page)
+
+    def test_loads_vendored_bundle(self):
+        """With a vendored bundle the shell links to the local copy"""
+        with patch.object(assets, "is_vendored", return_value=True):
+            page = assets.landing_page().body.decode()
+        url = f"{assets.ASSETS_URL}/{assets.PREBUILT_VERSION}"
+        self.assertIn(f'href="{url}/index.css"', page)
+        self.assertNotIn(FASTUI_CDN_URL, page)
+
+
+if __name__ == "__main__":
+    unittest.main()
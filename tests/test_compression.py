@@ -0,0 +1,229 @@
+"""Tests for compression sampling"""
+
+import os
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from aind_data_transfer_ui_demo.fast_ui import executor
+from aind_data_transfer_ui_demo.fast_ui.routers import compression
+from aind_data_transfer_ui_demo.jobs.compression import (
+    MIN_MB_PER_SECOND,
+    CodecResult,
+    pick_files,
+    recommend,
+    sample_compression,
+)
+from aind_data_transfer_ui_demo.jobs.preflight import OUTSIDE_ROOTS
+
+TEXT = b"acquisition 0001, probe A, channel 17\n" * 2000
+
+
+def result(codec: str, ratio: float, mb_per_second: float) -> CodecResult:
+    """CodecResult of 1000 input bytes"""
+    return CodecResult(
+        codec=codec,
+        ratio=ratio,
+        mb_per_second=mb_per_second,
+        input_bytes=1000,
+        output_bytes=round(1000 / ratio),
+    )
+
+
+class SourceTestCase(unittest.TestCase):
+    """Temporary root with a compressible and an incompressible source, and
+    a file outside the root"""
+
+    def setUp(self):
+        """Write the sources"""
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.outside = Path(folder.name) / "secret.bin"
+        self.outside.write_bytes(TEXT)
+        self.root = Path(folder.name) / "root"
+        self.text = self.root / "text"
+        self.noise = self.root / "noise"
+        for source in (self.text, self.noise):
+            (source / "sub").mkdir(parents=True)
+        (self.text / "a.txt").write_bytes(TEXT)
+        (self.text / "sub" / "b.txt").write_bytes(TEXT)
+        (self.text / "empty.txt").write_bytes(b"")
+        rng = random.Random(0)
+        (self.noise / "a.bin").write_bytes(rng.randbytes(len(TEXT)))
+        self.roots = [os.path.realpath(self.root)]
+
+
+class TestPickFiles(SourceTestCase):
+    """Tests for pick_files"""
+
+    def test_picks_non_empty_files(self):
+        """Every non-empty file is picked when there are few enough"""
+        picked = pick_files(str(self.text), rng=random.Random(0))
+        self.assertEqual(
+            {str(self.text / "a.txt"), str(self.text / "sub" / "b.txt")},
+            {path for path, _ in picked},
+        )
+        self.assertEqual({len(TEXT)}, {size for _, size in picked})
+
+    def test_picks_by_size(self):
+        """Large files are picked far more often than small ones"""
+        for i in range(20):
+            (self.noise / "sub" / f"{i}.json").write_bytes(b"{}")
+        rng = random.Random(0)
+        picks = [pick_files(str(self.noise), 1, rng)[0][0] for _ in range(50)]
+        self.assertGreater(picks.count(str(self.noise / "a.bin")), 45)
+
+    def test_bounds(self):
+        """At most max_files are picked, from the first max_scanned"""
+        self.assertEqual(1, len(pick_files(str(self.text), max_files=1)))
+        self.assertLessEqual(len(pick_files(str(self.text), max_scanned=1)), 1)
+
+    def test_skips_symlinks(self):
+        """Symlinked files are not picked"""
+        (self.text / "link.txt").symlink_to(self.outside)
+        paths = [path for path, _ in pick_files(str(self.text))]
+        self.assertNotIn(str(self.text / "link.txt"), paths)
+
+
+class TestRecommend(unittest.TestCase):
+    """Tests for recommend"""
+
+    def test_incompressible(self):
+        """No compression if no codec reaches MIN_RATIO"""
+        compress, codec, reason = recommend([result("zlib-6", 1.01, 100)])
+        self.assertFalse(compress)
+        self.assertIsNone(codec)
+        self.assertIn("incompressible", reason)
+
+    def test_too_slow(self):
+        """No compression if the codecs that compress are too slow"""
+        compress, codec, _ = recommend(
+            [
+                result("zlib-6", 1.05, 100),
+                result("lzma-1", 3.0, MIN_MB_PER_SECOND / 2),
+            ]
+        )
+        self.assertFalse(compress)
+        self.assertIsNone(codec)
+
+    def test_best_fast_codec(self):
+        """The best ratio among the fast enough codecs is recommended"""
+        compress, codec, reason = recommend(
+            [
+                result("zlib-6", 2.0, 100),
+                result("zstd-3", 2.5, 300),
+                result("lzma-1", 4.0, MIN_MB_PER_SECOND / 2),
+            ]
+        )
+        self.assertTrue(compress)
+        self.assertEqual("zstd-3", codec)
+        self.assertIn("saves 60%", reason)
+
+
+class TestSampleCompression(SourceTestCase):
+    """Tests for sample_compression"""
+
+    def test_compressible_and_incompressible(self):
+        """Text shrinks with every codec, random bytes with none"""
+        text = sample_compression(str(self.text), seed=0, roots=self.roots)
+        self.assertEqual(2, text.files)
+        self.assertEqual(2 * len(TEXT), text.sampled_bytes)
+        self.assertTrue(all(r.ratio > 10 for r in text.results))
+        noise = sample_compression(str(self.noise), seed=0)
+        self.assertFalse(noise.compress)
+        self.assertIsNone(noise.codec)
+
+    def test_bounded_by_sample_bytes(self):
+        """Each file gives its share of sample_bytes"""
+        sample = sample_compression(str(self.text), sample_bytes=1000, seed=0)
+        self.assertEqual(1000, sample.sampled_bytes)
+
+    def test_single_file(self):
+        """A file source is sampled as is"""
+        sample = sample_compression(str(self.text / "a.txt"), seed=0)
+        self.assertEqual(1, sample.files)
+
+    def test_unusable_sources(self):
+        """Missing and empty sources raise"""
+        with self.assertRaises(FileNotFoundError):
+            sample_compression(str(self.root / "missing"), roots=self.roots)
+        with self.assertRaises(ValueError):
+            sample_compression(str(self.text / "empty.txt"))
+
+    def test_outside_the_roots(self):
+        """Sources outside the roots are refused before they are looked
+        at, also through a symlink"""
+        (self.root / "link").symlink_to(self.outside.parent)
+        for source in (
+            self.outside,
+            self.outside.with_name("missing"),
+            self.root / "link" / "secret.bin",
+        ):
+            with self.subTest(source=source):
+                with self.assertRaisesRegex(PermissionError, OUTSIDE_ROOTS):
+                    sample_compression(str(source), roots=self.roots)
+
+
+class TestCompressionEndpoints(SourceTestCase):
+    """Tests for /api/compression"""
+
+    @classmethod
+    def setUpClass(cls):
+        """App with only the compression router, sampling in threads"""
+        pool = executor.BoundedExecutor("thread", max_workers=2)
+        cls.addClassCleanup(pool.shutdown)
+        for target in (executor, compression):
+            patcher = patch.object(target, "validation_executor", pool)
+            patcher.start()
+            cls.addClassCleanup(patcher.stop)
+        app = FastAPI()
+        app.include_router(compression.router, prefix="/api/compression")
+        cls.client = TestClient(app)
+
+    def setUp(self):
+        """Allow only the temporary root"""
+        super().setUp()
+        patcher = patch.object(compression, "SOURCE_ROOTS", self.roots)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_sample(self):
+        """Sources below the roots are sampled"""
+        response = self.client.post(
+            "/api/compression/sample",
+            json={"source": str(self.text), "sample_mb": 1, "seed": 0},
+        )
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(2, response.json()["files"])
+
+    def test_form(self):
+        """The form shows the verdict and the codec table"""
+        response = self.client.post(
+            "/api/compression", data={"source": str(self.noise)}
+        )
+        self.assertEqual(200, response.status_code)
+        heading, _, table = response.json()
+        self.assertTrue(heading["text"].startswith("Don't compress"))
+        self.assertEqual("Table", table["type"])
+
+    def test_outside_the_roots(self):
+        """Sources outside the roots get the same error whether or not
+        they exist"""
+        for source in (self.outside, self.outside.with_name("missing")):
+            with self.subTest(source=source):
+                response = self.client.post(
+                    "/api/compression/sample", json={"source": str(source)}
+                )
+                self.assertEqual(422, response.status_code)
+                [error] = response.json()["detail"]["form"]
+                self.assertEqual(["source"], error["loc"])
+                self.assertEqual(OUTSIDE_ROOTS, error["msg"])
+
+
+if __name__ == "__main__":
+    unittest.main()
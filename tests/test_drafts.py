@@ -0,0 +1,296 @@
+"""Tests for the json editor drafts and incremental validation"""
+
+import unittest
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from aind_data_transfer_ui_demo.fast_ui import executor
+from aind_data_transfer_ui_demo.fast_ui.routers import validate
+from aind_data_transfer_ui_demo.models import drafts
+from aind_data_transfer_ui_demo.models.drafts import (
+    Draft,
+    DraftStore,
+    PatchError,
+    PatchOperation,
+    parse_pointer,
+)
+
+REQUEST = "SubmitJobRequestSimple"
+JOB = "BasicUploadJobConfigsSimple"
+UPLOAD_JOB = {
+    "project_name": "Ephys Platform",
+    "platform": "ecephys",
+    "subject_id": "123456",
+    "acq_datetime": "2024-01-01T10:00:00",
+    "modalities": [{"modality": "ecephys", "source": "/data/ecephys"}],
+}
+
+
+def operation(op: str, path: str, **kwargs) -> PatchOperation:
+    """One patch operation, from is passed as from_"""
+    if "from_" in kwargs:
+        kwargs["from"] = kwargs.pop("from_")
+    return PatchOperation.model_validate({"op": op, "path": path, **kwargs})
+
+
+def validated_draft(jobs: int) -> Draft:
+    """Request draft with jobs upload jobs, each marked as validated with
+    an error naming it"""
+    draft = Draft(REQUEST, {"upload_jobs": [{"n": i} for i in range(jobs)]})
+    draft.job_errors = [[{"path": "", "msg": str(i)}] for i in range(jobs)]
+    return draft
+
+
+def names(draft: Draft) -> list:
+    """Which job each entry of job_errors was validated as, None if it is
+    pending"""
+    return [e[0]["msg"] if e else None for e in draft.job_errors]
+
+
+class TestPatch(unittest.TestCase):
+    """Tests for applying JSON Patches to a draft"""
+
+    def test_pointers(self):
+        """~1 and ~0 are unescaped after splitting"""
+        self.assertEqual([], parse_pointer(""))
+        self.assertEqual(["a/b", "m~n", ""], parse_pointer("/a~1b/m~0n/"))
+        with self.assertRaises(PatchError):
+            parse_pointer("a")
+
+    def test_operations(self):
+        """Each operation of RFC 6902"""
+        draft = Draft(JOB, {"a": {"b": 1}, "list": [1, 2], "x/y": 0})
+        draft.apply(
+            [
+                operation("add", "/a/c", value=2),
+                operation("add", "/list/1", value=9),
+                operation("add", "/list/-", value=3),
+                operation("remove", "/list/0"),
+                operation("replace", "/x~1y", value="slash"),
+                operation("copy", "/d", from_="/a"),
+                operation("move", "/e", from_="/a/b"),
+                operation("test", "/list", value=[9, 2, 3]),
+            ]
+        )
+        self.assertEqual(
+            {
+                "a": {"c": 2},
+                "list": [9, 2, 3],
+                "x/y": "slash",
+                "d": {"b": 1, "c": 2},
+                "e": 1,
+            },
+            draft.document,
+        )
+        self.assertEqual(1, draft.version)
+        draft.apply([operation("replace", "", value=[])])
+        self.assertEqual([], draft.document)
+
+    def test_copies_are_independent(self):
+        """Editing a copy leaves its source alone"""
+        draft = Draft(JOB, {"a": {"b": 1}})
+        draft.apply(
+            [
+                operation("copy", "/c", from_="/a"),
+                operation("replace", "/c/b", value=2),
+            ]
+        )
+        self.assertEqual({"b": 1}, draft.document["a"])
+
+    def test_invalid_patches(self):
+        """Patches that don't apply raise PatchError"""
+        for patch_ in (
+            [operation("test", "/a", value=2)],
+            [operation("remove", "/missing")],
+            [operation("add", "/list/5", value=1)],
+            [operation("add", "/list/01", value=1)],
+            [operation("add", "/a/b/c", value=1)],
+            [operation("move", "/b")],
+            [operation("remove", "")],
+        ):
+            with self.subTest(patch=patch_):
+                draft = Draft(JOB, {"a": 1, "list": []})
+                with self.assertRaises(PatchError):
+                    draft.apply(patch_)
+
+
+class TestJobTracking(unittest.TestCase):
+    """Tests for which upload jobs a patch marks for validation"""
+
+    def test_field_edit(self):
+        """Editing inside a job only marks that job"""
+        draft = validated_draft(3)
+        draft.apply([operation("replace", "/upload_jobs/1/n", value=5)])
+        self.assertEqual(["0", None, "2"], names(draft))
+        self.assertEqual([1], draft.pending_jobs())
+
+    def test_insert_and_remove_shift_errors(self):
+        """Errors move with their jobs when jobs are inserted or removed"""
+        draft = validated_draft(3)
+        draft.apply([operation("add", "/upload_jobs/0", value={"n": 9})])
+        self.assertEqual([None, "0", "1", "2"], names(draft))
+        draft.apply([operation("remove", "/upload_jobs/2")])
+        self.assertEqual([None, "0", "2"], names(draft))
+        draft.apply([operation("add", "/upload_jobs/-", value={})])
+        self.assertEqual([None, "0", "2", None], names(draft))
+        draft.apply(
+            [operation("move", "/upload_jobs/0", from_="/upload_jobs/2")]
+        )
+        self.assertEqual([None, None, "0", None], names(draft))
+
+    def test_whole_list(self):
+        """Replacing the list, or a patch leaving it out of step, marks
+        every job"""
+        draft = validated_draft(2)
+        draft.apply([operation("replace", "/upload_jobs", value=[{}] * 3)])
+        self.assertEqual([0, 1, 2], draft.pending_jobs())
+        draft = validated_draft(2)
+        draft.apply([operation("replace", "/upload_jobs", value="nope")])
+        self.assertEqual([], draft.pending_jobs())
+        draft.apply([operation("replace", "/upload_jobs", value=[{}])])
+        self.assertEqual([0], draft.pending_jobs())
+
+    def test_other_fields(self):
+        """Other fields only reset the request's own errors"""
+        draft = validated_draft(2)
+        draft.errors = []
+        draft.apply([operation("add", "/user_email", value="x@example.org")])
+        self.assertIsNone(draft.errors)
+        self.assertEqual([], draft.pending_jobs())
+
+    def test_errors_are_scoped_to_their_job(self):
+        """Job errors are reported under the job's json pointer"""
+        draft = validated_draft(2)
+        draft.errors = [{"path": "/user_email", "msg": "bad"}]
+        paths = [error["path"] for error in draft.all_errors()]
+        self.assertEqual(
+            ["/user_email", "/upload_jobs/0", "/upload_jobs/1"], paths
+        )
+
+
+class TestDraftStore(unittest.TestCase):
+    """Tests for DraftStore"""
+
+    def test_expires_after_ttl(self):
+        """Drafts are dropped ttl seconds after their last use"""
+        store = DraftStore(ttl=10)
+        draft = Draft(JOB, {})
+        with patch.object(drafts, "time") as clock:
+            clock.monotonic.return_value = 100
+            store.add(draft)
+            clock.monotonic.return_value = 105
+            self.assertIs(draft, store.get(draft.id))
+            clock.monotonic.return_value = 114
+            self.assertIs(draft, store.get(draft.id))
+            clock.monotonic.return_value = 125
+            self.assertIsNone(store.get(draft.id))
+
+    def test_evicts_least_recently_used(self):
+        """Past max_entries the least recently used draft is dropped"""
+        store = DraftStore(max_entries=2)
+        first, second, third = (Draft(JOB, {}) for _ in range(3))
+        store.add(first)
+        store.add(second)
+        store.get(first.id)
+        store.add(third)
+        self.assertIsNone(store.get(second.id))
+        self.assertIs(first, store.get(first.id))
+        store.discard(first.id)
+        self.assertIsNone(store.get(first.id))
+
+
+class TestValidateEndpoints(unittest.TestCase):
+    """Tests for /api/validate"""
+
+    @classmethod
+    def setUpClass(cls):
+        """App with only the validate router, validating in threads"""
+        pool = executor.BoundedExecutor("thread", max_workers=2)
+        cls.addClassCleanup(pool.shutdown)
+        for target in (executor, validate):
+            patcher = patch.object(target, "validation_executor", pool)
+            patcher.start()
+            cls.addClassCleanup(patcher.stop)
+        app = FastAPI()
+        app.include_router(validate.router, prefix="/api/validate")
+        cls.client = TestClient(app)
+
+    def setUp(self):
+        """Start from an empty draft store"""
+        patcher = patch.object(validate, "draft_store", DraftStore())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create(self, document: dict, model: str = REQUEST) -> dict:
+        """Response of starting a draft"""
+        response = self.client.post(f"/api/validate/{model}", json=document)
+        self.assertEqual(200, response.status_code)
+        return response.json()
+
+    def patch(self, draft: dict, operations: list, version: int = None):
+        """Response of patching a draft"""
+        return self.client.patch(
+            f"/api/validate/{REQUEST}/{draft['draft_id']}",
+            json={
+                "version": draft["version"] if version is None else version,
+                "patch": operations,
+            },
+        )
+
+    def test_only_patched_jobs_are_validated(self):
+        """A patch validates the jobs it touched, errors are scoped"""
+        draft = self.create({"upload_jobs": [UPLOAD_JOB] * 3})
+        self.assertTrue(draft["valid"])
+        self.assertEqual([0, 1, 2], draft["validated"])
+        response = self.patch(
+            draft,
+            [{"op": "replace", "path": "/upload_jobs/1/platform", "value": 1}],
+        )
+        self.assertEqual(200, response.status_code)
+        body = response.json()
+        self.assertEqual(1, body["version"])
+        self.assertEqual([1], body["validated"])
+        self.assertFalse(body["valid"])
+        for error in body["errors"]:
+            self.assertTrue(error["path"].startswith("/upload_jobs/1/"))
+        fixed = self.patch(
+            body,
+            [{"op": "replace", "path": "/upload_jobs/1", "value": UPLOAD_JOB}],
+        ).json()
+        self.assertTrue(fixed["valid"])
+
+    def test_single_job(self):
+        """Documents without upload jobs are validated whole"""
+        draft = self.create({**UPLOAD_JOB, "subject_id": None}, JOB)
+        self.assertFalse(draft["valid"])
+        self.assertEqual([], draft["validated"])
+
+    def test_out_of_sync_is_a_conflict(self):
+        """Unknown drafts, stale versions and patches that don't apply are
+        a 409, and a bad patch discards the draft"""
+        draft = self.create({"upload_jobs": [UPLOAD_JOB]})
+        replace = [{"op": "replace", "path": "/user_email", "value": None}]
+        self.assertEqual(
+            409, self.patch(draft, replace, version=5).status_code
+        )
+        missing = {**draft, "draft_id": "nope"}
+        self.assertEqual(409, self.patch(missing, replace).status_code)
+        bad = [{"op": "remove", "path": "/upload_jobs/3"}]
+        self.assertEqual(409, self.patch(draft, bad).status_code)
+        self.assertEqual(409, self.patch(draft, replace).status_code)
+
+    def test_unknown_model_and_delete(self):
+        """Only the simple models have drafts, and drafts can be deleted"""
+        response = self.client.post("/api/validate/LoginForm", json={})
+        self.assertEqual(404, response.status_code)
+        draft = self.create({"upload_jobs": [UPLOAD_JOB]})
+        url = f"/api/validate/{REQUEST}/{draft['draft_id']}"
+        self.assertEqual(204, self.client.delete(url).status_code)
+        add = [{"op": "add", "path": "/user_email", "value": None}]
+        self.assertEqual(409, self.patch(draft, add).status_code)
+
+
+if __name__ == "__main__":
+    unittest.main()
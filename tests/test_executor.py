@@ -0,0 +1,100 @@
+"""Tests for the bounded validation executor"""
+
+import asyncio
+import threading
+import unittest
+
+from pydantic import BaseModel
+
+from aind_data_transfer_ui_demo.fast_ui.executor import (
+    BoundedExecutor,
+    ExecutorSaturated,
+    _validate_form,
+)
+
+
+class Form(BaseModel):
+    """Form validated in the tests"""
+
+    name: str
+
+
+class TestBoundedExecutor(unittest.IsolatedAsyncioTestCase):
+    """Tests for BoundedExecutor"""
+
+    async def asyncTearDown(self):
+        """Release blocked calls and stop the pool"""
+        self.release.set()
+        self.executor.shutdown()
+
+    async def asyncSetUp(self):
+        """Thread executor with room for one call"""
+        self.executor = BoundedExecutor("thread", max_workers=1, max_pending=1)
+        self.release = threading.Event()
+
+    async def test_runs_calls(self):
+        """Results come back and completed calls are counted"""
+        self.assertEqual(3, await self.executor.run(sum, [1, 2]))
+        stats = self.executor.stats()
+        self.assertEqual(1, stats["completed"])
+        self.assertEqual(1, stats["queue_wait_ms"]["n"])
+
+    async def test_rejects_when_saturated(self):
+        """Fail-fast callers get ExecutorSaturated past max_pending"""
+        running = asyncio.ensure_future(self.executor.run(self.release.wait))
+        await asyncio.sleep(0.01)
+        with self.assertRaises(ExecutorSaturated) as raised:
+            await self.executor.run(sum, [1])
+        self.assertEqual(429, raised.exception.status_code)
+        self.release.set()
+        await running
+        self.assertEqual(1, self.executor.stats()["rejected"])
+
+    async def test_batch_calls_are_admitted_separately(self):
+        """Batch calls wait for their own slots, and don't turn interactive
+        callers away however many are queued"""
+        self.executor = BoundedExecutor(
+            "thread", max_workers=2, max_pending=1, max_batch=1
+        )
+        batch = [
+            asyncio.ensure_future(
+                self.executor.run(self.release.wait, wait=True)
+            )
+            for _ in range(5)
+        ]
+        await asyncio.sleep(0.01)
+        stats = self.executor.stats()
+        self.assertEqual(1, stats["batch_pending"])
+        self.assertEqual(4, stats["batch_waiting"])
+        self.assertEqual(0, stats["pending"])
+        self.assertEqual(3, await self.executor.run(sum, [1, 2]))
+        self.release.set()
+        self.assertEqual([True] * 5, await asyncio.gather(*batch))
+        stats = self.executor.stats()
+        self.assertEqual(0, stats["batch_pending"] + stats["batch_waiting"])
+        self.assertEqual(0, stats["rejected"])
+
+
+class TestProcessExecutor(unittest.IsolatedAsyncioTestCase):
+    """Tests for process pools"""
+
+    async def test_spawns_workers(self):
+        """Workers are spawned, not forked, and validate forms"""
+        executor = BoundedExecutor("process", max_workers=1)
+        try:
+            context = executor.pool._mp_context
+            self.assertEqual("spawn", context.get_start_method())
+            form, errors = await executor.run(
+                _validate_form, Form, {"name": "x"}
+            )
+            self.assertEqual(Form(name="x"), form)
+            self.assertIsNone(errors)
+            form, errors = await executor.run(_validate_form, Form, {})
+            self.assertIsNone(form)
+            self.assertEqual(("name",), tuple(errors[0]["loc"]))
+        finally:
+            executor.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
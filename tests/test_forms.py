@@ -0,0 +1,140 @@
+"""Tests for the form endpoints"""
+
+import json
+import unittest
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from aind_data_transfer_ui_demo.fast_ui import executor
+from aind_data_transfer_ui_demo.fast_ui.routers import forms
+from aind_data_transfer_ui_demo.fast_ui.search_index import (
+    Option,
+    RefreshingOptionIndex,
+)
+
+# form types FastUI can render, the full aind-data-transfer-models forms
+# fail to serialize
+FORM_TYPES = [
+    "login",
+    "select",
+    "ModalityConfigsFastUI",
+    "BasicUploadJobConfigsFastUI",
+    "SubmitJobRequestFastUI",
+]
+UPLOAD_JOB_FORM = {
+    "project_name": "Ephys Platform",
+    "platform": "ecephys",
+    "subject_id": "123456",
+    "acq_datetime": "2024-01-01T10:00",
+    "modality.modality": "ecephys",
+    "modality.source": "/data/ecephys",
+}
+OPTIONS = [
+    Option(value="FRA", label="France", group="Europe", weight=68),
+    Option(value="ZAF", label="South Africa", group="Africa", weight=60),
+]
+
+
+def component_types(components: list[dict]) -> list[str]:
+    """Types of the components of a tree, depth first"""
+    types = []
+    for component in components:
+        types.append(component["type"])
+        types.extend(component_types(component.get("components", [])))
+    return types
+
+
+class TestFormEndpoints(unittest.TestCase):
+    """Tests for /api/forms"""
+
+    @classmethod
+    def setUpClass(cls):
+        """App with only the forms router, validating in threads and
+        searching a fixed option index"""
+
+        async def load() -> list[Option]:
+            """Options of the search-select fields"""
+            return OPTIONS
+
+        pool = executor.BoundedExecutor("thread", max_workers=2)
+        cls.addClassCleanup(pool.shutdown)
+        for target in (executor, forms):
+            patcher = patch.object(target, "validation_executor", pool)
+            patcher.start()
+            cls.addClassCleanup(patcher.stop)
+        patcher = patch.object(
+            forms, "country_index", RefreshingOptionIndex(load)
+        )
+        patcher.start()
+        cls.addClassCleanup(patcher.stop)
+        app = FastAPI()
+        app.include_router(forms.router, prefix="/api/forms")
+        cls.client = TestClient(app)
+
+    def test_pages(self):
+        """Each form page has the tabs and its form"""
+        for form_type in FORM_TYPES:
+            with self.subTest(form_type=form_type):
+                response = self.client.get(f"/api/forms/{form_type}")
+                self.assertEqual(200, response.status_code)
+                types = component_types(response.json())
+                self.assertIn("LinkList", types)
+                self.assertIn("ModelForm", types)
+
+    def test_content_is_cached_with_an_etag(self):
+        """Content is rendered once and revalidated with If-None-Match"""
+        url = "/api/forms/content/login"
+        first = self.client.get(url)
+        self.assertEqual(
+            ["Heading", "Paragraph", "ModelForm"],
+            [component["type"] for component in first.json()],
+        )
+        again = self.client.get(
+            url, headers={"If-None-Match": first.headers["ETag"]}
+        )
+        self.assertEqual(304, again.status_code)
+        self.assertEqual(422, self.client.get("/api/forms/nope").status_code)
+
+    def test_post_echoes_the_form(self):
+        """Valid form data is shown back"""
+        data = {"email": "test@example.org", "password": "secret"}
+        response = self.client.post("/api/forms/login", data=data)
+        self.assertEqual(200, response.status_code)
+        code = [c for c in response.json() if c["type"] == "Code"]
+        self.assertEqual(
+            "test@example.org", json.loads(code[0]["text"])["email"]
+        )
+
+    def test_post_offers_submit_for_jobs(self):
+        """Trimmed job forms are validated against the full model and can be
+        submitted"""
+        response = self.client.post(
+            "/api/forms/BasicUploadJobConfigsFastUI", data=UPLOAD_JOB_FORM
+        )
+        self.assertEqual(200, response.status_code)
+        components = response.json()
+        self.assertEqual(2, component_types(components).count("Code"))
+        self.assertEqual("Form", components[-1]["type"])
+
+    def test_post_reports_invalid_fields(self):
+        """Invalid form data is a 422 with the failing fields"""
+        response = self.client.post(
+            "/api/forms/login", data={"email": "x@example.org"}
+        )
+        self.assertEqual(422, response.status_code)
+        [error] = response.json()["detail"]["form"]
+        self.assertEqual(["password"], error["loc"])
+
+    def test_search(self):
+        """Options are searched and grouped by region"""
+        response = self.client.get("/api/forms/search", params={"q": "fra"})
+        self.assertEqual(200, response.status_code)
+        [group] = response.json()["options"]
+        self.assertEqual("Europe", group["label"])
+        self.assertEqual("FRA", group["options"][0]["value"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+"""Import time budget of the FastUI server module
+
+The server has to accept connections and answer health checks quickly after
+a pod starts, so importing it must not pull in the job models. These tests
+import the server in fresh interpreters with `python -X importtime`, and
+compare the best of RUNS imports to the budget to ignore noise from a busy
+machine. Set AIND_IMPORT_BUDGET_MS to check against another budget.
+"""
+
+import os
+import re
+import subprocess
+import sys
+import unittest
+
+MODULE = "aind_data_transfer_ui_demo.fast_ui.server"
+BUDGET_MS = float(os.getenv("AIND_IMPORT_BUDGET_MS", "1500"))
+RUNS = 3
+FORBIDDEN = [
+    "aind_data_transfer_models",
+    "aind_data_schema",
+    "aind_data_transfer_ui_demo.models",
+]
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def import_times(module: str) -> dict[str, tuple[int, int]]:
+    """Module -> (self, cumulative) import time in us, for one fresh import
+    of module"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, _, name = match.groups()
+            times[name] = (int(self_us), int(cumulative_us))
+    return times
+
+
+class TestImportTime(unittest.TestCase):
+    """Tests for the server's import time"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Fastest of RUNS imports of the server"""
+        runs = [import_times(MODULE) for _ in range(RUNS)]
+        cls.times = min(runs, key=lambda times: times[MODULE][1])
+
+    def test_within_budget(self):
+        """Importing the server takes less than BUDGET_MS"""
+        total_ms = self.times[MODULE][1] / 1000
+        slowest = sorted(self.times.items(), key=lambda item: -item[1][0])
+        self.assertLess(
+            total_ms,
+            BUDGET_MS,
+            "slowest imports: "
+            + ", ".join(f"{n} {t / 1000:.0f} ms" for n, (t, _) in slowest[:5]),
+        )
+
+    def test_job_models_are_not_imported(self):
+        """Importing the server doesn't pull in the job models"""
+        forbidden = sorted(
+            name
+            for name in self.times
+            if any(
+                name == prefix or name.startswith(prefix + ".")
+                for prefix in FORBIDDEN
+            )
+        )
+        self.assertEqual([], forbidden)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""Tests for the Job Status pages"""
+
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from aind_data_transfer_ui_demo.fast_ui.routers import job_status
+from aind_data_transfer_ui_demo.jobs.store import (
+    JobState,
+    JobStatus,
+    JobStatusStore,
+)
+
+
+class TestJobStatusPages(unittest.TestCase):
+    """Tests for /api/job_status"""
+
+    @classmethod
+    def setUpClass(cls):
+        """App with only the job status router, on a store with 60 jobs"""
+        folder = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(folder.cleanup)
+        store = JobStatusStore(os.path.join(folder.name, "jobs.db"))
+        cls.addClassCleanup(store.close)
+        store.upsert(
+            JobStatus(
+                job_id=f"job-{i}",
+                subject_id=str(100000 + i % 2),
+                project_name="Project",
+                status=JobState.SUBMITTED,
+                submit_time=datetime(2024, 1, 1, i // 60, i % 60),
+            )
+            for i in range(60)
+        )
+        patcher = patch.object(job_status, "job_status_store", store)
+        patcher.start()
+        cls.addClassCleanup(patcher.stop)
+        app = FastAPI()
+        app.include_router(job_status.router, prefix="/api/job_status")
+        cls.client = TestClient(app)
+
+    def component(self, url: str, component_type: str, **params) -> dict:
+        """First component of a type on a page"""
+        response = self.client.get(url, params=params)
+        self.assertEqual(200, response.status_code)
+        page = response.json()
+        while page:
+            component = page.pop(0)
+            if component["type"] == component_type:
+                return component
+            page.extend(component.get("components", []))
+        self.fail(f"no {component_type} on {url}")
+
+    def test_table_pages(self):
+        """The table shows one page of the matching jobs, newest first"""
+        table = self.component("/api/job_status", "Table")
+        self.assertEqual(job_status.PAGE_SIZE, len(table["data"]))
+        self.assertEqual("job-59", table["data"][0]["job_id"])
+        pagination = self.component("/api/job_status", "Pagination", page=2)
+        self.assertEqual(60, pagination["total"])
+
+    def test_table_filters(self):
+        """Filters are applied by the store"""
+        table = self.component("/api/job_status", "Table", subject_id="100001")
+        self.assertEqual(30, len(table["data"]))
+        self.assertEqual({"100001"}, {j["subject_id"] for j in table["data"]})
+
+    def test_details(self):
+        """A job's page shows its details, unknown jobs are a 404"""
+        details = self.component("/api/job_status/job-1/", "Details")
+        self.assertEqual("job-1", details["data"]["job_id"])
+        response = self.client.get("/api/job_status/nope/")
+        self.assertEqual(404, response.status_code)
+
+    def test_revalidation(self):
+        """Pages are tagged, so an unchanged page is a 304"""
+        first = self.client.get("/api/job_status/job-1/")
+        again = self.client.get(
+            "/api/job_status/job-1/",
+            headers={"If-None-Match": first.headers["ETag"]},
+        )
+        self.assertEqual(304, again.status_code)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+"""Tests for job template parsing and the template upload endpoint"""
+
+import csv
+import io
+import json
+import unittest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from aind_data_transfer_ui_demo.fast_ui.routers import jobs
+from aind_data_transfer_ui_demo.models.job_template import (
+    TEMPLATE_EXAMPLE,
+    create_job_template,
+    iter_job_rows,
+    iter_submit_job_requests,
+    row_to_job,
+    template_columns,
+)
+
+
+def template_csv(rows: list[dict]) -> bytes:
+    """Job template csv with the given rows"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, template_columns())
+    writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue().encode()
+
+
+EXAMPLE_ROW = {**TEMPLATE_EXAMPLE, "acq_datetime": "2024-01-01T10:00:00"}
+
+
+class TestRowToJob(unittest.TestCase):
+    """Tests for row_to_job"""
+
+    def test_maps_modality_columns(self):
+        """Numbered modality columns become a modalities list"""
+        job = row_to_job(
+            {
+                "subject_id": 123456.0,
+                "modality1": "behavior-videos",
+                "modality0": "behavior",
+                "modality0.source": " /stage/behavior ",
+                "email_notification_types": "fail, begin",
+            }
+        )
+        self.assertEqual("123456", job["subject_id"])
+        self.assertEqual(["fail", "begin"], job["email_notification_types"])
+        self.assertEqual(
+            [
+                {"modality": "behavior", "source": "/stage/behavior"},
+                {"modality": "behavior-videos"},
+            ],
+            job["modalities"],
+        )
+
+    def test_skips_empty_and_non_text_headers(self):
+        """None and blank headers are skipped, numeric ones are strings"""
+        job = row_to_job({None: "x", "": "y", "  ": "z", 1: "w"})
+        self.assertEqual({"1": "w", "modalities": []}, job)
+
+
+class TestTemplate(unittest.TestCase):
+    """Tests for template generation and chunked validation"""
+
+    def test_xlsx_round_trip(self):
+        """The generated template's example row parses back"""
+        rows = list(iter_job_rows(io.BytesIO(create_job_template()), "t"))
+        self.assertEqual(1, len(rows))
+        row_number, job = rows[0]
+        self.assertEqual(2, row_number)
+        self.assertEqual("123456", job["subject_id"])
+        self.assertEqual(2, len(job["modalities"]))
+
+    def test_chunks_with_row_errors(self):
+        """Invalid rows are reported by row, valid ones are bundled"""
+        data = template_csv(
+            [EXAMPLE_ROW, {**EXAMPLE_ROW, "platform": "nope"}, EXAMPLE_ROW]
+        )
+        chunks = list(iter_submit_job_requests(io.BytesIO(data), "t.csv", 2))
+        self.assertEqual([[2, 3], [4, 4]], [c["rows"] for c in chunks])
+        request = chunks[0]["submit_job_request"]
+        self.assertEqual(1, len(request.upload_jobs))
+        self.assertEqual([3], [e["row"] for e in chunks[0]["errors"]])
+        self.assertEqual([], chunks[1]["errors"])
+
+    def test_request_errors_are_reported(self):
+        """A SubmitJobRequest that fails is an error, not an exception"""
+        data = template_csv([EXAMPLE_ROW])
+        chunks = list(
+            iter_submit_job_requests(
+                io.BytesIO(data), "t.csv", user_email="not an email"
+            )
+        )
+        self.assertIsNone(chunks[0]["submit_job_request"])
+        [error] = chunks[0]["errors"]
+        self.assertIsNone(error["row"])
+        self.assertEqual(["user_email"], error["errors"][0]["loc"])
+
+
+class TestUploadEndpoint(unittest.TestCase):
+    """Tests for /api/jobs/upload"""
+
+    @classmethod
+    def setUpClass(cls):
+        """App with only the jobs router"""
+        app = FastAPI()
+        app.include_router(jobs.router, prefix="/api/jobs")
+        cls.client = TestClient(app)
+
+    def upload(self, filename: str, data: bytes, **form) -> list[dict]:
+        """ndjson lines of an upload"""
+        response = self.client.post(
+            "/api/jobs/upload", files={"file": (filename, data)}, data=form
+        )
+        self.assertEqual(200, response.status_code)
+        return [json.loads(line) for line in response.text.splitlines()]
+
+    def test_streams_chunks(self):
+        """One line per chunk"""
+        lines = self.upload("t.csv", template_csv(2 * [EXAMPLE_ROW]))
+        self.assertEqual(1, len(lines))
+        request = lines[0]["submit_job_request"]
+        self.assertEqual(2, len(request["upload_jobs"]))
+
+    def test_unreadable_file_ends_with_an_error_line(self):
+        """A file that isn't a workbook gives an error record"""
+        with self.assertLogs(jobs.logger, level="ERROR"):
+            lines = self.upload("t.xlsx", b"not a workbook")
+        self.assertIn("error", lines[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
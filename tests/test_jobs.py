@@ -0,0 +1,252 @@
+"""Tests for the bulk job endpoints"""
+
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from aind_data_transfer_ui_demo.fast_ui import executor
+from aind_data_transfer_ui_demo.fast_ui.routers import jobs
+from aind_data_transfer_ui_demo.jobs import preflight
+from aind_data_transfer_ui_demo.jobs.store import JobStatusStore
+from aind_data_transfer_ui_demo.jobs.submission import (
+    SubmissionQueue,
+    SubmissionWorker,
+)
+
+UPLOAD_JOB = {
+    "project_name": "Ephys Platform",
+    "platform": "ecephys",
+    "subject_id": "123456",
+    "acq_datetime": "2024-01-01T10:00:00",
+    "modalities": [{"modality": "ecephys", "source": "/data/ecephys"}],
+}
+
+
+def ndjson(text: str) -> list[dict]:
+    """Lines of an ndjson response"""
+    return [json.loads(line) for line in text.splitlines()]
+
+
+class JobsRouterTestCase(unittest.TestCase):
+    """App with only the jobs router, validating in threads, checking paths
+    below a temporary root and queueing submissions in a temporary
+    database"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Patch the executor, the path checker and the submission worker"""
+        folder = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(folder.cleanup)
+        cls.folder = Path(folder.name)
+        path = os.path.join(folder.name, "jobs.db")
+        cls.worker = SubmissionWorker(
+            SubmissionQueue(path), JobStatusStore(path)
+        )
+        pool = executor.BoundedExecutor("thread", max_workers=2)
+        cls.addClassCleanup(pool.shutdown)
+        checker = preflight.PathChecker(
+            max_workers=2, roots=[os.path.realpath(folder.name)]
+        )
+        cls.addClassCleanup(checker.shutdown)
+        patchers = [
+            patch.object(preflight, "path_checker", checker),
+            patch.object(executor, "validation_executor", pool),
+            patch.object(jobs, "validation_executor", pool),
+            patch.object(jobs, "submission_worker", cls.worker),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            cls.addClassCleanup(patcher.stop)
+        app = FastAPI()
+        app.include_router(jobs.router, prefix="/api/jobs")
+        cls.client = TestClient(app)
+
+
+class TestValidate(JobsRouterTestCase):
+    """Tests for /api/jobs/validate"""
+
+    def test_streams_results_and_summary(self):
+        """One line per job, then a summary"""
+        bad = {**UPLOAD_JOB, "platform": "nope", "subject_id": "654321"}
+        response = self.client.post(
+            "/api/jobs/validate", json={"upload_jobs": [UPLOAD_JOB, bad]}
+        )
+        lines = ndjson(response.text)
+        results = {line["index"]: line for line in lines[:-1]}
+        self.assertTrue(results[0]["valid"])
+        self.assertFalse(results[1]["valid"])
+        summary = lines[-1]["summary"]
+        self.assertEqual(2, summary["total"])
+        self.assertEqual(1, summary["valid"])
+
+    def test_flags_repeated_jobs(self):
+        """A job that repeats an earlier one in the batch is a duplicate"""
+        response = self.client.post(
+            "/api/jobs/validate", json={"upload_jobs": [UPLOAD_JOB] * 2}
+        )
+        lines = ndjson(response.text)
+        self.assertEqual(1, lines[-1]["summary"]["duplicates"])
+
+    def test_empty_batch_is_refused(self):
+        """At least one job is required"""
+        response = self.client.post(
+            "/api/jobs/validate", json={"upload_jobs": []}
+        )
+        self.assertEqual(422, response.status_code)
+
+
+class TestPreflight(JobsRouterTestCase):
+    """Tests for /api/jobs/preflight"""
+
+    def test_counts_files_and_reports_missing_paths(self):
+        """Existing sources are measured, missing ones are errors"""
+        source = self.folder / "ecephys"
+        source.mkdir(exist_ok=True)
+        (source / "data.bin").write_bytes(b"x" * 10)
+        missing = str(self.folder / "missing")
+        upload_jobs = [
+            {"modalities": [{"modality": "ecephys", "source": str(source)}]},
+            {"modalities": [{"modality": "ecephys", "source": missing}]},
+        ]
+        response = self.client.post(
+            "/api/jobs/preflight", json={"upload_jobs": upload_jobs}
+        )
+        found, not_found = response.json()["jobs"]
+        self.assertTrue(found["ok"])
+        self.assertEqual(10, found["paths"][0]["bytes"])
+        self.assertFalse(not_found["ok"])
+        self.assertIsNotNone(not_found["paths"][0]["error"])
+
+    def test_symlinks_are_not_followed(self):
+        """Files linked from outside the roots are not counted"""
+        outside = tempfile.TemporaryDirectory()
+        self.addCleanup(outside.cleanup)
+        secret = Path(outside.name) / "secret.bin"
+        secret.write_bytes(b"x" * 100)
+        source = self.folder / "linked"
+        source.mkdir(exist_ok=True)
+        (source / "data.bin").write_bytes(b"x" * 10)
+        (source / "secret.bin").symlink_to(secret)
+        (source / "outside").symlink_to(outside.name)
+        upload_jobs = [
+            {"modalities": [{"modality": "ecephys", "source": str(source)}]}
+        ]
+        response = self.client.post(
+            "/api/jobs/preflight", json={"upload_jobs": upload_jobs}
+        )
+        [path] = response.json()["jobs"][0]["paths"]
+        self.assertEqual(1, path["files"])
+        self.assertEqual(10, path["bytes"])
+
+    def test_paths_outside_the_roots_are_not_looked_at(self):
+        """Paths outside the roots get one error, whether or not they
+        exist"""
+        upload_jobs = [
+            {"modalities": [{"modality": "ecephys", "source": source}]}
+            for source in (
+                os.path.dirname(self.folder),
+                str(self.folder / ".." / "missing"),
+            )
+        ]
+        response = self.client.post(
+            "/api/jobs/preflight", json={"upload_jobs": upload_jobs}
+        )
+        for job in response.json()["jobs"]:
+            [path] = job["paths"]
+            self.assertEqual(preflight.OUTSIDE_ROOTS, path["error"])
+            self.assertFalse(path["exists"])
+
+
+class TestSubmit(JobsRouterTestCase):
+    """Tests for /api/jobs/submit and /api/jobs/submissions"""
+
+    def submit(self, job: dict, **form) -> dict:
+        """Response of submitting one upload job"""
+        return self.client.post(
+            "/api/jobs/submit",
+            data={"submit_job_request": json.dumps(job), **form},
+        )
+
+    def test_queues_once_and_refuses_duplicates(self):
+        """A submission is queued once per key, and resubmitting its jobs
+        needs allow_duplicates"""
+        job = {**UPLOAD_JOB, "subject_id": "100001"}
+        response = self.submit(job, idempotency_key="a")
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("FireEvent", response.json()[0]["type"])
+        self.assertEqual(
+            200, self.submit(job, idempotency_key="a").status_code
+        )
+        refused = self.submit(job, idempotency_key="b")
+        self.assertEqual(422, refused.status_code)
+        [error] = refused.json()["detail"]["form"]
+        self.assertEqual("duplicate_jobs", error["type"])
+        allowed = self.submit(job, idempotency_key="b", allow_duplicates=True)
+        self.assertEqual(200, allowed.status_code)
+        counts = self.client.get("/api/jobs/submissions").json()
+        self.assertEqual(2, counts["queued"])
+
+    def test_invalid_request(self):
+        """Validation errors are located under submit_job_request"""
+        response = self.submit({**UPLOAD_JOB, "platform": "nope"})
+        self.assertEqual(422, response.status_code)
+        for error in response.json()["detail"]["form"]:
+            self.assertEqual("submit_job_request", error["loc"][0])
+
+
+class TestPack(JobsRouterTestCase):
+    """Tests for /api/jobs/pack"""
+
+    def test_packs_and_validates(self):
+        """Jobs are split by max_jobs, errors located in the request body"""
+        upload_jobs = [
+            {**UPLOAD_JOB, "subject_id": str(100000 + i)} for i in range(3)
+        ]
+        upload_jobs[2]["acq_datetime"] = "nope"
+        response = self.client.post(
+            "/api/jobs/pack",
+            json={
+                "upload_jobs": upload_jobs,
+                "sizes": [3, 2, 1],
+                "max_jobs": 2,
+            },
+        )
+        self.assertEqual(200, response.status_code)
+        body = response.json()
+        self.assertEqual(2, body["summary"]["requests"])
+        self.assertFalse(body["summary"]["valid"])
+        [invalid] = [r for r in body["requests"] if not r["valid"]]
+        self.assertIn(2, invalid["indices"])
+        locs = [e["loc"][:2] for e in invalid["errors"]]
+        self.assertIn(["upload_jobs", 2], locs)
+
+    def test_refuses_bad_sizes(self):
+        """Sizes must be non-negative and one per job"""
+        for sizes in ([-1], [1, 2]):
+            with self.subTest(sizes=sizes):
+                response = self.client.post(
+                    "/api/jobs/pack",
+                    json={"upload_jobs": [UPLOAD_JOB], "sizes": sizes},
+                )
+                self.assertEqual(422, response.status_code)
+
+
+class TestTemplate(JobsRouterTestCase):
+    """Tests for /api/jobs/template"""
+
+    def test_downloads_xlsx(self):
+        """The template is an xlsx attachment"""
+        response = self.client.get("/api/jobs/template")
+        self.assertEqual(200, response.status_code)
+        self.assertIn("attachment", response.headers["content-disposition"])
+        self.assertTrue(response.content.startswith(b"PK"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+"""Tests for request metrics, profiling and json logs"""
+
+import json
+import logging
+import sys
+import unittest
+
+from fastapi import APIRouter, FastAPI, Response
+from fastapi.testclient import TestClient
+
+from aind_data_transfer_ui_demo.fast_ui.logs import JSONFormatter
+from aind_data_transfer_ui_demo.fast_ui.metrics import (
+    HISTOGRAMS,
+    PROMETHEUS_CONTENT_TYPE,
+    UNMATCHED,
+    Histogram,
+    MetricsMiddleware,
+    render_metrics,
+    span,
+)
+
+REQUESTS = "http_request_duration_seconds"
+PHASES = "request_phase_duration_seconds"
+
+
+def scrape(text: str) -> dict[str, float]:
+    """Samples of a /metrics response by series"""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            series, _, value = line.rpartition(" ")
+            samples[series] = float(value)
+    return samples
+
+
+class TestHistogram(unittest.TestCase):
+    """Tests for Histogram.render"""
+
+    def test_buckets_are_cumulative(self):
+        """Each bucket counts the values up to its bound"""
+        histogram = Histogram("h", "Help", ["route"], buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 5.0):
+            histogram.observe(value, "/a")
+        samples = scrape("\n".join(histogram.render()))
+        self.assertEqual(2, samples['h_bucket{route="/a",le="0.1"}'])
+        self.assertEqual(3, samples['h_bucket{route="/a",le="1.0"}'])
+        self.assertEqual(4, samples['h_bucket{route="/a",le="+Inf"}'])
+        self.assertEqual(4, samples['h_count{route="/a"}'])
+        self.assertAlmostEqual(5.65, samples['h_sum{route="/a"}'])
+
+    def test_help_and_escaping(self):
+        """Label values are escaped for the text format"""
+        histogram = Histogram("h", "Help text", ["route"], buckets=(1.0,))
+        histogram.observe(0.5, 'a"b\\c\nd')
+        lines = histogram.render()
+        self.assertEqual(
+            ["# HELP h Help text", "# TYPE h histogram"], lines[:2]
+        )
+        self.assertIn('h_count{route="a\\"b\\\\c\\nd"} 1', lines)
+        histogram.clear()
+        self.assertEqual(2, len(histogram.render()))
+
+
+class TestMetricsMiddleware(unittest.TestCase):
+    """Tests for MetricsMiddleware and /metrics"""
+
+    @classmethod
+    def setUpClass(cls):
+        """App with a prefixed router whose route has a span, profiling
+        enabled"""
+        router = APIRouter()
+
+        @router.get("/{item_id}")
+        def item(item_id: int) -> dict:
+            """Item with a timed lookup"""
+            with span("lookup"):
+                return {"id": item_id}
+
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware, profiling=True)
+        app.include_router(router, prefix="/api/items")
+
+        @app.get("/metrics")
+        def metrics() -> Response:
+            """Prometheus metrics"""
+            return Response(
+                render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE
+            )
+
+        cls.client = TestClient(app)
+
+    def setUp(self):
+        """Start from empty histograms"""
+        for histogram in HISTOGRAMS:
+            histogram.clear()
+
+    def test_series_by_route_template(self):
+        """Requests are counted by route template, prefix included, and
+        their spans by route and phase"""
+        for item_id in (1, 2):
+            self.client.get(f"/api/items/{item_id}")
+        self.client.get("/api/nope")
+        response = self.client.get("/metrics")
+        self.assertEqual(
+            PROMETHEUS_CONTENT_TYPE, response.headers["content-type"]
+        )
+        samples = scrape(response.text)
+        route = 'method="GET",route="/api/items/{item_id}",status="200"'
+        self.assertEqual(2, samples[f"{REQUESTS}_count{{{route}}}"])
+        unmatched = f'method="GET",route="{UNMATCHED}",status="404"'
+        self.assertEqual(1, samples[f"{REQUESTS}_count{{{unmatched}}}"])
+        phase = 'route="/api/items/{item_id}",phase="lookup"'
+        self.assertEqual(2, samples[f"{PHASES}_count{{{phase}}}"])
+
+    def test_spans_outside_requests(self):
+        """Spans outside a request are recorded right away as unmatched"""
+        with span("startup"):
+            pass
+        samples = scrape(render_metrics())
+        phase = f'route="{UNMATCHED}",phase="startup"'
+        self.assertEqual(1, samples[f"{PHASES}_count{{{phase}}}"])
+
+    def test_profile(self):
+        """X-Profile answers with the sampled stacks, not the response,
+        and the request is not timed"""
+        response = self.client.get("/api/items/1", headers={"X-Profile": "1"})
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("200", response.headers["x-profiled-status"])
+        self.assertGreaterEqual(int(response.headers["x-profile-samples"]), 0)
+        self.assertNotIn('"id"', response.text)
+        samples = scrape(render_metrics())
+        self.assertFalse([s for s in samples if s.startswith(REQUESTS)])
+
+
+class TestJSONFormatter(unittest.TestCase):
+    """Tests for JSONFormatter"""
+
+    def test_extra_fields(self):
+        """Records are json objects with their extra fields"""
+        logger = logging.getLogger("aind_data_transfer_ui_demo.tests")
+        record = logger.makeRecord(
+            logger.name,
+            logging.DEBUG,
+            __file__,
+            1,
+            "Form page %s",
+            ("login",),
+            None,
+            extra={"form_type": "login"},
+        )
+        entry = json.loads(JSONFormatter().format(record))
+        self.assertEqual("Form page login", entry["message"])
+        self.assertEqual("DEBUG", entry["level"])
+        self.assertEqual(logger.name, entry["logger"])
+        self.assertEqual("login", entry["form_type"])
+        self.assertNotIn("args", entry)
+
+    def test_exceptions(self):
+        """Exceptions are formatted into exc_info"""
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.makeLogRecord(
+                {"msg": "failed", "exc_info": sys.exc_info()}
+            )
+        entry = json.loads(JSONFormatter().format(record))
+        self.assertIn("ValueError: boom", entry["exc_info"])
+
+
+if __name__ == "__main__":
+    unittest.main()
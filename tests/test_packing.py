@@ -0,0 +1,51 @@
+"""Tests for packing jobs into SubmitJobRequests"""
+
+import unittest
+
+from aind_data_transfer_ui_demo.jobs.packing import (
+    imbalance,
+    num_packs,
+    pack_jobs,
+)
+
+
+class TestPackJobs(unittest.TestCase):
+    """Tests for pack_jobs and num_packs"""
+
+    def test_respects_max_jobs_and_balances(self):
+        """No request holds more than max_jobs and bytes are spread"""
+        sizes = [10, 9, 8, 7, 6, 5, 4, 3, 2, 1]
+        packs = pack_jobs(sizes, max_jobs=4)
+        self.assertEqual(3, len(packs))
+        self.assertTrue(all(len(p.indices) <= 4 for p in packs))
+        self.assertEqual(
+            list(range(10)), sorted(sum((p.indices for p in packs), []))
+        )
+        self.assertLess(imbalance(packs), 1.1)
+
+    def test_oversize_jobs_get_their_own_request(self):
+        """A job larger than max_bytes is never shared, even when the
+        byte total alone would allow fewer requests"""
+        sizes = [15, 1, 1, 1, 1, 1]
+        packs = pack_jobs(sizes, max_jobs=10, max_bytes=10)
+        self.assertEqual(num_packs(sizes, 10, 10), len(packs))
+        self.assertEqual([[0], [1, 2, 3, 4, 5]], [p.indices for p in packs])
+        self.assertEqual([15, 5], [p.bytes for p in packs])
+
+    def test_byte_budget_sets_the_count(self):
+        """max_bytes is a lower bound on the number of requests"""
+        self.assertEqual(3, num_packs([5] * 6, max_jobs=10, max_bytes=10))
+        self.assertEqual(0, num_packs([]))
+        self.assertEqual([], pack_jobs([]))
+        self.assertIsNone(imbalance([]))
+
+    def test_invalid_arguments(self):
+        """max_jobs below 1 and negative sizes are refused"""
+        with self.assertRaises(ValueError):
+            pack_jobs([1], max_jobs=0)
+        with self.assertRaises(ValueError):
+            pack_jobs([1, -1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+"""Tests for the rendering helpers"""
+
+import json
+import unittest
+
+from fastui import components as c
+
+from aind_data_transfer_ui_demo.fast_ui.rendering import (
+    ComponentCache,
+    components_json,
+    etag_matches,
+    render_components,
+)
+from aind_data_transfer_ui_demo.fast_ui.shared import page, page_json
+
+
+class TestComponentCache(unittest.TestCase):
+    """Tests for ComponentCache"""
+
+    def test_builds_once_until_cleared(self):
+        """build() runs on the first get and after clear() only"""
+        builds = []
+
+        def build():
+            """One paragraph, counting calls"""
+            builds.append(1)
+            return [c.Paragraph(text="hello")]
+
+        cache = ComponentCache()
+        first = cache.get("page", build)
+        self.assertIs(first, cache.get("page", build))
+        self.assertEqual(1, len(builds))
+        self.assertEqual(render_components(build()), first)
+        cache.clear()
+        cache.get("page", build)
+        self.assertEqual(3, len(builds))
+
+    def test_etag_matches(self):
+        """Weak and wildcard If-None-Match headers match"""
+        self.assertTrue(etag_matches('W/"a", "b"', '"a"'))
+        self.assertTrue(etag_matches("*", '"a"'))
+        self.assertFalse(etag_matches(None, '"a"'))
+        self.assertFalse(etag_matches('"b"', '"a"'))
+
+
+class TestPageJson(unittest.TestCase):
+    """Tests for page_json"""
+
+    def test_same_as_page(self):
+        """page_json splices the same json as page() serializes to"""
+        components = [c.Paragraph(text="hello"), c.Text(text='"quoted"')]
+        for title in (None, "Title"):
+            with self.subTest(title=title):
+                self.assertEqual(
+                    json.loads(
+                        components_json(page(*components, title=title))
+                    ),
+                    json.loads(page_json(*components, title=title)),
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""Tests for the published json schemas"""
+
+import gzip
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from aind_data_transfer_ui_demo.fast_ui.routers import schemas
+from aind_data_transfer_ui_demo.models.generate_schemas import build_schemas
+from aind_data_transfer_ui_demo.models.schema_registry import SCHEMA_MODELS
+
+NAME = "ModalityConfigsFastUI"
+
+
+class TestSchemaEndpoints(unittest.TestCase):
+    """Tests for /api/schemas"""
+
+    @classmethod
+    def setUpClass(cls):
+        """App with only the schemas router and no prebuilt schemas"""
+        patcher = patch.object(schemas, "_assets", {})
+        patcher.start()
+        cls.addClassCleanup(patcher.stop)
+        app = FastAPI()
+        app.include_router(schemas.router, prefix="/api/schemas")
+        cls.client = TestClient(app)
+
+    def test_index(self):
+        """Every published model is listed"""
+        index = self.client.get("/api/schemas").json()
+        self.assertEqual(set(SCHEMA_MODELS), set(index))
+
+    def test_current_schema(self):
+        """The current schema points at its immutable url"""
+        response = self.client.get(
+            f"/api/schemas/{NAME}", headers={"Accept-Encoding": "identity"}
+        )
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(NAME, response.json()["title"])
+        self.assertEqual("no-cache", response.headers["cache-control"])
+        location = response.headers["content-location"]
+        versioned = self.client.get(location)
+        self.assertEqual(response.content, versioned.content)
+        self.assertIn("immutable", versioned.headers["cache-control"])
+
+    def test_compressed_and_revalidated(self):
+        """Clients get the encoding they accept and a 304 when current"""
+        response = self.client.get(
+            f"/api/schemas/{NAME}",
+            headers={"Accept-Encoding": "gzip"},
+        )
+        self.assertEqual("gzip", response.headers["content-encoding"])
+        body = schemas.schema_asset(NAME).body
+        self.assertEqual(
+            body, gzip.decompress(schemas.schema_asset(NAME).encoded["gzip"])
+        )
+        self.assertEqual(NAME, json.loads(body)["title"])
+        again = self.client.get(
+            f"/api/schemas/{NAME}",
+            headers={
+                "Accept-Encoding": "gzip",
+                "If-None-Match": response.headers["etag"],
+            },
+        )
+        self.assertEqual(304, again.status_code)
+
+    def test_unknown(self):
+        """Unknown models and versions are a 404"""
+        self.assertEqual(404, self.client.get("/api/schemas/Nope").status_code)
+        response = self.client.get(f"/api/schemas/{NAME}/0123")
+        self.assertEqual(404, response.status_code)
+
+
+class TestBuildSchemas(unittest.TestCase):
+    """Tests for generate_schemas.build_schemas"""
+
+    def test_incremental(self):
+        """Unchanged schemas are not rebuilt, even with their compressed
+        copies missing as on a fresh checkout, which are written again"""
+        with tempfile.TemporaryDirectory() as name:
+            folder = Path(name)
+            built = build_schemas([NAME], folder, jobs=1)
+            self.assertEqual([NAME], list(built))
+            gz = folder / built[NAME]["encoded"]["gzip"]
+            gz.unlink()
+            self.assertEqual({}, build_schemas([NAME], folder, jobs=1))
+            body = (folder / f"{NAME}.json").read_bytes()
+            self.assertEqual(body, gzip.decompress(gz.read_bytes()))
+            (folder / f"{NAME}.json").write_bytes(b"{}")
+            self.assertEqual(
+                [NAME], list(build_schemas([NAME], folder, jobs=1))
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
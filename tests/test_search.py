@@ -0,0 +1,104 @@
+"""Tests for the search upstream client"""
+
+import asyncio
+import unittest
+
+import httpx
+
+from aind_data_transfer_ui_demo.fast_ui.search import SearchClient
+
+
+class TestSearchClient(unittest.IsolatedAsyncioTestCase):
+    """Tests for SearchClient"""
+
+    def setUp(self):
+        """Stub upstream that counts requests by path"""
+        self.calls = []
+        self.status = 200
+        self.release = None
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            """Echoes the path back, after release is set if there is one"""
+            self.calls.append(request.url.path)
+            if self.release is not None:
+                await self.release.wait()
+            return httpx.Response(self.status, json={"path": request.url.path})
+
+        self.client = SearchClient(
+            "http://upstream",
+            ttl=60,
+            max_entries=2,
+            transport=httpx.MockTransport(handler),
+        )
+
+    async def asyncTearDown(self):
+        """Closes the pooled client"""
+        await self.client.aclose()
+
+    async def test_caches_responses(self):
+        """A second call for the same path is answered from the cache"""
+        first = await self.client.get_json("name/fra")
+        second = await self.client.get_json("name/fra")
+        self.assertEqual({"path": "/name/fra"}, first)
+        self.assertEqual(first, second)
+        self.assertEqual(["/name/fra"], self.calls)
+
+    async def test_expired_entries_are_fetched_again(self):
+        """Entries older than ttl are dropped"""
+        self.client.ttl = 0
+        await self.client.get_json("name/fra")
+        await self.client.get_json("name/fra")
+        self.assertEqual(["/name/fra", "/name/fra"], self.calls)
+
+    async def test_evicts_least_recently_used(self):
+        """Only max_entries responses are kept, the least recent go first"""
+        await self.client.get_json("a")
+        await self.client.get_json("b")
+        await self.client.get_json("a")
+        await self.client.get_json("c")
+        await self.client.get_json("a")
+        await self.client.get_json("b")
+        self.assertEqual(["/a", "/b", "/c", "/b"], self.calls)
+
+    async def test_single_flight(self):
+        """Concurrent identical calls share one upstream request"""
+        self.release = asyncio.Event()
+        tasks = [
+            asyncio.ensure_future(self.client.get_json("name/fra"))
+            for _ in range(5)
+        ]
+        await asyncio.sleep(0.01)
+        self.release.set()
+        results = await asyncio.gather(*tasks)
+        self.assertEqual(5 * [{"path": "/name/fra"}], results)
+        self.assertEqual(["/name/fra"], self.calls)
+
+    async def test_not_found_is_none(self):
+        """A 404 is returned as None and cached"""
+        self.status = 404
+        self.assertIsNone(await self.client.get_json("name/nowhere"))
+        self.assertIsNone(await self.client.get_json("name/nowhere"))
+        self.assertEqual(1, len(self.calls))
+
+    async def test_errors_propagate_to_every_waiter(self):
+        """Upstream errors are raised to all callers and not cached"""
+        self.status = 500
+        self.release = asyncio.Event()
+        tasks = [
+            asyncio.ensure_future(self.client.get_json("all"))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0.01)
+        self.release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        for result in results:
+            self.assertIsInstance(result, httpx.HTTPStatusError)
+        self.assertEqual(1, len(self.calls))
+        self.release = None
+        self.status = 200
+        self.assertEqual({"path": "/all"}, await self.client.get_json("all"))
+        self.assertEqual(2, len(self.calls))
+
+
+if __name__ == "__main__":
+    unittest.main()
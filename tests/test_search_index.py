@@ -0,0 +1,89 @@
+"""Tests for the search-select option index"""
+
+import unittest
+
+from aind_data_transfer_ui_demo.fast_ui.search_index import (
+    EMPTY_INDEX,
+    Option,
+    OptionIndex,
+    RefreshingOptionIndex,
+)
+
+OPTIONS = [
+    Option(value="FRA", label="France", group="Europe", weight=68),
+    Option(value="ZAF", label="South Africa", group="Africa", weight=60),
+    Option(value="SSD", label="South Sudan", group="Africa", weight=11),
+]
+
+
+class TestOptionIndex(unittest.TestCase):
+    """Tests for OptionIndex"""
+
+    def test_search(self):
+        """Word prefixes and substrings match, ranked by weight"""
+        index = OptionIndex(OPTIONS)
+        labels = [o.label for o in index.search("sou")]
+        self.assertEqual(["South Africa", "South Sudan"], labels)
+        self.assertEqual(["France"], [o.label for o in index.search("anc")])
+        self.assertEqual(3, len(index.search("")))
+        grouped = index.search_grouped("fr")
+        self.assertEqual("Europe", grouped[0]["label"])
+
+
+class TestRefreshingOptionIndex(unittest.IsolatedAsyncioTestCase):
+    """Tests for RefreshingOptionIndex"""
+
+    def setUp(self):
+        """Loader that fails until told otherwise"""
+        self.loads = 0
+        self.fail = True
+
+        async def loader() -> list[Option]:
+            """OPTIONS, or an error while fail is set"""
+            self.loads += 1
+            if self.fail:
+                raise ConnectionError("upstream down")
+            return OPTIONS
+
+        self.index = RefreshingOptionIndex(loader, retry_delay=60)
+
+    async def test_failed_load_backs_off(self):
+        """Searches during the backoff get an empty index without loading"""
+        with self.assertLogs(level="ERROR"):
+            self.assertIs(EMPTY_INDEX, await self.index.get())
+        self.assertIs(EMPTY_INDEX, await self.index.get())
+        self.assertIs(EMPTY_INDEX, await self.index.get())
+        self.assertEqual(1, self.loads)
+
+    async def test_loads_again_after_backoff(self):
+        """The next search after the backoff retries the load"""
+        self.index.retry_delay = 0
+        with self.assertLogs(level="ERROR"):
+            await self.index.get()
+        self.fail = False
+        index = await self.index.get()
+        self.assertEqual(3, len(index.options))
+        self.assertEqual(2, self.loads)
+
+    async def test_backoff_doubles(self):
+        """Consecutive failures double the delay up to refresh_interval"""
+        self.index.refresh_interval = 200
+        delays = []
+        for _ in range(4):
+            with self.assertRaises(ConnectionError):
+                await self.index.refresh()
+            delays.append(self.index._backoff())
+        self.assertEqual([60, 120, 200, 200], delays)
+
+    async def test_keeps_last_good_index(self):
+        """A failed refresh keeps serving the previous index"""
+        self.fail = False
+        good = await self.index.refresh()
+        self.fail = True
+        with self.assertRaises(ConnectionError):
+            await self.index.refresh()
+        self.assertIs(good, await self.index.get())
+
+
+if __name__ == "__main__":
+    unittest.main()
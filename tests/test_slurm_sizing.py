@@ -0,0 +1,74 @@
+"""Tests for slurm resource recommendations"""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from aind_data_transfer_ui_demo.jobs.preflight import PathChecker
+from aind_data_transfer_ui_demo.models.slurm_sizing import (
+    recommend,
+    with_slurm_settings,
+)
+
+
+class TestRecommend(unittest.TestCase):
+    """Tests for recommend"""
+
+    def test_grows_with_data(self):
+        """More data gets more cpus, memory and time, within limits"""
+        small = recommend("ecephys", 10**9, 10)
+        large = recommend("ecephys", 10**13, 10**5)
+        self.assertLess(small.cpus, large.cpus)
+        self.assertLess(small.memory_mb, large.memory_mb)
+        self.assertLess(small.time_minutes, large.time_minutes)
+        self.assertEqual(32, recommend("ecephys", 10**16, 1).cpus)
+
+    def test_copy_only(self):
+        """Jobs that don't compress use the copy model"""
+        copy = recommend("ecephys", 10**12, 100, compress=False)
+        self.assertLess(copy.cpus, recommend("ecephys", 10**12, 100).cpus)
+
+
+class TestWithSlurmSettings(unittest.TestCase):
+    """Tests for with_slurm_settings and the bounded walk it uses"""
+
+    def setUp(self):
+        """Source with 10 folders of one 1000 byte file each"""
+        self.folder = tempfile.TemporaryDirectory()
+        self.source = Path(self.folder.name)
+        for i in range(10):
+            (self.source / f"probe_{i}").mkdir()
+            (self.source / f"probe_{i}" / "data.bin").write_bytes(b"x" * 1000)
+        self.checker = PathChecker(max_workers=2)
+
+    def tearDown(self):
+        """Stop the checker and remove the source"""
+        self.checker.shutdown()
+        self.folder.cleanup()
+
+    def test_sets_slurm_settings(self):
+        """Readable sources are sized, others are left alone"""
+        modality = {"modality": "ecephys", "source": str(self.source)}
+        sized = with_slurm_settings(modality, self.checker)
+        self.assertGreaterEqual(sized["slurm_settings"].cpus_per_task, 2)
+        missing = {**modality, "source": str(self.source / "missing")}
+        self.assertIs(missing, with_slurm_settings(missing, self.checker))
+        kept = {**modality, "slurm_settings": {"cpus_per_task": 1}}
+        self.assertIs(kept, with_slurm_settings(kept, self.checker))
+
+    def test_bounded_walk_is_estimated_and_not_cached(self):
+        """A walk cut short extrapolates the totals and is walked again
+        next time, a complete one is cached"""
+        report = self.checker.check_sync(str(self.source), max_listings=5)
+        self.assertTrue(report.estimated)
+        # the source and 4 of its folders were listed, 6 were not
+        self.assertEqual(round(4000 * 11 / 5), report.bytes)
+        again = self.checker.check_sync(str(self.source))
+        self.assertFalse(again.cached)
+        self.assertFalse(again.estimated)
+        self.assertEqual(10000, again.bytes)
+        self.assertTrue(self.checker.check_sync(str(self.source)).cached)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+"""Tests for precompressed static assets"""
+
+import gzip
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from aind_data_transfer_ui_demo.static_assets import (
+    ENCODING_SUFFIXES,
+    StaticAsset,
+    read_asset,
+)
+
+
+class TestStaticAsset(unittest.TestCase):
+    """Tests for StaticAsset and read_asset"""
+
+    def test_keeps_smaller_variants(self):
+        """Compressible bodies get a gzip copy, tiny ones don't"""
+        body = b'{"a": 1}' * 100
+        asset = StaticAsset.build(body, "application/json")
+        self.assertEqual(body, gzip.decompress(asset.encoded["gzip"]))
+        self.assertEqual({}, StaticAsset.build(b"{}", "x").encoded)
+        self.assertEqual(f'"{asset.digest}-gzip"', asset.etag("gzip"))
+        self.assertEqual(f'"{asset.digest}"', asset.etag(None))
+
+    def test_reads_precompressed_copies(self):
+        """read_asset uses the copies next to a file"""
+        with tempfile.TemporaryDirectory() as folder:
+            path = Path(folder) / "index.js"
+            path.write_bytes(b"x" * 100)
+            copy = path.with_name(path.name + ENCODING_SUFFIXES["gzip"])
+            copy.write_bytes(b"stored")
+            asset = read_asset(path, "text/javascript")
+        self.assertEqual({"gzip": b"stored"}, asset.encoded)
+
+    def test_schema_generator_does_not_import_the_web_layer(self):
+        """The models package builds schema files without fast_ui"""
+        code = (
+            "import sys, aind_data_transfer_ui_demo.models.generate_schemas;"
+            "print(any('fast_ui' in m for m in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual("False", result.stdout.strip())
+
+
+if __name__ == "__main__":
+    unittest.main()
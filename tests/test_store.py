@@ -0,0 +1,90 @@
+"""Tests for the SQLite job status store"""
+
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from aind_data_transfer_ui_demo.jobs.store import (
+    JobFilter,
+    JobState,
+    JobStatus,
+    JobStatusStore,
+)
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def job(i: int, **fields) -> JobStatus:
+    """Job submitted i minutes after START"""
+    values = dict(
+        job_id=f"job-{i}",
+        subject_id=str(100000 + i % 3),
+        project_name="Project",
+        modalities=["ecephys", "behavior"],
+        status=JobState.SUBMITTED,
+        submit_time=START + timedelta(minutes=i),
+    )
+    return JobStatus(**{**values, **fields})
+
+
+class TestJobStatusStore(unittest.TestCase):
+    """Tests for JobStatusStore"""
+
+    def setUp(self):
+        """Store in a folder that doesn't exist yet"""
+        self.folder = tempfile.TemporaryDirectory()
+        path = os.path.join(self.folder.name, "data", "job_status.db")
+        self.store = JobStatusStore(path)
+        self.store.upsert(job(i) for i in range(10))
+
+    def tearDown(self):
+        """Close the connection and remove the database"""
+        self.store.close()
+        self.folder.cleanup()
+
+    def test_creates_parent_folder(self):
+        """The database file is created with its folder"""
+        self.assertTrue(os.path.isfile(self.store.path))
+
+    def test_query_pages_newest_first(self):
+        """Pages are newest first and don't overlap"""
+        first, total = self.store.query(JobFilter(), page=1, page_size=4)
+        last, _ = self.store.query(JobFilter(), page=3, page_size=4)
+        self.assertEqual(10, total)
+        self.assertEqual(
+            ["job-9", "job-8", "job-7", "job-6"], [j.job_id for j in first]
+        )
+        self.assertEqual(["job-1", "job-0"], [j.job_id for j in last])
+
+    def test_query_filters(self):
+        """Filters combine, and the total counts every matching job"""
+        jobs, total = self.store.query(JobFilter(subject_id="100001"))
+        self.assertEqual(3, total)
+        self.assertEqual({"100001"}, {j.subject_id for j in jobs})
+        self.store.set_status(["job-4"], JobState.FAILED, "boom")
+        jobs, total = self.store.query(
+            JobFilter(subject_id="100001", status="failed")
+        )
+        self.assertEqual(["job-4"], [j.job_id for j in jobs])
+
+    def test_set_status_records_times(self):
+        """Running sets start_time, completed sets end_time"""
+        self.store.set_status(["job-1"], JobState.RUNNING)
+        self.store.set_status(["job-1"], JobState.COMPLETED)
+        stored = self.store.get("job-1")
+        self.assertEqual(JobState.COMPLETED, stored.status)
+        self.assertIsNotNone(stored.start_time)
+        self.assertIsNotNone(stored.end_time)
+        self.assertEqual(["ecephys", "behavior"], stored.modalities)
+        self.assertIsNone(self.store.get("nope"))
+
+    def test_upsert_replaces(self):
+        """Upserting a job_id again replaces its row"""
+        self.store.upsert([job(1, project_name="Other")])
+        self.assertEqual("Other", self.store.get("job-1").project_name)
+        self.assertEqual(10, self.store.query(JobFilter())[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
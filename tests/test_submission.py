@@ -0,0 +1,229 @@
+"""Tests for the submission queue and worker, against a local stand-in of
+aind-data-transfer-service"""
+
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from aind_data_transfer_ui_demo.jobs.duplicates import DuplicateJobsError
+from aind_data_transfer_ui_demo.jobs.store import JobState, JobStatusStore
+from aind_data_transfer_ui_demo.jobs.submission import (
+    SUBMIT_JOBS_PATH,
+    SubmissionQueue,
+    SubmissionWorker,
+    job_id,
+)
+
+
+def submit_job_request(subject_id: int, num_jobs: int = 1) -> dict:
+    """Json-mode SubmitJobRequest dump with num_jobs upload jobs"""
+    return {
+        "job_type": "transform_and_upload",
+        "upload_jobs": [
+            {
+                "project_name": "Project",
+                "platform": {"abbreviation": "ecephys"},
+                "modalities": [
+                    {
+                        "modality": {"abbreviation": "ecephys"},
+                        "source": f"/data/ecephys_{subject_id}_{j}",
+                    }
+                ],
+                "subject_id": str(subject_id),
+                "acq_datetime": "2024-01-01T10:00:00",
+                "s3_prefix": f"ecephys_{subject_id}_{j}",
+            }
+            for j in range(num_jobs)
+        ],
+    }
+
+
+class TransferService:
+    """Stand-in for aind-data-transfer-service that answers with scripted
+    status codes and records what it receives"""
+
+    def __init__(self):
+        """Answers 200 until told otherwise"""
+        self.statuses: list[int] = []
+        self.received: list[tuple[str, int]] = []
+        self.app = FastAPI()
+        self.app.post(SUBMIT_JOBS_PATH)(self.submit_jobs)
+
+    async def submit_jobs(self, request: Request) -> JSONResponse:
+        """Record the idempotency key and number of jobs of a POST"""
+        body = await request.json()
+        self.received.append(
+            (request.headers["Idempotency-Key"], len(body["upload_jobs"]))
+        )
+        status = self.statuses.pop(0) if self.statuses else 200
+        return JSONResponse({"message": "ok"}, status_code=status)
+
+
+class TestSubmissionWorker(unittest.IsolatedAsyncioTestCase):
+    """Tests for SubmissionWorker"""
+
+    async def asyncSetUp(self):
+        """Worker with a fresh job database and stand-in service"""
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, "jobs.db")
+        self.service = TransferService()
+        self.status_store = JobStatusStore(self.path)
+        self.worker = self.make_worker()
+
+    async def asyncTearDown(self):
+        """Close clients and connections, remove the database"""
+        await self.worker.stop()
+        self.worker.queue.close()
+        self.status_store.close()
+        self.folder.cleanup()
+
+    def make_worker(self, **kwargs) -> SubmissionWorker:
+        """Worker on the shared database and stand-in service"""
+        return SubmissionWorker(
+            SubmissionQueue(self.path),
+            self.status_store,
+            service_url="http://service",
+            transport=httpx.ASGITransport(app=self.service.app),
+            **kwargs,
+        )
+
+    def status(self, key: str, index: int = 0) -> JobState:
+        """Job Status state of an upload job"""
+        return self.status_store.get(job_id(key, index)).status
+
+    async def test_batches_submissions(self):
+        """Queued submissions with the same fields share POSTs of up to
+        max_jobs upload jobs"""
+        self.worker.max_jobs = 4
+        keys = [
+            await self.worker.submit(submit_job_request(i, 2))
+            for i in range(3)
+        ]
+        self.assertEqual(JobState.PENDING, self.status(keys[0]))
+        self.assertEqual(2, await self.worker.run_once())
+        self.assertEqual([4, 2], [n for _, n in self.service.received])
+        self.assertEqual({"sent": 3}, self.worker.queue.counts())
+        for key in keys:
+            self.assertEqual(JobState.SUBMITTED, self.status(key, 1))
+        self.assertEqual(0, await self.worker.run_once())
+
+    async def test_retries_with_backoff(self):
+        """Retryable failures are retried after a delay with the same
+        idempotency key, others fail the batch"""
+        self.worker.base_delay = 0.05
+        self.service.statuses = [503, 429]
+        with self.assertLogs("aind_data_transfer_ui_demo.jobs.submission"):
+            key = await self.worker.submit(submit_job_request(1))
+            await self.worker.run_once()
+            self.assertEqual(0, await self.worker.run_once())
+            due = self.worker.queue.next_due()
+            self.assertGreater(due, time.time())
+            self.assertEqual(JobState.PENDING, self.status(key))
+            while len(self.service.received) < 3:
+                await asyncio.sleep(0.01)
+                await self.worker.run_once()
+        self.assertEqual(1, len({k for k, _ in self.service.received}))
+        self.assertEqual(JobState.SUBMITTED, self.status(key))
+        self.service.statuses = [400]
+        with self.assertLogs(level="ERROR"):
+            other = await self.worker.submit(submit_job_request(2))
+            await self.worker.run_once()
+        self.assertEqual(JobState.FAILED, self.status(other))
+        self.assertIn("400", self.status_store.get(job_id(other, 0)).message)
+
+    async def test_gives_up_after_max_attempts(self):
+        """A batch that keeps failing is marked failed"""
+        self.worker.max_attempts = 2
+        self.worker.base_delay = 0
+        self.service.statuses = [503, 503]
+        with self.assertLogs(level="WARNING"):
+            key = await self.worker.submit(submit_job_request(1))
+            await self.worker.run_once()
+            await self.worker.run_once()
+        self.assertEqual(2, len(self.service.received))
+        self.assertEqual(JobState.FAILED, self.status(key))
+
+    async def test_resubmitting_a_key_is_a_no_op(self):
+        """Clients retrying with their own key queue the request once"""
+        request = submit_job_request(1)
+        await self.worker.submit(request, key="client-key")
+        await self.worker.submit(request, key="client-key")
+        await self.worker.run_once()
+        self.assertEqual([1], [n for _, n in self.service.received])
+
+    async def test_leased_batches_are_not_claimed_twice(self):
+        """A second worker on the same database skips a claimed batch and
+        takes it over, with the same key, once the lease expires"""
+        other = self.make_worker(lease=0.05)
+        try:
+            await self.worker.submit(submit_job_request(1))
+            [batch] = self.worker.queue.claim_batches(time.time(), lease=0.05)
+            self.assertEqual({"sending": 1}, other.queue.counts())
+            self.assertEqual(0, await other.run_once())
+            time.sleep(0.06)
+            self.assertEqual(1, await other.run_once())
+            self.assertEqual(
+                [batch.key], [k for k, _ in self.service.received]
+            )
+        finally:
+            await other.stop()
+            other.queue.close()
+
+    async def test_refused_duplicates_leave_no_statuses(self):
+        """Jobs refused as duplicates are not queued and get no status"""
+        request = submit_job_request(1)
+        await self.worker.submit(request)
+        with self.assertRaises(DuplicateJobsError):
+            await self.worker.submit(request, key="again")
+        self.assertIsNone(self.status_store.get(job_id("again", 0)))
+        await self.worker.submit(request, key="again", allow_duplicates=True)
+        self.assertEqual(JobState.PENDING, self.status("again"))
+        self.assertEqual({"queued": 2}, self.worker.queue.counts())
+
+
+class TestSubmissionQueue(unittest.TestCase):
+    """Tests for SubmissionQueue"""
+
+    def setUp(self):
+        """Fresh job database"""
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, "jobs.db")
+
+    def tearDown(self):
+        """Remove the database"""
+        self.folder.cleanup()
+
+    def test_concurrent_duplicates_are_queued_once(self):
+        """Of concurrent submissions of the same jobs under different keys,
+        from different connections, exactly one is queued"""
+        request = submit_job_request(1)
+        queues = [SubmissionQueue(self.path) for _ in range(8)]
+        start = threading.Barrier(len(queues))
+
+        def enqueue(i: int) -> bool:
+            """Whether submission i was queued"""
+            start.wait()
+            try:
+                queues[i].enqueue(request, f"key-{i}", allow_duplicates=False)
+            except DuplicateJobsError:
+                return False
+            finally:
+                queues[i].close()
+            return True
+
+        with ThreadPoolExecutor(len(queues)) as pool:
+            queued = list(pool.map(enqueue, range(len(queues))))
+        self.assertEqual(1, sum(queued))
+        self.assertEqual({"queued": 1}, SubmissionQueue(self.path).counts())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""Tests for the shared service model validators"""
+
+import os
+import pickle
+import unittest
+from unittest import mock
+
+from aind_data_transfer_models.core import (
+    BasicUploadJobConfigs,
+    ModalityConfigs,
+    SubmitJobRequest,
+)
+
+from aind_data_transfer_ui_demo.models.validation_service import (
+    clear_settings_cache,
+    get_validator,
+    validate_many,
+)
+
+UPLOAD_JOB = dict(
+    project_name="Test Project",
+    platform="ecephys",
+    modalities=[dict(modality="ecephys", source="/data/ecephys")],
+    subject_id="123456",
+    acq_datetime="2024-01-01T10:00:00",
+)
+
+
+class TestServiceModelValidator(unittest.TestCase):
+    """Tests for ServiceModelValidator"""
+
+    def test_same_as_upstream(self):
+        """Validated models are upstream instances equal to __init__'s"""
+        model = get_validator(BasicUploadJobConfigs).validate(UPLOAD_JOB)
+        expected = BasicUploadJobConfigs(**UPLOAD_JOB)
+        self.assertIs(BasicUploadJobConfigs, type(model))
+        self.assertEqual(expected, model)
+        self.assertEqual(expected.model_fields_set, model.model_fields_set)
+        self.assertEqual(model, pickle.loads(pickle.dumps(model)))
+
+    def test_upstream_classes_untouched(self):
+        """No settings sources are installed on the upstream classes"""
+        get_validator(BasicUploadJobConfigs)
+        self.assertNotIn(
+            "settings_customise_sources", BasicUploadJobConfigs.__dict__
+        )
+
+    def test_settings_resolved_once(self):
+        """Settings are resolved when the validator is built, and again on
+        clear_settings_cache, also for the jobs of a request"""
+        validator = get_validator(BasicUploadJobConfigs)
+        self.assertEqual("private", validator.validate(UPLOAD_JOB).s3_bucket)
+        self.addCleanup(clear_settings_cache)
+        with mock.patch.dict(os.environ, {"S3_BUCKET": "open"}):
+            self.assertEqual(
+                "private", validator.validate(UPLOAD_JOB).s3_bucket
+            )
+            clear_settings_cache()
+            request = get_validator(SubmitJobRequest).validate(
+                {"upload_jobs": [UPLOAD_JOB]}
+            )
+            self.assertEqual("open", request.upload_jobs[0].s3_bucket)
+            # keyword arguments take priority over the environment
+            model = validator.validate({**UPLOAD_JOB, "s3_bucket": "scratch"})
+        self.assertEqual("scratch", model.s3_bucket)
+
+    def test_settings_models_are_not_initialised(self):
+        """The request and its jobs validate without their __init__"""
+        validator = get_validator(SubmitJobRequest)
+        with mock.patch.object(
+            BasicUploadJobConfigs, "__init__", side_effect=AssertionError
+        ):
+            request = validator.validate({"upload_jobs": [UPLOAD_JOB] * 2})
+        self.assertEqual(
+            SubmitJobRequest(upload_jobs=[UPLOAD_JOB] * 2), request
+        )
+
+    def test_validate_many_collects_errors(self):
+        """Invalid items get errors instead of raising"""
+        results = validate_many(
+            ModalityConfigs,
+            [UPLOAD_JOB["modalities"][0], {"modality": "nope", "source": "/"}],
+        )
+        self.assertEqual([True, False], [r.valid for r in results])
+        self.assertEqual(1, len(results[1].errors))
+
+
+if __name__ == "__main__":
+    unittest.main()